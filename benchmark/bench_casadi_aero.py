@@ -0,0 +1,87 @@
+"""Benchmark graph size and IPOPT solve time of the CasADi aero functions.
+
+A speed schedule problem is solved for an increasing number of nodes: find
+the true airspeed and altitude at each node, so that the CAS and Mach number
+follow a target schedule, with smooth changes between nodes. The aero
+conversions are constructed in three ways:
+
+- scalar: one expression per node, constructed in a Python loop
+- vector: element-wise MX operations on column vectors
+- function: one call to the cached Function from ``aero.function()``
+
+Usage::
+
+    python benchmark/bench_casadi_aero.py
+
+"""
+
+import time
+
+import casadi as ca
+
+import numpy as np
+import pandas as pd
+from openap.casadi import aero
+
+
+def conversions(v, h, method):
+    if method == "scalar":
+        cas = ca.vertcat(*[aero.tas2cas(v[i], h[i]) for i in range(v.shape[0])])
+        mach = ca.vertcat(*[aero.tas2mach(v[i], h[i]) for i in range(v.shape[0])])
+    elif method == "vector":
+        cas = aero.tas2cas(v, h)
+        mach = aero.tas2mach(v, h)
+    elif method == "function":
+        cas = aero.function("tas2cas", v.shape[0])(v, h, 0)
+        mach = aero.function("tas2mach", v.shape[0])(v, h, 0)
+    return cas, mach
+
+
+def benchmark(n, method):
+    t0 = time.perf_counter()
+
+    v = ca.MX.sym("v", n)
+    h = ca.MX.sym("h", n)
+
+    cas, mach = conversions(v, h, method)
+
+    # target schedule: 280 kt CAS and Mach 0.78, with a climb from 0 to 12 km
+    h_target = np.linspace(0, 12000, n)
+    J = (
+        ca.sumsqr(cas / aero.kts - 280) / 100
+        + ca.sumsqr(mach - 0.78) * 100
+        + ca.sumsqr((h - h_target) / 1000)
+        + ca.sumsqr(ca.diff(v) / 10)
+    )
+    g = mach
+
+    nlp = {"x": ca.vertcat(v, h), "f": J, "g": g}
+    opts = {"ipopt.print_level": 0, "print_time": False}
+    solver = ca.nlpsol("solver", "ipopt", nlp, opts)
+    t1 = time.perf_counter()
+
+    x0 = np.concatenate([np.full(n, 200), h_target])
+    res = solver(x0=x0, lbg=0, ubg=0.82)
+    t2 = time.perf_counter()
+
+    graph = ca.Function("graph", [nlp["x"]], [J, g])
+
+    return dict(
+        nodes=n,
+        method=method,
+        graph_size=graph.n_nodes(),
+        status=solver.stats()["return_status"],
+        objective=float(res["f"]),
+        t_construct=t1 - t0,
+        t_solve=t2 - t1,
+    )
+
+
+results = []
+
+for n in [50, 200, 800]:
+    for method in ["scalar", "vector", "function"]:
+        results.append(benchmark(n, method))
+
+with pd.option_context("display.width", 120):
+    print(pd.DataFrame(results).round(4))
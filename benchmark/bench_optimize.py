@@ -0,0 +1,64 @@
+"""Benchmark the solve time of trajectory optimization for each aircraft.
+
+Usage::
+
+    python benchmark/bench_optimize.py [--nodes 40] [--range 1500]
+
+"""
+
+import argparse
+import time
+import warnings
+
+import pandas as pd
+from openap import prop
+from openap.casadi import optimize
+
+warnings.filterwarnings("ignore")
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--nodes", type=int, default=40)
+parser.add_argument("--range", type=float, default=1500, help="range in km")
+parser.add_argument("--aircraft", nargs="*", default=None)
+args = parser.parse_args()
+
+actypes = args.aircraft or prop.available_aircraft()
+
+results = []
+
+for actype in actypes:
+    for phase in ["Climb", "Cruise", "Descent", "CompleteFlight"]:
+        try:
+            t0 = time.perf_counter()
+            optimizer = getattr(optimize, phase)(actype, n_nodes=args.nodes)
+            t1 = time.perf_counter()
+            df = optimizer.trajectory(range_m=args.range * 1000)
+            t2 = time.perf_counter()
+            # second solve reuses the NLP and solver
+            optimizer.trajectory(range_m=args.range * 1000, objective="ci", ci=30)
+            t3 = time.perf_counter()
+        except Exception as e:
+            print(f"{actype} {phase}: {e}")
+            continue
+
+        stats = optimizer.solver_stats
+
+        results.append(
+            dict(
+                actype=actype,
+                phase=phase,
+                status=stats["return_status"],
+                iterations=stats["iter_count"],
+                t_setup=t1 - t0,
+                t_first_solve=t2 - t1,
+                t_resolve=t3 - t2,
+                fuel=df.mass.iloc[0] - df.mass.iloc[-1],
+            )
+        )
+
+df = pd.DataFrame(results)
+
+with pd.option_context("display.max_rows", None, "display.width", 120):
+    print(df.round(3))
+    print()
+    print(df.groupby("phase")[["t_first_solve", "t_resolve"]].describe().round(3))
@@ -0,0 +1,92 @@
+"""Benchmark the multi-thread throughput of fuel flow and emission models.
+
+Points are split into chunks, which are evaluated by a thread pool, as in a
+multi-threaded API server. The numpy models are compared with the compiled
+kernels of ``openap.kernels`` (requires Numba), which release the GIL.
+
+Usage::
+
+    python benchmark/bench_threads.py --points 1000000 --chunk 10000
+
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from openap import Emission, FuelFlow
+
+try:
+    from openap import kernels
+except ImportError:
+    kernels = None
+
+
+def throughput(func, chunks, threads, repeat=3):
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda c: func(*c), chunks[:threads]))  # warm up
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            list(pool.map(lambda c: func(*c), chunks))
+        elapsed = (time.perf_counter() - t0) / repeat
+
+    return sum(c[0].size for c in chunks) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--aircraft", default="A320")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, nargs="+")
+    args = parser.parse_args()
+
+    threads = args.threads or sorted({1, 2, 4, os.cpu_count() or 1})
+
+    rng = np.random.default_rng(42)
+    n = args.points
+    mass = rng.uniform(50_000, 75_000, n)
+    tas = rng.uniform(150, 480, n)
+    alt = rng.uniform(0, 40_000, n)
+    vs = rng.uniform(-3000, 3000, n)
+    ffac = rng.uniform(0.2, 2.5, n)
+
+    idx = np.arange(args.chunk, n + 1, args.chunk)[:-1]
+    fuel_chunks = list(zip(*(np.split(x, idx) for x in (mass, tas, alt, vs))))
+    emission_chunks = list(zip(*(np.split(x, idx) for x in (ffac, tas, alt))))
+
+    models = {
+        "numpy": (FuelFlow(args.aircraft), Emission(args.aircraft)),
+    }
+    if kernels is not None:
+        models["numba"] = (
+            kernels.FuelFlow(args.aircraft),
+            kernels.Emission(args.aircraft),
+        )
+    else:
+        print("numba is not installed, only the numpy models are benchmarked")
+
+    results = []
+    for name, (fuelflow, emission) in models.items():
+        for t in threads:
+            results.append(
+                dict(
+                    backend=name,
+                    threads=t,
+                    fuelflow=throughput(fuelflow.enroute, fuel_chunks, t),
+                    nox=throughput(emission.nox, emission_chunks, t),
+                )
+            )
+
+    df = pd.DataFrame(results)
+    df[["fuelflow", "nox"]] /= 1e6
+    print(f"throughput (million points/s), {os.cpu_count()} CPUs")
+    print(df.to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
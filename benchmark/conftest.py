@@ -0,0 +1,61 @@
+"""Shared fixtures of the pytest-benchmark suite.
+
+The input sizes can be changed with the ``--sizes`` option, for example::
+
+    pytest benchmark --sizes 1,1000
+
+"""
+
+import pytest
+
+import numpy as np
+from openap import kinematic, mass, prop
+from openap.extra import nav
+
+SIZES = "1,1000,1000000"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--sizes",
+        default=SIZES,
+        help=f"comma separated input sizes of the benchmarks (default: {SIZES})",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [int(float(s)) for s in metafunc.config.getoption("sizes").split(",")]
+        metafunc.parametrize("size", sizes, ids=[f"n={s:g}" for s in sizes])
+
+
+def clear_caches():
+    """Clear all the data caches of openap, to measure a cold start."""
+    prop.available_aircraft.cache_clear()
+    prop.aircraft_engine_options.cache_clear()
+    prop.search_engine.cache_clear()
+    prop.engine.cache_clear()
+    kinematic.available_aircraft.cache_clear()
+    kinematic.load.cache_clear()
+    mass._mass_params.cache_clear()
+    nav.fixes = None
+    nav.airports = None
+
+
+def _uniform(rng, low, high, size):
+    x = rng.uniform(low, high, size)
+    return float(x[0]) if size == 1 else x
+
+
+@pytest.fixture
+def flight(size):
+    """Random flight states, as scalars for size 1, otherwise as arrays."""
+    rng = np.random.default_rng(42)
+    return dict(
+        mass=_uniform(rng, 50_000, 75_000, size),
+        tas=_uniform(rng, 150, 480, size),
+        alt=_uniform(rng, 0, 40_000, size),
+        vs=_uniform(rng, -3000, 3000, size),
+        ffac=_uniform(rng, 0.2, 2.5, size),
+        flap=_uniform(rng, 0, 30, size),
+    )
@@ -0,0 +1,58 @@
+"""Benchmarks of the data access and of cold-start model construction."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import clear_caches
+
+import numpy as np
+from openap import WRAP, Drag, Emission, FuelFlow, Thrust, prop
+from openap.extra import nav
+
+AIRCRAFT = prop.available_aircraft()
+MODELS = {
+    "FuelFlow": FuelFlow,
+    "Drag": Drag,
+    "Thrust": Thrust,
+    "Emission": Emission,
+    "WRAP": WRAP,
+}
+
+
+@pytest.mark.benchmark(group="prop")
+def test_prop_aircraft(benchmark):
+    benchmark(prop.aircraft, "A320")
+
+
+@pytest.mark.benchmark(group="prop")
+@pytest.mark.parametrize("cache", ["cold", "warm"])
+def test_prop_engine(benchmark, cache):
+    setup = clear_caches if cache == "cold" else None
+    prop.engine("CFM56-5B4")
+    benchmark.pedantic(prop.engine, ("CFM56-5B4",), setup=setup, rounds=20)
+
+
+@pytest.mark.benchmark(group="nav")
+def test_nav_closest_fix(benchmark, size):
+    if size > 1000:
+        pytest.skip("nav.closest_fix only accepts scalars, looped up to 1e3 calls")
+
+    rng = np.random.default_rng(42)
+    lats = rng.uniform(45, 55, size)
+    lons = rng.uniform(0, 10, size)
+    nav.closest_fix(lats[0], lons[0])  # load the database before timing
+
+    def closest_fixes():
+        return [nav.closest_fix(lat, lon) for lat, lon in zip(lats, lons)]
+
+    benchmark(closest_fixes)
+
+
+@pytest.mark.benchmark(group="construction")
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("ac", AIRCRAFT)
+def test_construction_cold(benchmark, model, ac):
+    # synonyms are used for the types without their own drag or kinematic model
+    kwargs = dict(use_synonym=True)
+    benchmark.pedantic(MODELS[model], (ac,), kwargs, setup=clear_caches, rounds=5)
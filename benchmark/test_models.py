@@ -0,0 +1,96 @@
+"""Benchmarks of the model evaluations (hot paths) at different input sizes."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import numpy as np
+from openap import Drag, Emission, FlightGenerator, FlightPhase, FuelFlow, Thrust, aero
+
+AC = "A320"
+
+fuelflow = FuelFlow(AC)
+drag = Drag(AC)
+thrust = Thrust(AC)
+emission = Emission(AC)
+
+
+@pytest.mark.benchmark(group="fuel")
+def test_fuelflow_enroute(benchmark, flight):
+    f = flight
+    benchmark(fuelflow.enroute, f["mass"], f["tas"], f["alt"], f["vs"])
+
+
+@pytest.mark.benchmark(group="drag")
+def test_drag_clean(benchmark, flight):
+    f = flight
+    benchmark(drag.clean, f["mass"], f["tas"], f["alt"], f["vs"])
+
+
+@pytest.mark.benchmark(group="drag")
+def test_drag_nonclean(benchmark, flight):
+    f = flight
+    benchmark(
+        drag.nonclean, f["mass"], f["tas"], f["alt"], f["flap"], f["vs"], True
+    )
+
+
+@pytest.mark.benchmark(group="thrust")
+def test_thrust_climb(benchmark, flight):
+    f = flight
+    benchmark(thrust.climb, f["tas"], f["alt"], f["vs"])
+
+
+@pytest.mark.benchmark(group="thrust")
+def test_thrust_takeoff(benchmark, flight):
+    f = flight
+    benchmark(thrust.takeoff, f["tas"], f["alt"])
+
+
+@pytest.mark.benchmark(group="emission")
+@pytest.mark.parametrize("species", ["nox", "co", "hc"])
+def test_emission(benchmark, flight, species):
+    f = flight
+    benchmark(getattr(emission, species), f["ffac"], f["tas"], f["alt"])
+
+
+@pytest.mark.benchmark(group="aero")
+def test_aero_atmos(benchmark, flight):
+    benchmark(aero.atmos, flight["alt"] * aero.ft)
+
+
+@pytest.mark.benchmark(group="aero")
+@pytest.mark.parametrize(
+    "conversion", ["tas2cas", "cas2tas", "tas2mach", "mach2tas", "cas2mach", "mach2cas"]
+)
+def test_aero_conversion(benchmark, flight, conversion):
+    h = flight["alt"] * aero.ft
+    v = flight["tas"] * aero.kts
+    if conversion.startswith("mach"):
+        v = v / 340.29
+    benchmark(getattr(aero, conversion), v, h)
+
+
+@pytest.mark.benchmark(group="phase")
+def test_flightphase_phaselabel(benchmark, size):
+    # a climb, cruise and descent profile, sampled every second
+    ts = np.arange(size, dtype=float)
+    alt = np.clip(35000 * np.sin(np.pi * ts / max(size, 1)) * 2, 0, 35000)
+    spd = np.clip(alt / 35000 * 450, 150, None)
+    roc = np.gradient(alt, ts) * 60 if size > 1 else np.zeros(size)
+
+    fp = FlightPhase()
+    fp.set_trajectory(ts, alt, spd, roc)
+
+    if size >= 100_000:
+        # a single evaluation already takes a long time
+        benchmark.pedantic(fp.phaselabel, rounds=1, iterations=1)
+    else:
+        benchmark(fp.phaselabel)
+
+
+@pytest.mark.benchmark(group="generator")
+@pytest.mark.parametrize("dt", [1, 10])
+def test_flightgenerator_complete(benchmark, dt):
+    fgen = FlightGenerator(AC)
+    benchmark(fgen.complete, dt=dt)
@@ -1,6 +1,8 @@
 from .drag import Drag
 from .emission import Emission
+from .evaluator import Evaluator as Evaluator
 from .extra import aero, filters, nav, statistics
+from .extra import instrument as instrument
 from .fuel import FuelFlow
 from .gen import FlightGenerator
 from .kinematic import WRAP
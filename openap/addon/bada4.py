@@ -1,11 +1,18 @@
 # %%
+from __future__ import annotations
+
+import os
 from glob import glob
 from xml.etree import ElementTree
 
+import numpy as np
 from numpy import ndarray
 
 from .. import base
-from ..extra import ndarrayconvert
+from ..extra import _cache_lock, ndarrayconvert
+
+# parsed coefficients, keyed by (path, aircraft)
+_cache = dict()
 
 
 # %%
@@ -30,6 +37,129 @@ def load_bada4(ac: str, path: str) -> ElementTree:
     return badatree
 
 
+def parse_bada4(bxml: ElementTree) -> dict:
+    """Extract the model coefficients from a BADA4 XML.
+
+    Args:
+        bxml (xml.etree.ElementTree): BADA4 model XML.
+
+    Returns:
+        dict: Coefficients as numpy arrays, with polynomial coefficient
+            matrices in their evaluation shapes.
+
+    """
+
+    def values(path):
+        return np.array([float(v.text) for v in bxml.findall(path)])
+
+    def value(path):
+        return np.array(float(bxml.findtext(path)))
+
+    params = dict(
+        S=value("./AFCM/S"),
+        drag_scalar=value(".//*/DPM_clean/scalar"),
+        drag_d=values(".//*/CD_clean/d"),
+        mach_max=value(".//*/DPM_clean/M_max"),
+        m_ref=value("./PFM/MREF"),
+        lhv=value("./PFM/LHV"),
+        thrust_a=values("./PFM/TFM/CT/a").reshape(6, 6),
+        thrust_ti=values("./PFM/TFM/LIDL/CT/ti").reshape(3, 4),
+        fuel_f=values("./PFM/TFM/CF/f").reshape(5, 5),
+        fuel_fi=values("./PFM/TFM/LIDL/CF/fi").reshape(3, 3),
+    )
+
+    for rating in ["MCRZ", "MCMB"]:
+        params[f"{rating}_kink"] = value(f"./PFM/TFM/{rating}/kink")
+        params[f"{rating}_b"] = values(f"./PFM/TFM/{rating}/flat_rating/b").reshape(
+            6, 6
+        )
+        params[f"{rating}_c"] = values(f"./PFM/TFM/{rating}/temp_rating/c").reshape(
+            9, 5
+        )
+
+    return params
+
+
+def load_params(ac: str, path: str, cache_file: str | None = None) -> dict:
+    """Get the BADA4 coefficients of an aircraft, parsing the XML only once.
+
+    The coefficients are cached in memory by (path, aircraft). When a cache
+    file is given, it is read before parsing, and updated after parsing.
+
+    Args:
+        ac (str): aircraft type (for example: A320 or A320-231).
+        path (str): path to BADA4 models.
+        cache_file (str): path to a npz file to persist the cache. Optional.
+
+    Returns:
+        dict: Coefficients of the BADA4 model.
+
+    """
+    key = (os.path.realpath(path), ac.upper())
+
+    if key in _cache:
+        return _cache[key]
+
+    with _cache_lock:
+        if key not in _cache and cache_file is not None and os.path.exists(cache_file):
+            load_cache(cache_file)
+
+        if key not in _cache:
+            _cache[key] = parse_bada4(load_bada4(ac, path))
+
+            if cache_file is not None:
+                save_cache(cache_file)
+
+    return _cache[key]
+
+
+def save_cache(cache_file: str) -> None:
+    """Save all parsed BADA4 coefficients to a npz file.
+
+    Args:
+        cache_file (str): path to the npz file.
+
+    """
+    keys = list(_cache.keys())
+    arrays = {
+        f"{i}__{name}": v for i, k in enumerate(keys) for name, v in _cache[k].items()
+    }
+    np.savez(cache_file, __keys__=np.array([f"{p}|{ac}" for p, ac in keys]), **arrays)
+
+
+def load_cache(cache_file: str) -> None:
+    """Load parsed BADA4 coefficients from a npz file into the cache.
+
+    Args:
+        cache_file (str): path to the npz file.
+
+    """
+    with np.load(cache_file) as data:
+        for i, k in enumerate(data["__keys__"]):
+            prefix = f"{i}__"
+            _cache[tuple(str(k).rsplit("|", 1))] = {
+                name[len(prefix) :]: data[name]
+                for name in data.files
+                if name.startswith(prefix)
+            }
+
+
+def polyval(x, c):
+    """Evaluate sum(c[i] * x**i) using the Horner scheme."""
+    y = c[-1]
+    for ci in c[-2::-1]:
+        y = y * x + ci
+    return y
+
+
+def polyval2d(x, y, c):
+    """Evaluate sum(c[i, j] * x**i * y**j) using the Horner scheme."""
+    z = polyval(y, c[-1])
+    for ci in c[-2::-1]:
+        z = z * x + polyval(y, ci)
+    return z
+
+
 # %%
 class Drag(base.DragBase):
     """
@@ -71,33 +201,20 @@ class Drag(base.DragBase):
 
         self.ac = ac.upper()
 
-        # load parameters from xml
-        bxml = load_bada4(ac, bada_path)
-        self.scalar = float(bxml.findtext(".//*/DPM_clean/scalar"))
-        self.d_ = self.sci.array(
-            [float(v.text) for v in bxml.findall(".//*/CD_clean/d")]
-        )
-        self.mach_max = float(bxml.findtext(".//*/DPM_clean/M_max"))
-        self.S = float(bxml.findtext("./AFCM/S"))
+        params = load_params(ac, bada_path, kwargs.get("cache_file"))
+        self.scalar = float(params["drag_scalar"])
+        self.d_ = params["drag_d"]
+        self.mach_max = float(params["mach_max"])
+        self.S = float(params["S"])
 
     @ndarrayconvert(column=True)
     def _cd_base(self, cl, mach):
         mm = (1 - mach**2) ** (-0.5)
 
-        C0 = self.sci.dot(
-            self.sci.array([mm[:, 0] ** i for i in range(5)]).T,
-            self.d_[0:5].reshape(5, 1),
-        )
-
-        C2 = self.sci.dot(
-            self.sci.array([mm[:, 0] ** i for i in range(0, 13, 3)]).T,
-            self.d_[5:10].reshape(5, 1),
-        )
-
-        C6 = self.d_[10] + self.sci.dot(
-            self.sci.array([mm[:, 0] ** i for i in range(14, 18)]).T,
-            self.d_[11:15].reshape(4, 1),
-        )
+        # C0: powers 0-4, C2: powers 0, 3, ..., 12, C6: powers 14-17 of mm
+        C0 = polyval(mm, self.d_[0:5])
+        C2 = polyval(mm**3, self.d_[5:10])
+        C6 = self.d_[10] + mm**14 * polyval(mm, self.d_[11:15])
 
         cd = self.scalar * (C0 + C2 * cl**2 + C6 * cl**6)
 
@@ -196,25 +313,19 @@ class Thrust(base.ThrustBase):
         super().__init__(ac, **kwargs)
         self.ac = ac.upper()
 
-        # load parameters from xml
-        bxml = load_bada4(ac, bada_path)
-        self.m_ref = float(bxml.findtext("./PFM/MREF"))
-        self.a_ = [float(v.text) for v in bxml.findall("./PFM/TFM/CT/a")]
-        self.ti = [float(v.text) for v in bxml.findall("./PFM/TFM/LIDL/CT/ti")]
+        params = load_params(ac, bada_path, kwargs.get("cache_file"))
+        self.m_ref = float(params["m_ref"])
+        self.a_ = params["thrust_a"]
+        self.ti = params["thrust_ti"]
 
         self.kink = dict()
         self.b_ = dict()
         self.c_ = dict()
 
         for rating in ["MCRZ", "MCMB"]:
-            self.kink[rating] = float(bxml.findtext(f"./PFM/TFM/{rating}/kink"))
-            self.b_[rating] = [
-                float(t.text) for t in bxml.findall(f"./PFM/TFM/{rating}/flat_rating/b")
-            ]
-
-            self.c_[rating] = [
-                float(t.text) for t in bxml.findall(f"./PFM/TFM/{rating}/temp_rating/c")
-            ]
+            self.kink[rating] = float(params[f"{rating}_kink"])
+            self.b_[rating] = params[f"{rating}_b"]
+            self.c_[rating] = params[f"{rating}_c"]
 
     @ndarrayconvert(column=True)
     def cT(self, mach, h, rating, dT=0) -> float | ndarray:
@@ -227,35 +338,29 @@ class Thrust(base.ThrustBase):
 
         k = 1.4
 
-        delta = self.aero.pressure(h) / self.aero.p0
-        theta = self.aero.temperature(h) / self.aero.T0
+        p, _, T = self.aero.atmos(h)
+        delta = p / self.aero.p0
+        theta = T / self.aero.T0
 
         if rating == "LIDL":
-            ti_matrix = self.sci.reshape(self.ti, (3, 4))
-
-            delta_pow = self.sci.array([delta**i for i in range(-1, 3)]).reshape(4, -1)
-            mach_pow = self.sci.array([mach**i for i in range(3)]).reshape(3, -1)
-            cT = self.sci.einsum("ij,jk,ik->k", ti_matrix, delta_pow, mach_pow)
+            # sum(ti[i, j] * mach**i * delta**(j-1))
+            cT = polyval2d(mach, delta, self.ti) / delta
 
         else:
             if dT <= self.kink[rating]:
-                b_matrix = self.sci.reshape(self.b_[rating], (6, 6))
-                mach_pow = self.sci.array([mach**i for i in range(6)]).reshape(6, -1)
-                ratio_pow = self.sci.array([delta**j for j in range(6)]).reshape(6, -1)
-                delta_T = self.sci.einsum("ij,jk,ik->k", b_matrix, mach_pow, ratio_pow)
+                # sum(b[i, j] * delta**i * mach**j)
+                delta_T = polyval2d(delta, mach, self.b_[rating])
             else:
-                c_matrix = self.sci.reshape(self.c_[rating], (9, 5))
-                mach_pow = self.sci.array([mach**i for i in range(5)]).reshape(5, -1)
+                # sum(c[i, j] * r[i] * mach**j),
+                # with r = [theta_t**0, ..., theta_t**4, delta**1, ..., delta**4]
+                c_matrix = self.c_[rating]
                 theta_t = theta * (1 + (mach**2) * (k - 1) / 2)
-                ratio_pow = self.sci.array(
-                    [theta_t**j for j in range(5)] + [delta**j for j in range(1, 5)]
-                ).reshape(9, -1)
-                delta_T = self.sci.einsum("ij,jk,ik->k", c_matrix, mach_pow, ratio_pow)
+                delta_T = polyval2d(theta_t, mach, c_matrix[:5]) + delta * polyval2d(
+                    delta, mach, c_matrix[5:]
+                )
 
-            a_matrix = self.sci.reshape(self.a_, (6, 6))
-            mach_pow = self.sci.array([mach**i for i in range(6)]).reshape(6, -1)
-            delta_T_pow = self.sci.array([delta_T**j for j in range(6)]).reshape(6, -1)
-            cT = self.sci.einsum("ij,jk,ik->k", a_matrix, mach_pow, delta_T_pow)
+            # sum(a[i, j] * delta_T**i * mach**j)
+            cT = polyval2d(delta_T, mach, self.a_)
 
         return cT
 
@@ -368,15 +473,14 @@ class FuelFlow(base.FuelFlowBase):
         """
         super().__init__(ac, **kwargs)
         self.ac = ac.upper()
-        self.thrust = Thrust(ac, bada_path)
-        self.drag = Drag(ac, bada_path)
+        self.thrust = Thrust(ac, bada_path, **kwargs)
+        self.drag = Drag(ac, bada_path, **kwargs)
 
-        # load parameters from xml
-        bxml = load_bada4(ac, bada_path)
-        self.mass_ref = float(bxml.findtext("./PFM/MREF"))
-        self.f_ = [float(v.text) for v in bxml.findall("./PFM/TFM/CF/f")]
-        self.fi_ = [float(v.text) for v in bxml.findall("./PFM/TFM/LIDL/CF/fi")]
-        self.lhv = float(bxml.findtext("./PFM/LHV"))
+        params = load_params(ac, bada_path, kwargs.get("cache_file"))
+        self.mass_ref = float(params["m_ref"])
+        self.f_ = params["fuel_f"]
+        self.fi_ = params["fuel_fi"]
+        self.lhv = float(params["lhv"])
 
     @ndarrayconvert(column=True)
     def _calc_fuel(self, mass, delta, theta, cF):
@@ -407,14 +511,12 @@ class FuelFlow(base.FuelFlowBase):
         h = alt * self.aero.ft
         v = tas * self.aero.kts
         mach = self.aero.tas2mach(v, h)
-        delta = self.aero.pressure(h) / self.aero.p0
-        theta = self.aero.temperature(h) / self.aero.T0
+        p, _, T = self.aero.atmos(h)
+        delta = p / self.aero.p0
+        theta = T / self.aero.T0
 
-        fi_matrix = self.sci.reshape(self.fi_, (3, 3))
-        delta_powers = self.sci.array([delta**i for i in range(3)]).reshape(3, -1)
-        mach_powers = self.sci.array([mach**i for i in range(3)]).reshape(3, -1)
-
-        cF_idle = self.sci.einsum("ij,jk,ik->k", fi_matrix, delta_powers, mach_powers)
+        # sum(fi[i, j] * mach**i * delta**j)
+        cF_idle = polyval2d(mach, delta, self.fi_)
 
         fuel_flow = self._calc_fuel(mass, delta, theta, cF_idle)
 
@@ -438,20 +540,18 @@ class FuelFlow(base.FuelFlowBase):
         v = tas * self.aero.kts
 
         mach = self.aero.tas2mach(v, h)
-        delta = self.aero.pressure(h) / self.aero.p0
-        theta = self.aero.temperature(h) / self.aero.T0
+        p, _, T = self.aero.atmos(h)
+        delta = p / self.aero.p0
+        theta = T / self.aero.T0
         gamma = self.sci.arctan2(vs * self.aero.fpm, v)
 
         D = self.drag.clean(mass, tas, alt, vs)
         T = D + mass * self.aero.g0 * self.sci.sin(gamma)
 
-        cT = T / (delta.reshape(-1, 1) * self.mass_ref * self.aero.g0)
-
-        f_matrix = self.sci.reshape(self.f_, (5, 5))
-        cT_powers = self.sci.array([cT[:, 0] ** i for i in range(5)]).reshape(5, -1)
-        M_powers = self.sci.array([mach[:, 0] ** i for i in range(5)]).reshape(5, -1)
+        cT = T / (delta * self.mass_ref * self.aero.g0)
 
-        cF_gen = self.sci.einsum("ij,jk,ik->k", f_matrix, cT_powers, M_powers)
+        # sum(f[i, j] * mach**i * cT**j)
+        cF_gen = polyval2d(mach, cT, self.f_)
 
         fuel_flow_non_idle = self._calc_fuel(mass, delta, theta, cF_gen)
         fuel_flow_idle = self.idle(mass, tas, alt)
@@ -20,6 +20,7 @@ class DragBase(object):
             self.aero = importlib.import_module("openap").aero
 
         self.ac = ac.upper()
+        self.dtype = kwargs.get("dtype")
 
     def clean(self, mass, tas, alt, vs):
         raise NotImplementedError
@@ -46,6 +47,7 @@ class ThrustBase(object):
             self.aero = importlib.import_module("openap").aero
 
         self.ac = ac.upper()
+        self.dtype = kwargs.get("dtype")
 
     def takeoff(self, tas, alt):
         raise NotImplementedError
@@ -80,6 +82,7 @@ class FuelFlowBase(object):
             self.aero = importlib.import_module("openap").aero
 
         self.ac = ac.upper()
+        self.dtype = kwargs.get("dtype")
 
     @ndarrayconvert
     def enroute(self, mass, tas, alt, vs=0, acc=0):
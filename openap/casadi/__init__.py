@@ -1,20 +1,9 @@
 from .. import *
+from ..extra.backend import remove_decorator_meta
 from . import aero_override as aero
 from . import numpy_override as sci
 
-
-class RemoveDecoratorMeta(type):
-    def __new__(cls, name, base, attr_dict):
-        # for all methods in all base classes
-        # reimplement in attr_dict
-        for b in base:
-            for elt in vars(b):
-                if hasattr(getattr(b, elt), "orig_func"):
-                    attr_dict[elt] = getattr(b, elt).orig_func
-
-        attr_dict["sci"] = sci
-        attr_dict["aero"] = aero
-        return super().__new__(cls, name, base, attr_dict)
+RemoveDecoratorMeta = remove_decorator_meta(sci, aero)
 
 
 class Drag(drag.Drag, metaclass=RemoveDecoratorMeta):
@@ -1,4 +1,20 @@
-"""aero.py adapted for CasADi"""
+"""aero.py adapted for CasADi
+
+Branches of the ISA model (troposphere and stratosphere) are replaced by
+smooth approximations, so that all functions are differentiable and free of
+``if_else`` nodes. The ``sharpness`` argument (1/km) controls how closely the
+smooth transitions follow the original piecewise functions. With the default
+value, temperature deviates at most 0.45 K and density at most 0.2% from the
+piecewise model, and only within about 500 m around the tropopause.
+
+For collocation problems with many nodes, use :func:`function` to get a
+CasADi Function of any conversion, and call it once with column vectors for
+all nodes. This adds a single call node to an MX graph, instead of a copy
+of the full expression for every node.
+"""
+
+import functools
+import inspect
 
 from casadi import casadi
 
@@ -27,86 +43,131 @@ a0 = 340.293988  # m/s, sea level speed of sound ISA, sqrt(gamma*R*T0)
 deg = 180 / 3.14159  # radians -> degrees
 rad = 3.14159 / 180  # degrees -> radians
 
+h_trop = 11000.0  # m, tropopause altitude
+T_trop = 216.65  # K, temperature at tropopause (ISA)
+H_strat = 6341.552161  # m, scale height in the stratosphere
+SHARPNESS = 10  # 1/km, default sharpness of the smooth approximations
+
+
+def softplus(x, sharpness=SHARPNESS):
+    """Smooth approximation of max(x, 0), with x in km."""
+    # stable form of log(1 + exp(sharpness * x)) / sharpness
+    return np.maximum(x, 0) + np.log1p(np.exp(-sharpness * np.abs(x))) / sharpness
+
 
-def atmos(h, dT=0):
+def sigmoid(x, sharpness=SHARPNESS):
+    """Smooth approximation of the step function, with x in km."""
+    return 1 / (1 + np.exp(-sharpness * x))
+
+
+def atmos(h, dT=0, sharpness=SHARPNESS):
     """Compute press, density and temperature at a given altitude.
 
     Args:
         h (SX or MX): Altitude (in meters).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         (SX, SX, SX) or (MX, MX, MX):
             Air pressure (Pa), density (kg/m3), and temperature (K).
 
     """
-    assert -15 < dT < 15
+    p, rho, T, _ = atmos_all(h, dT, sharpness)
+    return p, rho, T
+
+
+def atmos_all(h, dT=0, sharpness=SHARPNESS):
+    """Compute press, density, temperature and speed of sound in one pass.
+
+    Args:
+        h (SX or MX): Altitude (in meters).
+        dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
+
+    Returns:
+        (SX, SX, SX, SX) or (MX, MX, MX, MX): Air pressure (Pa),
+            density (kg/m3), temperature (K), and speed of sound (m/s).
+
+    """
+    if isinstance(dT, (int, float)):
+        assert -15 < dT < 15
 
     T0_ = T0 + dT
-    T = 0.65 * np.log(1 + np.exp(-10 * (h / 1000 - 11))) + 216.65
-    rho = rho0 * ((T0_ + beta * h) / T0_) ** 4.2559
+    dh_km = (h - h_trop) / 1000
+
+    # max(T0 + beta * h, T_trop), and max(h - h_trop, 0) for the stratosphere
+    T = T_trop + dT + (-beta * 1000) * softplus(-dh_km, sharpness)
+    dh_strat = 1000 * softplus(dh_km, sharpness)
+
+    theta = T / T0_
+    rho = rho0 * theta**4.256848030018761 * np.exp(-dh_strat / H_strat)
     p = rho * R * T
-    return p, rho, T
+    a = np.sqrt(gamma * R * T)
+    return p, rho, T, a
 
 
-def temperature(h, dT=0):
+def temperature(h, dT=0, sharpness=SHARPNESS):
     """Compute air temperature at a given altitude.
 
     Args:
         h (SX or MX): Altitude (in meters).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: Air temperature (K).
 
     """
-    p, r, T = atmos(h, dT)
+    _, _, T = atmos(h, dT, sharpness)
     return T
 
 
-def pressure(h, dT=0):
+def pressure(h, dT=0, sharpness=SHARPNESS):
     """Compute air pressure at a given altitude.
 
     Args:
         h (SX or MX): Altitude (in meters).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: Air pressure (Pa).
 
     """
-    p, r, T = atmos(h, dT)
+    p, _, _ = atmos(h, dT, sharpness)
     return p
 
 
-def density(h, dT=0):
+def density(h, dT=0, sharpness=SHARPNESS):
     """Compute air density at a given altitude.
 
     Args:
         h (SX or MX): Altitude (in meters).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: Air density (kg/m3).
 
     """
-    p, r, T = atmos(h, dT)
+    _, r, _ = atmos(h, dT, sharpness)
     return r
 
 
-def vsound(h, dT=0):
+def vsound(h, dT=0, sharpness=SHARPNESS):
     """Compute speed of sound at a given altitude.
 
     Args:
         h (SX or MX): Altitude (in meters).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: speed of sound (m/s).
 
     """
-    T = temperature(h, dT)
-    a = np.sqrt(gamma * R * T)
+    _, _, _, a = atmos_all(h, dT, sharpness)
     return a
 
 
@@ -164,12 +225,13 @@ def bearing(lat1, lon1, lat2, lon2):
     return bearing
 
 
-def h_isa(p, dT=0):
+def h_isa(p, dT=0, sharpness=SHARPNESS):
     """Compute ISA altitude for a given pressure.
 
     Args:
         p (SX or MX): Pressure (in Pa).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: altitude (m).
@@ -185,7 +247,9 @@ def h_isa(p, dT=0):
     p1 = 22630
     h1 = -R * T1 / g0 * np.log(p / p1) + 11000
 
-    h_ = casadi.if_else(p > 22630, h, h1)
+    # both branches are equal at the tropopause, blend them smoothly
+    w = sigmoid((11000 - h) / 1000, sharpness)
+    h_ = w * h + (1 - w) * h1
 
     return h_
 
@@ -224,141 +288,155 @@ def latlon(lat1, lon1, d, brg, h=0):
     return lat2, lon2
 
 
-def tas2mach(v_tas, h, dT=0):
+def tas2mach(v_tas, h, dT=0, sharpness=SHARPNESS):
     """Convert true airspeed to mach number at a given altitude.
 
     Args:
         v_tas (SX or MX): True airspeed (m/s).
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: mach number.
 
     """
-    a = vsound(h, dT)
+    a = vsound(h, dT, sharpness)
     mach = v_tas / a
     return mach
 
 
-def mach2tas(mach, h, dT=0):
+def mach2tas(mach, h, dT=0, sharpness=SHARPNESS):
     """Convert mach number to true airspeed at a given altitude.
 
     Args:
         mach (SX or MX): Mach number.
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: True airspeed (m/s).
 
     """
-    a = vsound(h, dT)
+    a = vsound(h, dT, sharpness)
     v_tas = mach * a
     return v_tas
 
 
-def eas2tas(v_eas, h, dT=0):
+def eas2tas(v_eas, h, dT=0, sharpness=SHARPNESS):
     """Convert equivalent airspeed to true airspeed at a given altitude.
 
     Args:
         v_eas (SX or MX): Equivalent airspeed (m/s).
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: True airspeed (m/s).
 
     """
-    rho = density(h, dT)
+    rho = density(h, dT, sharpness)
     v_tas = v_eas * np.sqrt(rho0 / rho)
     return v_tas
 
 
-def tas2eas(v_tas, h, dT=0):
+def tas2eas(v_tas, h, dT=0, sharpness=SHARPNESS):
     """Convert true airspeed to equivalent airspeed at a given altitude.
 
     Args:
         v_tas (SX or MX): True airspeed (m/s).
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: Equivalent airspeed (m/s).
 
     """
-    rho = density(h, dT)
+    rho = density(h, dT, sharpness)
     v_eas = v_tas * np.sqrt(rho / rho0)
     return v_eas
 
 
-def cas2tas(v_cas, h, dT=0):
+def cas2tas(v_cas, h, dT=0, sharpness=SHARPNESS):
     """Convert calibrated airspeed to true airspeed at a given altitude.
 
     Args:
         v_cas (SX or MX): Equivalent airspeed (m/s).
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: True airspeed (m/s).
 
     """
-    p, rho, T = atmos(h, dT)
+    p, _, T = atmos(h, dT, sharpness)
     qdyn = p0 * ((1.0 + rho0 * v_cas * v_cas / (7.0 * p0)) ** 3.5 - 1.0)
-    v_tas = np.sqrt(7.0 * p / rho * ((1.0 + qdyn / p) ** (2.0 / 7.0) - 1.0))
+    # p / rho = R * T
+    v_tas = np.sqrt(7.0 * R * T * ((1.0 + qdyn / p) ** (2.0 / 7.0) - 1.0))
     return v_tas
 
 
-def tas2cas(v_tas, h, dT=0):
+def tas2cas(v_tas, h, dT=0, sharpness=SHARPNESS):
     """Convert true airspeed to calibrated airspeed at a given altitude.
 
     Args:
         v_tas (SX or MX): True airspeed (m/s).
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: Calibrated airspeed (m/s).
 
     """
-    p, rho, T = atmos(h, dT)
-    qdyn = p * ((1.0 + rho * v_tas * v_tas / (7.0 * p)) ** 3.5 - 1.0)
+    p, _, T = atmos(h, dT, sharpness)
+    # rho / p = 1 / (R * T)
+    qdyn = p * ((1.0 + v_tas * v_tas / (7.0 * R * T)) ** 3.5 - 1.0)
     v_cas = np.sqrt(7.0 * p0 / rho0 * ((qdyn / p0 + 1.0) ** (2.0 / 7.0) - 1.0))
     return v_cas
 
 
-def mach2cas(mach, h, dT=0):
+def mach2cas(mach, h, dT=0, sharpness=SHARPNESS):
     """Convert mach number to calibrated airspeed at a given altitude.
 
     Args:
         mach (SX or MX): Mach number.
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: Calibrated airspeed (m/s).
 
     """
-    v_tas = mach2tas(mach, h, dT)
-    v_cas = tas2cas(v_tas, h, dT)
+    p = pressure(h, dT, sharpness)
+    # v_tas^2 / (7 R T) = 0.2 mach^2
+    qdyn = p * ((1.0 + 0.2 * mach * mach) ** 3.5 - 1.0)
+    v_cas = np.sqrt(7.0 * p0 / rho0 * ((qdyn / p0 + 1.0) ** (2.0 / 7.0) - 1.0))
     return v_cas
 
 
-def cas2mach(v_cas, h, dT=0):
+def cas2mach(v_cas, h, dT=0, sharpness=SHARPNESS):
     """Convert calibrated airspeed to mach number  at a given altitude.
 
     Args:
         v_cas (SX or MX): Calibrated airspeed (m/s).
         h (SX or MX): Altitude (m).
         dT (SX or MX): Temperature shift from ISA (in K).  Defaults to 0.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
 
     Returns:
         SX or MX: Mach number.
 
     """
-    v_tas = cas2tas(v_cas, h, dT)
-    mach = tas2mach(v_tas, h, dT)
+    p = pressure(h, dT, sharpness)
+    qdyn = p0 * ((1.0 + rho0 * v_cas * v_cas / (7.0 * p0)) ** 3.5 - 1.0)
+    # v_tas^2 / a^2 = v_tas^2 / (1.4 R T)
+    mach = np.sqrt(5.0 * ((1.0 + qdyn / p) ** (2.0 / 7.0) - 1.0))
     return mach
 
 
@@ -375,9 +453,50 @@ def crossover_alt(v_cas, mach, dT=0):
 
     """
     T0_shift = T0 + dT
-    mach = 1e-4 if mach < 1e-4 else mach
+    mach = np.fmax(mach, 1e-4)
     delta = ((0.2 * (v_cas / a0) ** 2 + 1) ** 3.5 - 1) / (
         (0.2 * mach**2 + 1) ** 3.5 - 1
     )
     h = T0_shift / beta * (delta ** (-1 * R * beta / g0) - 1)
     return h
+
+
+@functools.lru_cache()
+def function(name, n=1, sharpness=SHARPNESS):
+    """Get a CasADi Function of an aero function for vectorized evaluation.
+
+    The Function is constructed once with SX column vector inputs of size n,
+    and cached. It can be called with DM, SX, or MX column vectors covering
+    all nodes, where scalar inputs are broadcast. For MX graphs, this results
+    in a single call node regardless of the number of nodes.
+
+    Args:
+        name (str): Name of the function, for example: "atmos" or "tas2cas".
+        n (int): Number of nodes. Defaults to 1.
+        sharpness (float): Sharpness of the tropopause transition (1/km).
+
+    Returns:
+        casadi.Function: Function with the same inputs and outputs.
+
+    Examples::
+
+        tas2cas = aero.function("tas2cas", n)
+        v_cas = tas2cas(v_tas, h, 0)   # v_tas and h are (n, 1) MX
+
+    """
+    func = globals()[name]
+    params = inspect.signature(func).parameters
+    names = [k for k in params if k != "sharpness"]
+    inputs = [casadi.SX.sym(k, n) for k in names]
+
+    if "sharpness" in params:
+        outputs = func(*inputs, sharpness=sharpness)
+    else:
+        outputs = func(*inputs)
+
+    if not isinstance(outputs, tuple):
+        outputs = (outputs,)
+
+    return casadi.Function(
+        name, inputs, list(outputs), names, [f"o{i}" for i in range(len(outputs))]
+    )
@@ -0,0 +1,399 @@
+"""Trajectory optimization based on the OpenAP CasADi models.
+
+The optimal control problems are transcribed with trapezoidal direct
+collocation on a uniform time grid with free final time. The states are the
+along-track distance, altitude, and mass of the aircraft, while the Mach number
+and vertical rate are the controls. Fuel flow, drag, and thrust come from the
+symbolic models in :mod:`openap.casadi`.
+
+The NLP is built once per object (and number of nodes). Initial mass, range,
+altitudes, and cost index only change the bounds or parameters of the NLP, so
+repeated calls reuse the same IPOPT solver.
+
+Examples::
+
+    from openap.casadi import optimize
+
+    optimizer = optimize.CompleteFlight("A320")
+    df = optimizer.trajectory(range_m=1500_000, m0=65000)
+
+    optimizer = optimize.Cruise("A320", n_nodes=40)
+    df = optimizer.trajectory(range_m=2000_000, objective="ci", ci=30)
+
+"""
+
+import casadi as ca
+
+import numpy as np
+import pandas as pd
+from openap import FlightGenerator, prop
+from openap import FuelFlow as NumpyFuelFlow
+from openap import aero as np_aero
+
+from . import FuelFlow, aero
+
+
+class Base(object):
+    """Base class for trajectory optimization of a flight phase."""
+
+    # scaling of states [s (m), h (m), mass (kg)] and controls [mach, vs (m/s)]
+    x_scale = np.array([1e5, 1e4, 1e4])
+    u_scale = np.array([1.0, 10.0])
+    t_scale = 1e3
+
+    def __init__(self, actype, engtype=None, n_nodes=40, **kwargs):
+        """Initialize the optimizer.
+
+        Args:
+            actype (str): ICAO aircraft type (for example: A320).
+            engtype (str): Engine type (for example: CFM56-5A3).
+                Leave empty to use the default engine.
+            n_nodes (int): Number of collocation intervals. Defaults to 40.
+
+        """
+        self.actype = actype
+        self.aircraft = prop.aircraft(actype, **kwargs)
+
+        if engtype is None:
+            engtype = self.aircraft["engine"]["default"]
+
+        self.engtype = engtype
+        self.n_nodes = n_nodes
+
+        self.fuelflow = FuelFlow(actype, engtype, **kwargs)
+        self.thrust = self.fuelflow.thrust
+        self.drag = self.fuelflow.drag
+        self.wrap = self.fuelflow.wrap
+
+        self.oew = self.aircraft["limits"]["OEW"]
+        self.mtow = self.aircraft["limits"]["MTOW"]
+        self.mmo = self.aircraft["limits"]["MMO"]
+        self.vmo = self.aircraft["limits"]["VMO"]
+        self.ceiling = self.aircraft["limits"]["ceiling"]
+
+        self.h_cruise = self.wrap.cruise_alt()["default"] * 1000
+        self.h_start = 1500 * aero.ft
+        self.h_end = 1500 * aero.ft
+
+        self.mach_min = 0.2
+        self.vs_min = -3500 * aero.fpm
+        self.vs_max = 4000 * aero.fpm
+
+        # weight of the penalty on control changes between nodes
+        self.smoothness = 1e-2
+
+        self.ipopt_options = {
+            "ipopt.print_level": 0,
+            "ipopt.max_iter": 1000,
+            "ipopt.tol": 1e-6,
+            "print_time": False,
+        }
+
+        self.solver_stats = None
+        self._nlp = None
+
+    def _dynamics(self):
+        """Construct the single-node dynamics and path constraint functions."""
+        x = ca.SX.sym("x", 3)
+        u = ca.SX.sym("u", 2)
+
+        h, mass = x[1], x[2]
+        mach, vs = u[0], u[1]
+
+        tas = aero.mach2tas(mach, h)
+        tas_kt = tas / aero.kts
+        alt_ft = h / aero.ft
+        vs_fpm = vs / aero.fpm
+
+        gamma = ca.atan2(vs, tas)
+        D = self.drag.clean(mass, tas_kt, alt_ft, vs_fpm)
+        T = D + mass * aero.g0 * ca.sin(gamma)
+
+        ff = self.fuelflow.at_thrust(T, alt_ft, limit=False)
+        T_max = self.thrust.climb(tas_kt, alt_ft, vs_fpm)
+        T_idle = self.thrust.descent_idle(tas_kt, alt_ft)
+        cas = aero.tas2cas(tas, h)
+
+        dx = ca.vertcat(tas, vs, -ff)
+        g = ca.vertcat(
+            (T_max - T) / 1e4,
+            (T - T_idle) / 1e4,
+            (self.vmo * aero.kts - cas) / 10,
+        )
+
+        f_dyn = ca.Function("dynamics", [x, u], [dx])
+        f_path = ca.Function("path", [x, u], [g, ff, T])
+        return f_dyn, f_path
+
+    def _build(self):
+        """Transcribe the optimal control problem into an NLP."""
+        n = self.n_nodes
+
+        f_dyn, f_path = self._dynamics()
+        f_dyn_map = f_dyn.map(n + 1)
+        f_path_map = f_path.map(n + 1)
+
+        Xs = ca.MX.sym("X", 3, n + 1)
+        Us = ca.MX.sym("U", 2, n + 1)
+        tfs = ca.MX.sym("tf")
+        ci = ca.MX.sym("ci")
+
+        X = Xs * self.x_scale
+        U = Us * self.u_scale
+        tf = tfs * self.t_scale
+        dt = tf / n
+
+        F = f_dyn_map(X, U)
+        defects = X[:, 1:] - X[:, :-1] - dt / 2 * (F[:, 1:] + F[:, :-1])
+        defects = defects / self.x_scale
+
+        G, ff, T = f_path_map(X, U)
+
+        fuel = X[2, 0] - X[2, -1]
+        dU = Us[:, 1:] - Us[:, :-1]
+        J = fuel + ci * tf / 60 + self.smoothness * ca.sumsqr(dU) * n
+
+        w = ca.vertcat(ca.vec(Xs), ca.vec(Us), tfs)
+        g = ca.vertcat(ca.vec(defects), ca.vec(G))
+
+        nlp = {"x": w, "f": J / 100, "g": g, "p": ci}
+        solver = ca.nlpsol("solver", "ipopt", nlp, self.ipopt_options)
+
+        outputs = ca.Function("outputs", [w], [X, U, tf, ff, T])
+
+        lbg = np.concatenate([np.zeros(3 * n), np.zeros(3 * (n + 1))])
+        ubg = np.concatenate([np.zeros(3 * n), np.full(3 * (n + 1), np.inf)])
+
+        self._nlp = dict(solver=solver, outputs=outputs, lbg=lbg, ubg=ubg, n=n)
+
+    def _bounds(self, m0):
+        """Compute the bounds of states, controls, and final time.
+
+        Returns:
+            tuple: (lbx, ubx, lbu, ubu) with shape (3, n+1) and (2, n+1).
+
+        """
+        n = self.n_nodes
+
+        lbx = np.tile([[0], [0], [self.oew]], n + 1).astype(float)
+        ubx = np.tile([[np.inf], [self.ceiling], [self.mtow]], n + 1).astype(float)
+        lbu = np.tile([[self.mach_min], [self.vs_min]], n + 1).astype(float)
+        ubu = np.tile([[self.mmo], [self.vs_max]], n + 1).astype(float)
+
+        # initial position and mass
+        lbx[0, 0] = ubx[0, 0] = 0
+        lbx[2, 0] = ubx[2, 0] = m0
+
+        return lbx, ubx, lbu, ubu
+
+    def _boundary_conditions(self, lbx, ubx, lbu, ubu, range_m):
+        raise NotImplementedError
+
+    def _reference(self, **kwargs):
+        """Generate the reference trajectory from the WRAP-based generator."""
+        raise NotImplementedError
+
+    def initial_guess(self, m0, range_m=None, **kwargs):
+        """Construct the warm start from a FlightGenerator profile.
+
+        Args:
+            m0 (float): Initial mass (kg).
+            range_m (float): Flight range (m).
+
+        Returns:
+            pandas.DataFrame: Trajectory resampled at the collocation nodes.
+
+        """
+        n = self.n_nodes
+
+        df = self._reference(range_m=range_m, **kwargs)
+
+        t = df.t.values - df.t.values[0]
+        tn = np.linspace(0, t[-1], n + 1)
+
+        s = np.interp(tn, t, df.s.values - df.s.values[0])
+        h = np.interp(tn, t, df.h.values)
+        v = np.interp(tn, t, df.v.values)
+        vs = np.interp(tn, t, df.vs.values)
+
+        if range_m is not None and s[-1] > 0:
+            # stretch the reference to the requested range at the same speeds
+            ratio = range_m / s[-1]
+            s = s * ratio
+            tn = tn * ratio
+
+        h = np.clip(h, 0, self.ceiling)
+        mach = np.clip(np_aero.tas2mach(v, h), self.mach_min, self.mmo)
+
+        fuelflow = NumpyFuelFlow(self.actype, self.engtype)
+        ff = fuelflow.enroute(m0, v / np_aero.kts, h / np_aero.ft, vs / np_aero.fpm)
+        fuel = np.concatenate([[0], np.cumsum((ff[1:] + ff[:-1]) / 2 * np.diff(tn))])
+        mass = np.clip(m0 - fuel, self.oew, self.mtow)
+
+        return pd.DataFrame(dict(t=tn, s=s, h=h, mass=mass, mach=mach, vs=vs))
+
+    def trajectory(self, m0=None, range_m=None, objective="fuel", ci=0, **kwargs):
+        """Compute the optimal trajectory.
+
+        Args:
+            m0 (float): Initial mass (kg). Values not larger than 1 are
+                considered as fraction of MTOW. Defaults to 85% of MTOW.
+            range_m (float): Flight range (m). Required for cruise and complete
+                flights.
+            objective (str): "fuel" to minimize fuel, or "ci" to minimize
+                the cost index weighted sum of fuel and time.
+            ci (float): Cost index (kg/min), used when objective is "ci".
+
+        Returns:
+            pandas.DataFrame: Optimal trajectory.
+
+        """
+        if m0 is None:
+            m0 = 0.85 * self.mtow
+        elif m0 <= 1:
+            m0 = m0 * self.mtow
+
+        if objective == "fuel":
+            ci = 0
+        elif objective != "ci":
+            raise ValueError(f"Objective {objective} not supported.")
+
+        if self._nlp is None or self._nlp["n"] != self.n_nodes:
+            self._build()
+
+        lbx, ubx, lbu, ubu = self._bounds(m0)
+        self._boundary_conditions(lbx, ubx, lbu, ubu, range_m)
+
+        df0 = self.initial_guess(m0, range_m, **kwargs)
+        x0 = np.vstack([df0.s, df0.h, df0.mass])
+        x0 = np.clip(x0, lbx, ubx)
+        u0 = np.clip(np.vstack([df0.mach, df0.vs]), lbu, ubu)
+
+        xs = self.x_scale[:, None]
+        us = self.u_scale[:, None]
+
+        tf0 = df0.t.iloc[-1]
+        w0 = np.concatenate(
+            [(x0 / xs).ravel("F"), (u0 / us).ravel("F"), [tf0 / self.t_scale]]
+        )
+        lbw = np.concatenate(
+            [(lbx / xs).ravel("F"), (lbu / us).ravel("F"), [60 / self.t_scale]]
+        )
+        ubw = np.concatenate(
+            [(ubx / xs).ravel("F"), (ubu / us).ravel("F"), [24 * 3600 / self.t_scale]]
+        )
+
+        solver = self._nlp["solver"]
+        res = solver(
+            x0=w0, lbx=lbw, ubx=ubw, lbg=self._nlp["lbg"], ubg=self._nlp["ubg"], p=ci
+        )
+        self.solver_stats = solver.stats()
+
+        X, U, tf, ff, T = self._nlp["outputs"](res["x"])
+        X, U = np.array(X), np.array(U)
+        t = np.linspace(0, float(tf), self.n_nodes + 1)
+
+        s, h, mass = X
+        mach, vs = U
+        v = np_aero.mach2tas(mach, h)
+
+        df = pd.DataFrame(
+            dict(
+                t=t,
+                s=s,
+                h=h,
+                v=v,
+                vs=vs,
+                mach=mach,
+                mass=mass,
+                fuel_flow=np.array(ff).ravel(),
+                thrust=np.array(T).ravel(),
+            )
+        ).assign(
+            altitude=lambda x: x.h / aero.ft,
+            vertical_rate=lambda x: x.vs / aero.fpm,
+            tas=lambda x: x.v / aero.kts,
+            cas=lambda x: np_aero.tas2cas(x.v, x.h) / aero.kts,
+        )
+
+        return df
+
+
+class Cruise(Base):
+    """Optimize the cruise phase for a given range."""
+
+    def __init__(self, actype, engtype=None, n_nodes=40, **kwargs):
+        super().__init__(actype, engtype, n_nodes, **kwargs)
+        self.mach_min = 0.5
+        self.vs_min = -500 * aero.fpm
+        self.vs_max = 500 * aero.fpm
+
+    def _boundary_conditions(self, lbx, ubx, lbu, ubu, range_m):
+        if range_m is None:
+            raise ValueError("Cruise range is required.")
+
+        lbx[1, :] = self.wrap.cruise_alt()["minimum"] * 1000
+        lbx[0, -1] = ubx[0, -1] = range_m
+
+    def _reference(self, range_m=None, **kwargs):
+        return FlightGenerator(self.actype).cruise(
+            dt=60, range_cr=range_m / 1000, alt_cr=self.h_cruise / aero.ft, **kwargs
+        )
+
+
+class Climb(Base):
+    """Optimize the climb from the start altitude to the cruise altitude."""
+
+    def _boundary_conditions(self, lbx, ubx, lbu, ubu, range_m):
+        lbu[1, :] = 0
+        lbx[1, 0] = ubx[1, 0] = self.h_start
+        lbx[1, -1] = ubx[1, -1] = self.h_cruise
+
+    def _reference(self, range_m=None, **kwargs):
+        df = FlightGenerator(self.actype).climb(
+            dt=10, alt_cr=self.h_cruise / aero.ft, **kwargs
+        )
+        return df.query("h>=@self.h_start and seg!='CR'")
+
+    def trajectory(self, m0=None, range_m=None, objective="fuel", ci=0, **kwargs):
+        # the climb distance is not constrained, the reference is not stretched
+        return super().trajectory(m0, None, objective, ci, **kwargs)
+
+
+class Descent(Base):
+    """Optimize the descent from the cruise altitude to the end altitude."""
+
+    def _boundary_conditions(self, lbx, ubx, lbu, ubu, range_m):
+        ubu[1, :] = 0
+        lbx[1, 0] = ubx[1, 0] = self.h_cruise
+        lbx[1, -1] = ubx[1, -1] = self.h_end
+
+    def _reference(self, range_m=None, **kwargs):
+        df = FlightGenerator(self.actype).descent(
+            dt=10, alt_cr=self.h_cruise / aero.ft, withcr=False, **kwargs
+        )
+        return df.query("h>=@self.h_end")
+
+    def trajectory(self, m0=None, range_m=None, objective="fuel", ci=0, **kwargs):
+        # the descent distance is not constrained, the reference is not stretched
+        return super().trajectory(m0, None, objective, ci, **kwargs)
+
+
+class CompleteFlight(Base):
+    """Optimize a complete flight (climb, cruise, and descent) for a range."""
+
+    def _boundary_conditions(self, lbx, ubx, lbu, ubu, range_m):
+        if range_m is None:
+            raise ValueError("Flight range is required.")
+
+        lbx[1, 0] = ubx[1, 0] = self.h_start
+        lbx[1, -1] = ubx[1, -1] = self.h_end
+        lbx[0, -1] = ubx[0, -1] = range_m
+
+    def _reference(self, range_m=None, **kwargs):
+        df = FlightGenerator(self.actype).complete(
+            dt=10, alt_cr=self.h_cruise / aero.ft, **kwargs
+        )
+        hmin = min(self.h_start, self.h_end)
+        i0, i1 = np.where(df.h.values >= hmin)[0][[0, -1]]
+        return df.iloc[i0 : i1 + 1]
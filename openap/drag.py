@@ -2,6 +2,7 @@
 
 import glob
 import importlib
+import math
 import os
 import warnings
 
@@ -11,9 +12,7 @@ import pandas as pd
 
 from . import prop
 from .base import DragBase
-from .extra import ndarrayconvert
-
-warnings.simplefilter("once", UserWarning)
+from .extra import aero, ndarrayconvert
 
 
 class Drag(DragBase):
@@ -39,6 +38,44 @@ class Drag(DragBase):
         if self.wave_drag:
             warnings.warn("Warning: Wave drag is experimental.")
 
+        # terms of the non-clean drag which do not depend on the configuration
+        wing, mtow = self.aircraft["wing"], self.aircraft["limits"]["MTOW"]
+        flaps = self.polar["flaps"]
+
+        self._ar = wing["span"] ** 2 / wing["area"]
+
+        # Equation 3.45-3.46 in McCormick (1994), page 109, without the angle
+        self._flap_factor = flaps["lambda_f"] * flaps["cf/c"] ** 1.38 * flaps["Sf/S"]
+
+        # Equation 6.1 in Mair and Birdsall (1996)
+        # 3.16e-5 is the K_uc factor value corresponding to
+        # maximum flap deflection
+        self._delta_cd_gear = (
+            mtow * aero.g0 / wing["area"] * 3.16e-5 * mtow ** (-0.215)
+        )
+
+        if self.aircraft["engine"]["mount"] == "rear":
+            # See Figure 27.38 in Obert (2009)
+            self._delta_e_flap = 0.0046
+        else:
+            # See Figure 27.39 in Obert (2009)
+            self._delta_e_flap = 0.0026
+
+        # geometry terms of the critical mach number of the wave drag
+        tc = wing["t/c"]
+
+        # Default thickness to chord ratio, based on Obert (2009)
+        if tc is None:
+            tc = 0.12
+
+        cos_sweep = math.cos(math.radians(wing["sweep"]))
+
+        kappa = 0.95  # assume supercritical airfoils
+
+        # Equation 17 and 18 in Gur et al. (2010), without the lift coefficient
+        self._mach_crit0 = kappa / cos_sweep - tc / cos_sweep**2 - 0.108
+        self._mach_crit_cl = 0.1 / cos_sweep**3
+
     def load_drag_model(self):
         """Find and construct the drag polar model.
 
@@ -81,28 +118,71 @@ class Drag(DragBase):
             dragpolar = yaml.safe_load(file.read())
         return dragpolar
 
-    @ndarrayconvert
-    def _cl(self, mass, tas, alt, vs=0):
+    def _calc_drag(self, mass, tas, alt, cd0, k, vs, wave=None):
+        """Drag of a polar (cd0, k), computed in a single pass.
+
+        Args:
+            wave (bool or ndarray): Whether the wave drag is applied, for all
+                points or for each point. Defaults to None, without wave drag.
+
+        """
         v = tas * self.aero.kts
         h = alt * self.aero.ft
-        vs = vs * self.aero.fpm
-        gamma = self.sci.arctan2(vs, v)
-        S = self.aircraft["wing"]["area"]
-        rho = self.aero.density(h)
-        qS = 0.5 * rho * v**2 * S
-        L = mass * self.aero.g0 * self.sci.cos(gamma)
+        gamma = self.sci.arctan2(vs * self.aero.fpm, v)
+
+        if wave is None:
+            rho = self.aero.density(h)
+        else:
+            # density and temperature from a single atmosphere evaluation
+            _, rho, T = self.aero.atmos(h)
+
+        qS = 0.5 * rho * v**2 * self.aircraft["wing"]["area"]
         qS = self.sci.maximum(qS, 1e-3)  # avoid zero division
-        cl = L / qS
+        cl = mass * self.aero.g0 * self.sci.cos(gamma) / qS
 
-        return cl, qS
+        if wave is not None:
+            # critical mach with the lift coefficient in level flight
+            mach = v / self.sci.sqrt(self.aero.gamma * self.aero.R * T)
+            cl_level = mass * self.aero.g0 / qS
+
+            # Equation 17 and 18 in Gur et al. (2010) - for conventional airfoil
+            mach_crit = self._mach_crit0 - self._mach_crit_cl * cl_level
+
+            # Equation 15 in Gur et al. (2010)
+            dmach = self.sci.maximum(mach - mach_crit, 0.0)
+            dcd_wave = 20 * dmach**4
+            if wave is not True:
+                dcd_wave = self.sci.where(wave, dcd_wave, 0)
+            cd0 = cd0 + dcd_wave
 
-    @ndarrayconvert
-    def _calc_drag(self, mass, tas, alt, cd0, k, vs):
-        cl, qS = self._cl(mass, tas, alt, vs)
         cd = cd0 + k * cl**2
         D = cd * qS
         return D
 
+    def _nonclean_polar(self, flap_angle, landing_gear):
+        """Drag polar (cd0, k) with flaps and landing gear extended."""
+        cd0 = self.polar["clean"]["cd0"]
+        k = self.polar["clean"]["k"]
+
+        # --- calc new CD0 ---
+        # Equation 3.45-3.46 in McCormick (1994), page 109.
+        delta_cd_flap = (
+            self._flap_factor * self.sci.sin(flap_angle * self.sci.pi / 180) ** 2
+        )
+
+        # the gear increment is masked by the landing gear state of each point
+        delta_cd = self.sci.where(
+            landing_gear, delta_cd_flap + self._delta_cd_gear, delta_cd_flap
+        )
+
+        cd0_total = cd0 + delta_cd
+
+        # --- calc new k ---
+        delta_e_flap = self._delta_e_flap * flap_angle
+        k_total = 1 / (1 / k + self.sci.pi * self._ar * delta_e_flap)
+
+        return cd0_total, k_total
+
     @ndarrayconvert
     def clean(self, mass, tas, alt, vs=0):
         """Compute drag at clean configuration (considering compressibility).
@@ -121,36 +201,9 @@ class Drag(DragBase):
         cd0 = self.polar["clean"]["cd0"]
         k = self.polar["clean"]["k"]
 
-        if self.wave_drag:
-            mach = self.aero.tas2mach(tas * self.aero.kts, alt * self.aero.ft)
-            cl, qS = self._cl(mass, tas, alt)
-
-            sweep = self.aircraft["wing"]["sweep"] * self.sci.pi / 180
-            tc = self.aircraft["wing"]["t/c"]
-
-            # Default thickness to chord ratio, based on Obert (2009)
-            if tc is None:
-                tc = 0.12
-
-            cos_sweep = self.sci.cos(sweep)
-
-            kappa = 0.95  # assume supercritical airfoils
-
-            # Equation 17 and 18 in Gur et al. (2010) - for conventional airfoil
-            mach_crit = (
-                kappa / cos_sweep - tc / cos_sweep**2 - 0.1 * cl / cos_sweep**3 - 0.108
-            )
-
-            # Equation 15 in Gur et al. (2010)
-            dmach = self.sci.maximum(mach - mach_crit, 0.0)
-            dCdw = 20 * dmach**4
+        wave = True if self.wave_drag else None
 
-        else:
-            dCdw = 0
-
-        cd0 = cd0 + dCdw
-
-        D = self._calc_drag(mass, tas, alt, cd0, k, vs)
+        D = self._calc_drag(mass, tas, alt, cd0, k, vs, wave)
         return D
 
     @ndarrayconvert
@@ -163,54 +216,55 @@ class Drag(DragBase):
             alt (int or ndarray): Altitude (unit: ft).
             flap_angle (int or ndarray): flap deflection angle (unit: degree).
             vs (float or ndarray): Vertical rate (unit: feet/min). Defaults to 0.
-            landing_gear (bool): Is landing gear extended? Defaults to False.
+            landing_gear (bool or ndarray): Is landing gear extended? Can be
+                given for each point. Defaults to False.
 
         Returns:
             int or ndarray: Total drag (unit: N).
 
         """
-        cd0 = self.polar["clean"]["cd0"]
-        k = self.polar["clean"]["k"]
+        cd0_total, k_total = self._nonclean_polar(flap_angle, landing_gear)
 
-        # --- calc new CD0 ---
-        lambda_f = self.polar["flaps"]["lambda_f"]
-        cfc = self.polar["flaps"]["cf/c"]
-        SfS = self.polar["flaps"]["Sf/S"]
+        D = self._calc_drag(mass, tas, alt, cd0_total, k_total, vs)
+        return D
 
-        # Equation 3.45-3.46 in McCormick (1994), page 109.
-        delta_cd_flap = (
-            lambda_f
-            * (cfc) ** 1.38
-            * (SfS)
-            * self.sci.sin(flap_angle * self.sci.pi / 180) ** 2
-        )
+    @ndarrayconvert
+    def evaluate(
+        self, mass, tas, alt, vs=0, flap_angle=0, landing_gear=False, config=None
+    ):
+        """Compute drag at clean and non-clean configurations, in one pass.
 
-        if landing_gear:
-            # Equation 6.1 in Mair and Birdsall (1996)
-            # 3.16e-5 is the K_uc factor value corresponding to
-            # maximum flap deflection
-            delta_cd_gear = (
-                self.aircraft["limits"]["MTOW"]
-                * self.aero.g0
-                / self.aircraft["wing"]["area"]
-                * 3.16e-5
-                * self.aircraft["limits"]["MTOW"] ** (-0.215)
-            )
-        else:
-            delta_cd_gear = 0
+        Clean points are computed as in clean(), with the wave drag if it is
+        enabled, and non-clean points as in nonclean().
 
-        cd0_total = cd0 + delta_cd_flap + delta_cd_gear
+        Args:
+            mass (int or ndarray): Mass of the aircraft (unit: kg).
+            tas (int or ndarray): True airspeed (unit: kt).
+            alt (int or ndarray): Altitude (unit: ft).
+            vs (float or ndarray): Vertical rate (unit: feet/min). Defaults to 0.
+            flap_angle (int or ndarray): flap deflection angle (unit: degree).
+                Defaults to 0.
+            landing_gear (bool or ndarray): Is landing gear extended?
+                Defaults to False.
+            config (bool or ndarray): Is the aircraft in non-clean
+                configuration? Defaults to the points with flaps or landing
+                gear extended.
 
-        # --- calc new k ---
-        if self.aircraft["engine"]["mount"] == "rear":
-            # See Figure 27.38 in Obert (2009)
-            delta_e_flap = 0.0046 * flap_angle
-        else:
-            # See Figure 27.39 in Obert (2009)
-            delta_e_flap = 0.0026 * flap_angle
+        Returns:
+            int or ndarray: Total drag (unit: N).
 
-        ar = self.aircraft["wing"]["span"] ** 2 / self.aircraft["wing"]["area"]
-        k_total = 1 / (1 / k + self.sci.pi * ar * delta_e_flap)
+        """
+        if config is None:
+            config = self.sci.abs(flap_angle) + landing_gear > 0
 
-        D = self._calc_drag(mass, tas, alt, cd0_total, k_total, vs)
+        cd0, k = self.polar["clean"]["cd0"], self.polar["clean"]["k"]
+
+        cd0_nonclean, k_nonclean = self._nonclean_polar(flap_angle, landing_gear)
+        cd0 = self.sci.where(config, cd0_nonclean, cd0)
+        k = self.sci.where(config, k_nonclean, k)
+
+        # the wave drag only applies to the clean points
+        wave = (config == 0) if self.wave_drag else None
+
+        D = self._calc_drag(mass, tas, alt, cd0, k, vs, wave)
         return D
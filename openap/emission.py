@@ -2,9 +2,23 @@
 
 import importlib
 
+import numpy as np
 from openap import prop
 from openap.extra import ndarrayconvert
 
+# ICAO engine modes: idle, approach, climb out and takeoff
+MODES = ("idl", "app", "co", "to")
+
+# exponents of the sea-level equivalent fuel flow and emission indices,
+# also used by the compiled version of the model in openap.kernels
+THETA_EXP = 3.3
+DELTA_EXP = 1.02
+FF_THETA_EXP = 3.8
+
+# humidity correction of the NOx emission index
+NOX_OMEGA = (1e-3, -0.0001426, 12900)
+NOX_HUMIDITY = (-19, 0.00634)
+
 
 class Emission(object):
     """Emission model based on ICAO emmision databank."""
@@ -19,12 +33,13 @@ class Emission(object):
                 by in the aircraft database.
 
         """
-        if not hasattr(self, "np"):
+        if not hasattr(self, "sci"):
             self.sci = importlib.import_module("numpy")
 
         if not hasattr(self, "aero"):
             self.aero = importlib.import_module("openap").aero
 
+        self.dtype = kwargs.get("dtype")
         self.ac = prop.aircraft(ac, **kwargs)
         self.n_eng = self.ac["engine"]["number"]
 
@@ -39,12 +54,43 @@ class Emission(object):
         beta = self.sci.exp(0.2 * (M**2))
         theta = (self.aero.temperature(alt * self.aero.ft) / 288.15) / beta
         delta = (1 - 0.0019812 * alt / 288.15) ** 5.255876 / self.sci.power(beta, 3.5)
-        ratio = (theta**3.3) / (delta**1.02)
+        ratio = (theta**THETA_EXP) / (delta**DELTA_EXP)
         # TODO: Where does this equation come from?
-        ff_sl = (ffac / self.n_eng) * theta**3.8 / delta * beta
+        ff_sl = (ffac / self.n_eng) * theta**FF_THETA_EXP / delta * beta
 
         return ff_sl, ratio
 
+    def _modes(self, species):
+        """Fuel flow (kg/s) and emission index (g/kg) of the engine modes"""
+        xp = [self.engine[f"ff_{mode}"] for mode in MODES]
+        fp = [self.engine[f"ei_{species}_{mode}"] for mode in MODES]
+        return xp, fp
+
+    def _ei_sl(self, ff_sl, species):
+        """Interpolate the sea-level emission index (g/kg) of a species"""
+        xp, fp = self._modes(species)
+
+        if np.ndim(xp[0]) > 0:
+            # modes of several engines, as arrays broadcast against ff_sl
+            ei_sl = self._interp_nodes(ff_sl, xp, fp)
+        else:
+            ei_sl = self.sci.interp(ff_sl, xp, fp)
+
+        # numpy.interp always computes in float64, keep the input precision
+        if isinstance(ff_sl, np.ndarray):
+            ei_sl = ei_sl.astype(ff_sl.dtype, copy=False)
+
+        return ei_sl
+
+    def _interp_nodes(self, x, xp, fp):
+        """Piecewise linear interpolation as numpy.interp(), with array nodes"""
+        ei = self.sci.where(x <= xp[0], fp[0], fp[-1])
+        for i in range(1, len(xp)):
+            w = (x - xp[i - 1]) / self.sci.maximum(xp[i] - xp[i - 1], 1e-12)
+            y = fp[i - 1] + (fp[i] - fp[i - 1]) * w
+            ei = self.sci.where((x > xp[i - 1]) & (x <= xp[i]), y, ei)
+        return ei
+
     @ndarrayconvert
     def co2(self, ffac):
         """Compute CO2 emission with given fuel flow.
@@ -116,28 +162,18 @@ class Emission(object):
         """
         ff_sl, ratio = self._fl2sl(ffac, tas, alt)
 
-        nox_sl = self.sci.interp(
-            ff_sl,
-            [
-                self.engine["ff_idl"],
-                self.engine["ff_app"],
-                self.engine["ff_co"],
-                self.engine["ff_to"],
-            ],
-            [
-                self.engine["ei_nox_idl"],
-                self.engine["ei_nox_app"],
-                self.engine["ei_nox_co"],
-                self.engine["ei_nox_to"],
-            ],
-        )
+        nox_sl = self._ei_sl(ff_sl, "nox")
 
         # convert back to actual flight level
-        omega = 10 ** (-3) * self.sci.exp(-0.0001426 * (alt - 12900))
+        scale, rate, alt_ref = NOX_OMEGA
+        omega = scale * self.sci.exp(rate * (alt - alt_ref))
 
         # TODO: source
+        factor, omega_ref = NOX_HUMIDITY
         nox_fl = (
-            nox_sl * self.sci.sqrt(1 / ratio) * self.sci.exp(-19 * (omega - 0.00634))
+            nox_sl
+            * self.sci.sqrt(1 / ratio)
+            * self.sci.exp(factor * (omega - omega_ref))
         )
 
         # convert g/(kg fuel) to g/s for all engines
@@ -159,21 +195,7 @@ class Emission(object):
         """
         ff_sl, ratio = self._fl2sl(ffac, tas, alt)
 
-        co_sl = self.sci.interp(
-            ff_sl,
-            [
-                self.engine["ff_idl"],
-                self.engine["ff_app"],
-                self.engine["ff_co"],
-                self.engine["ff_to"],
-            ],
-            [
-                self.engine["ei_co_idl"],
-                self.engine["ei_co_app"],
-                self.engine["ei_co_co"],
-                self.engine["ei_co_to"],
-            ],
-        )
+        co_sl = self._ei_sl(ff_sl, "co")
 
         # TODO: source
         # convert back to actual flight level
@@ -198,21 +220,7 @@ class Emission(object):
         """
         ff_sl, ratio = self._fl2sl(ffac, tas, alt)
 
-        hc_sl = self.sci.interp(
-            ff_sl,
-            [
-                self.engine["ff_idl"],
-                self.engine["ff_app"],
-                self.engine["ff_co"],
-                self.engine["ff_to"],
-            ],
-            [
-                self.engine["ei_hc_idl"],
-                self.engine["ei_hc_app"],
-                self.engine["ei_hc_co"],
-                self.engine["ei_hc_to"],
-            ],
-        )
+        hc_sl = self._ei_sl(ff_sl, "hc")
         # TODO: source
         # convert back to actual flight level
         hc_fl = hc_sl * ratio
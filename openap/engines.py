@@ -0,0 +1,103 @@
+"""Evaluation of the models for all engine options of an aircraft type.
+
+The parameters of the engine options (maximum and cruise thrust, bypass
+ratio, cruise mach, fuel flow and emission indices at the ICAO modes) are
+stacked in arrays of shape (n_engines, 1), and broadcast against the inputs
+of shape (n_points,) through the formulas of the models, so that a trajectory
+is evaluated for all engines in one call::
+
+    from openap.engines import EngineOptions
+
+    options = EngineOptions("A320")
+    ff = options.fuelflow.enroute(mass, tas, alt, vs)  # (n_engines, n_points)
+    nox = options.emission.nox(ff, tas, alt)  # (n_engines, n_points)
+    options.engines  # names of the engines, in the order of the rows
+
+The fuelflow, thrust and emission attributes are the usual models, with their
+engine parameters replaced by the arrays, so that their methods can be used,
+except FuelFlow.mass_from_fuel(), which raises a ValueError. Inputs of higher
+dimensions must have a trailing axis of size 1.
+
+"""
+
+import numpy as np
+
+from . import prop
+from .emission import Emission
+from .fuel import FuelFlow
+
+# thrust parameters which depend on the engine, see Thrust.__init__()
+THRUST_PARAMS = ("eng_bpr", "eng_max_thrust", "cruise_mach", "eng_cruise_thrust")
+
+
+class EngineOptions:
+    """Fuel flow, thrust and emission models for all engines of an aircraft."""
+
+    def __init__(self, ac, engines=None, **kwargs):
+        """Initialize the models of the engine options.
+
+        Args:
+            ac (string): ICAO aircraft type (for example: A320).
+            engines (list): Engine types. Defaults to the engine options of
+                the aircraft, without the ones missing in the engine database.
+            **kwargs: Passed to FuelFlow and Emission, for example
+                ``use_synonym=True``.
+
+        """
+        fuelflows, emissions = [], []
+        self.engines = []
+
+        names = engines
+        if names is None:
+            names = dict.fromkeys(prop.aircraft_engine_options(ac))
+
+        for eng in names:
+            try:
+                fuelflow = FuelFlow(ac, eng, **kwargs)
+                emission = Emission(ac, eng, **kwargs)
+            except ValueError:
+                if engines is not None:
+                    raise
+                continue
+            self.engines.append(eng)
+            fuelflows.append(fuelflow)
+            emissions.append(emission)
+
+        if not self.engines:
+            raise ValueError(f"No engine data available for {ac}.")
+
+        def stack(values):
+            return np.array(values, dtype=float)[:, None]
+
+        # the models of the first engine hold the parameters of all engines
+        self.fuelflow, self.emission = fuelflows[0], emissions[0]
+        self.thrust = self.fuelflow.thrust
+
+        for name in (*THRUST_PARAMS, "_vcas_ref"):
+            values = [getattr(f.thrust, name) for f in fuelflows]
+            setattr(self.thrust, name, stack(values))
+
+        # the engine dictionaries are cached by prop, and must not be modified
+        self.fuelflow.engine = dict(
+            self.fuelflow.engine,
+            max_thrust=stack([f.engine["max_thrust"] for f in fuelflows]),
+        )
+
+        c1, c2, c3, _ = self.fuelflow.fuel_coef
+        scale = stack([f.fuel_coef[3] for f in fuelflows])
+        self.fuelflow.fuel_coef = (c1, c2, c3, scale)
+        self.fuelflow.func_fuel = self.fuelflow._fuel_function(c1, c2, c3, scale)
+
+        self.emission.engine = dict(
+            self.emission.engine,
+            **{
+                key: stack([e.engine[key] for e in emissions])
+                for key in self.emission.engine
+                if key.startswith(("ff_", "ei_"))
+            },
+        )
+
+    @property
+    def n_engines(self):
+        """Number of engine options."""
+        return len(self.engines)
@@ -0,0 +1,421 @@
+"""Allocation-free evaluation of the models on fixed-size batches.
+
+The Evaluator holds scratch buffers sized to the batch, so that repeated
+evaluations, for example at every tick of a traffic simulation, do not
+allocate new arrays. It computes the same clean drag, climb and idle thrust,
+and enroute fuel flow as the Drag, Thrust and FuelFlow models, in place with
+numpy ufuncs.
+
+Examples::
+
+    evaluator = Evaluator("A320", n=1000)
+
+    out = np.empty(1000)
+    for tick in simulation:
+        evaluator.fuelflow(mass, tas, alt, vs, out=out)
+
+Unless an ``out`` array is given, the result is written to an internal
+buffer, which is overwritten by the next call of the same method.
+
+"""
+
+import numpy as np
+
+from .extra import aero
+from .fuel import (
+    ACC_MAX,
+    GAMMA_MAX,
+    IDLE_MARGIN,
+    MAX_MARGIN,
+    RATIO_MIN,
+    RATIO_SHARPNESS,
+    FuelFlow,
+)
+from .thrust import (
+    A_EXP,
+    A_FIT,
+    B_EXP,
+    D_FIT,
+    IDLE_RATIO,
+    M_FIT,
+    N_FIT,
+    VRATIO_EXP,
+    X_FIT,
+    Z_FIT,
+)
+
+_BUFFERS = [
+    "v",
+    "h",
+    "p",
+    "rho",
+    "T",
+    "gamma",
+    "qS",
+    "cl",
+    "mach",
+    "vcas",
+    "roc",
+    "pr",
+    "vr",
+    "a",
+    "n",
+    "m",
+    "tmp",
+    "thrust",
+    "t_max",
+    "t_idle",
+    # results of the public methods, one buffer each
+    "drag",
+    "climb_thrust",
+    "idle_thrust",
+    "fuelflow",
+]
+
+
+class Evaluator(object):
+    """Evaluate drag, thrust and fuel flow with preallocated buffers."""
+
+    def __init__(self, ac, n, eng=None, wave_drag=False, **kwargs):
+        """Initialize Evaluator object.
+
+        Args:
+            ac (string): ICAO aircraft type (for example: A320).
+            n (int): Number of elements of the batch.
+            eng (string): Engine type (for example: CFM56-5A3).
+                Leave empty to use the default engine specified
+                by in the aircraft database.
+            wave_drag (bool): enable Wave drag model (experimental).
+            **dtype: Floating point type of the buffers. Defaults to float64.
+
+        """
+        self.fuelflow_model = FuelFlow(ac, eng, wave_drag=wave_drag, **kwargs)
+        self.n = n
+        self.dtype = np.dtype(kwargs.get("dtype") or np.float64)
+
+        # parameters of the models, see FuelFlow._coefficients()
+        self.coef = self.fuelflow_model._coefficients()
+        self.wave_drag = wave_drag
+
+        self._buf = {name: np.empty(n, dtype=self.dtype) for name in _BUFFERS}
+        self._mask = {
+            name: np.empty(n, dtype=bool) for name in ["seg1", "seg2", "seg3", "below"]
+        }
+
+    def _atmos(self, h):
+        """Pressure, density and temperature (ISA) in the p, rho, T buffers."""
+        p, rho, T, tmp = (self._buf[k] for k in ["p", "rho", "T", "tmp"])
+
+        np.multiply(h, aero.beta, out=T)
+        T += aero.T0
+        np.maximum(T, aero.T_trop, out=T)
+
+        np.divide(T, aero.T0, out=rho)
+        np.power(rho, aero.rho_exp, out=rho)
+        rho *= aero.rho0
+
+        np.subtract(h, aero.h_trop, out=tmp)
+        np.maximum(tmp, 0.0, out=tmp)
+        tmp /= -aero.H_strat
+        np.exp(tmp, out=tmp)
+        rho *= tmp
+
+        np.multiply(rho, T, out=p)
+        p *= aero.R
+
+        return p, rho, T
+
+    def _drag(self, mass, vs, out):
+        """Clean drag, with v, h and the atmosphere already in the buffers."""
+        c = self.coef
+        b = self._buf
+        v, rho, gamma, qS, cl, tmp = (
+            b[k] for k in ["v", "rho", "gamma", "qS", "cl", "tmp"]
+        )
+
+        np.multiply(vs, aero.fpm, out=tmp)
+        np.arctan2(tmp, v, out=gamma)
+
+        np.multiply(v, v, out=qS)
+        qS *= rho
+        qS *= 0.5 * c.S
+        np.maximum(qS, 1e-3, out=qS)
+
+        cd = out
+        if self.wave_drag:
+            mach = b["mach"]
+            np.sqrt(b["T"], out=mach)
+            mach *= (aero.gamma * aero.R) ** 0.5
+            np.divide(v, mach, out=mach)
+
+            # the critical Mach number uses the lift coefficient in level flight
+            np.multiply(mass, aero.g0, out=cl)
+            cl /= qS
+            np.multiply(cl, -c.mach_crit_cl, out=tmp)
+            tmp += c.mach_crit0
+            np.subtract(mach, tmp, out=tmp)
+            np.maximum(tmp, 0.0, out=tmp)
+            np.power(tmp, 4, out=cd)
+            cd *= 20
+            cd += c.cd0
+        else:
+            cd.fill(c.cd0)
+
+        np.cos(gamma, out=cl)
+        cl *= mass
+        cl *= aero.g0
+        cl /= qS
+
+        np.multiply(cl, cl, out=tmp)
+        tmp *= c.k
+        cd += tmp
+        np.multiply(cd, qS, out=out)
+        return out
+
+    def _climb_thrust(self, tas, alt, roc, out):
+        """Climb thrust, computing each altitude segment only where it applies."""
+        c = self.coef
+        b = self._buf
+        v, h, mach, vcas, pr, vr, a, n, m, tmp = (
+            b[k] for k in ["v", "h", "mach", "vcas", "pr", "vr", "a", "n", "m", "tmp"]
+        )
+        seg1, seg2, seg3, below = (
+            self._mask[k] for k in ["seg1", "seg2", "seg3", "below"]
+        )
+
+        np.maximum(tas, 10, out=v)
+        v *= aero.kts
+        np.multiply(alt, aero.ft, out=h)
+        p, rho, T = self._atmos(h)
+
+        # Mach number
+        np.sqrt(T, out=mach)
+        mach *= (aero.gamma * aero.R) ** 0.5
+        np.divide(v, mach, out=mach)
+
+        # calibrated airspeed, see aero.tas2cas()
+        np.multiply(v, v, out=vcas)
+        vcas *= rho
+        vcas /= 7.0
+        vcas /= p
+        vcas += 1.0
+        np.power(vcas, 3.5, out=vcas)
+        vcas -= 1.0
+        vcas *= p
+        vcas /= aero.p0
+        vcas += 1.0
+        np.power(vcas, 2.0 / 7.0, out=vcas)
+        vcas -= 1.0
+        vcas *= 7.0 * aero.p0 / aero.rho0
+        np.sqrt(vcas, out=vcas)
+
+        np.divide(p, c.Pcr, out=pr)
+        np.divide(vcas, c.vcas_ref, out=vr)
+
+        np.greater(alt, 30000, out=seg3)
+        np.logical_not(seg3, out=below)
+        np.greater(alt, 10000, out=seg2)
+        seg2 &= below
+        np.less_equal(alt, 10000, out=seg1)
+
+        # segment 3: alt > 30000, Equations 15 and 16 in Bartel and Young (2008)
+        ratio = out
+        np.divide(mach, c.cruise_mach, out=tmp, where=seg3)
+        np.power(tmp, B_EXP, out=a, where=seg3)
+        np.multiply(tmp, D_FIT[0], out=tmp, where=seg3)
+        np.add(tmp, D_FIT[1], out=tmp, where=seg3)
+        np.log(pr, out=ratio, where=seg3)
+        np.multiply(ratio, tmp, out=ratio, where=seg3)
+        np.add(ratio, a, out=ratio, where=seg3)
+
+        # segments 1 and 2: Equation 17 and 18 in Bartel and Young (2008)
+        np.abs(roc, out=b["roc"])
+        roc = b["roc"]
+        np.multiply(roc, N_FIT[0], out=n, where=below)
+        np.add(n, N_FIT[1], out=n, where=below)
+        np.multiply(vr, VRATIO_EXP, out=tmp, where=below)
+        np.add(tmp, n, out=tmp, where=below)  # exponent of the pressure ratio
+        np.power(vr, A_EXP, out=a, where=below)
+
+        np.power(pr, tmp, out=ratio, where=seg2)
+        np.multiply(ratio, a, out=ratio, where=seg2)
+
+        # segment 1: alt <= 10000, Equation 19 in Bartel and Young (2008)
+        np.power(c.P10 / c.Pcr, tmp, out=tmp, where=seg1)
+        np.multiply(tmp, a, out=tmp, where=seg1)  # F10 / Fcr
+        np.multiply(roc, M_FIT[1], out=m, where=seg1)
+        np.add(m, M_FIT[2], out=m, where=seg1)
+        np.multiply(m, roc, out=m, where=seg1)
+        np.add(m, M_FIT[3], out=m, where=seg1)
+        np.multiply(vr, M_FIT[0], out=a, where=seg1)
+        np.add(m, a, out=m, where=seg1)
+        np.subtract(pr, c.P10 / c.Pcr, out=ratio, where=seg1)
+        np.multiply(ratio, m, out=ratio, where=seg1)
+        np.add(ratio, tmp, out=ratio, where=seg1)
+
+        ratio *= c.cruise_thrust
+        return out
+
+    def _idle_thrust(self, tas, alt, out):
+        """Idle thrust, a fraction of the takeoff thrust, see Thrust.takeoff()."""
+        c = self.coef
+        b = self._buf
+        mach, h, dp, tmp = b["mach"], b["h"], b["pr"], b["tmp"]
+
+        np.multiply(tas, aero.kts / aero.a0, out=mach)
+        np.multiply(alt, aero.ft, out=h)
+        p, _, _ = self._atmos(h)
+        np.divide(p, aero.p0, out=dp)
+
+        # Equations 11 to 14 in Bartel and Young (2008), with Horner's scheme
+        ratio = out
+        np.multiply(dp, A_FIT[0], out=ratio)
+        ratio += A_FIT[1]
+        ratio *= dp
+        ratio += A_FIT[2]
+
+        np.multiply(dp, Z_FIT[0], out=tmp)
+        tmp += Z_FIT[1]
+        tmp *= dp
+        tmp += Z_FIT[2]
+        tmp *= dp
+        tmp *= mach
+        tmp *= c.idle_cz
+        ratio -= tmp
+
+        np.multiply(dp, X_FIT[0], out=tmp)
+        tmp += X_FIT[1]
+        tmp *= dp
+        tmp += X_FIT[2]
+        tmp *= dp
+        tmp *= mach
+        tmp *= mach
+        tmp *= c.idle_cx
+        ratio += tmp
+
+        ratio *= IDLE_RATIO * c.max_thrust
+        return out
+
+    def _at_thrust(self, thrust, limit, out):
+        """Fuel flow at a given thrust, see FuelFlow.at_thrust()."""
+        c = self.coef
+        ratio, tmp = self._buf["pr"], self._buf["tmp"]
+
+        np.divide(thrust, c.max_thrust, out=ratio)
+        ratio -= RATIO_MIN
+        ratio *= RATIO_SHARPNESS
+        np.exp(ratio, out=ratio)
+        ratio += 1
+        np.log(ratio, out=ratio)
+        ratio /= RATIO_SHARPNESS
+        ratio += RATIO_MIN
+
+        if limit:
+            np.minimum(ratio, 1, out=ratio)
+
+        np.multiply(ratio, c.c3, out=tmp)
+        np.exp(tmp, out=tmp)
+        tmp *= ratio
+        tmp -= np.log(c.c1) / c.c2
+        tmp *= -c.c2
+        np.exp(tmp, out=tmp)
+        tmp *= c.scale
+        np.subtract(c.c1, tmp, out=out)
+        return out
+
+    def drag(self, mass, tas, alt, vs=0, out=None):
+        """Compute drag at clean configuration, see Drag.clean().
+
+        Args:
+            mass (ndarray): Mass of the aircraft (unit: kg).
+            tas (ndarray): True airspeed (unit: kt).
+            alt (ndarray): Altitude (unit: ft).
+            vs (float or ndarray): Vertical rate (unit: ft/min). Defaults to 0.
+            out (ndarray): Array of size n to write the result to.
+
+        Returns:
+            ndarray: Total drag (unit: N).
+
+        """
+        out = self._buf["drag"] if out is None else out
+        np.multiply(tas, aero.kts, out=self._buf["v"])
+        np.multiply(alt, aero.ft, out=self._buf["h"])
+        self._atmos(self._buf["h"])
+        return self._drag(mass, vs, out)
+
+    def climb_thrust(self, tas, alt, roc, out=None):
+        """Compute thrust during the climb, see Thrust.climb().
+
+        Args:
+            tas (ndarray): True airspeed (unit: kt).
+            alt (ndarray): Altitude (unit: ft).
+            roc (float or ndarray): Vertical rate (unit: ft/min).
+            out (ndarray): Array of size n to write the result to.
+
+        Returns:
+            ndarray: Total thrust (unit: N).
+
+        """
+        out = self._buf["climb_thrust"] if out is None else out
+        return self._climb_thrust(tas, alt, roc, out)
+
+    def idle_thrust(self, tas, alt, out=None):
+        """Compute idle thrust during the descent, see Thrust.descent_idle().
+
+        Args:
+            tas (ndarray): True airspeed (unit: kt).
+            alt (ndarray): Altitude (unit: ft).
+            out (ndarray): Array of size n to write the result to.
+
+        Returns:
+            ndarray: Total thrust (unit: N).
+
+        """
+        out = self._buf["idle_thrust"] if out is None else out
+        return self._idle_thrust(tas, alt, out)
+
+    def fuelflow(self, mass, tas, alt, vs=0, acc=0, limit=True, out=None):
+        """Compute the fuel flow during climb, cruise, or descent.
+
+        See FuelFlow.enroute() for the model.
+
+        Args:
+            mass (ndarray): Aircraft mass (unit: kg).
+            tas (ndarray): Aircraft true airspeed (unit: kt).
+            alt (ndarray): Aircraft altitude (unit: ft).
+            vs (float or ndarray): Vertical rate (unit: ft/min). Default is 0.
+            acc (float or ndarray): acceleration (unit: m/s^2). Default is 0.
+            limit (bool): Limit the flight path angle, acceleration and
+                thrust to the performance envelope. Default is True.
+            out (ndarray): Array of size n to write the result to.
+
+        Returns:
+            ndarray: Fuel flow (unit: kg/s).
+
+        """
+        b = self._buf
+        out = b["fuelflow"] if out is None else out
+        # thrust is a private scratch buffer, results of drag() stay untouched
+        thrust, tmp, gamma = b["thrust"], b["tmp"], b["gamma"]
+
+        self.drag(mass, tas, alt, vs, out=thrust)
+
+        if limit:
+            np.clip(gamma, -GAMMA_MAX, GAMMA_MAX, out=gamma)
+        np.sin(gamma, out=tmp)
+        tmp *= 9.81
+        if limit:
+            acc = np.clip(acc, -ACC_MAX, ACC_MAX, out=b["a"])
+        tmp += acc
+        tmp *= mass
+        thrust += tmp
+
+        if limit:
+            t_max = self._climb_thrust(tas, alt, 0, b["t_max"])
+            t_idle = self._idle_thrust(tas, alt, b["t_idle"])
+            t_idle *= IDLE_MARGIN
+            t_max *= MAX_MARGIN
+            np.maximum(thrust, t_idle, out=thrust)
+            np.minimum(thrust, t_max, out=thrust)
+
+        return self._at_thrust(thrust, limit, out)
@@ -6,6 +6,7 @@ Functions for aeronautics in this module
 
 International Standard Atmosphere
     p,rho,T = atmos(h)    # atmos as function of geopotential altitude h [m]
+    p,rho,T,a = atmos_all(h)  # atmos and speed of sound [m/s] in one pass
     a = vsound(h)         # speed of sound [m/s] as function of h[m]
     p = pressure(h)       # calls atmos but returns only pressure [Pa]
     T = temperature(h)    # calculates temperature [K]
@@ -44,6 +45,11 @@ beta = -0.0065  # [K/m] ISA temp gradient below tropopause
 r_earth = 6371000.0  # m, average earth radius
 a0 = 340.293988  # m/s, sea level speed of sound ISA, sqrt(gamma*R*T0)
 
+h_trop = 11000.0  # m, tropopause altitude
+T_trop = 216.65  # K, temperature at tropopause (ISA)
+H_strat = 6341.552161  # m, scale height in the stratosphere
+rho_exp = 4.256848030018761  # exponent of the density below the tropopause
+
 
 def atmos(h, dT=0):
     """Compute press, density and temperature at a given altitude.
@@ -57,17 +63,37 @@ def atmos(h, dT=0):
             Air pressure (Pa), density (kg/m3), and temperature (K).
 
     """
-    dT = np.maximum(-15, np.minimum(dT, 15))
+    # clip in the floating point type of h, so float32 altitudes stay float32
+    dtype = np.result_type(np.asarray(h).dtype, np.float16)
+    dT = np.clip(np.asarray(dT, dtype=dtype), -15, 15)
     T0_shift = T0 + dT
 
-    T = np.maximum(T0_shift + beta * h, 216.65 + dT)
-    rhotrop = rho0 * (T / T0_shift) ** 4.256848030018761
-    dhstrat = np.maximum(0.0, h - 11000.0)
-    rho = rhotrop * np.exp(-dhstrat / 6341.552161)
+    T = np.maximum(T0_shift + beta * h, T_trop + dT)
+    rhotrop = rho0 * (T / T0_shift) ** rho_exp
+    dhstrat = np.maximum(0.0, h - h_trop)
+    rho = rhotrop * np.exp(-dhstrat / H_strat)
     p = rho * R * T
     return p, rho, T
 
 
+def atmos_all(h, dT=0):
+    """Compute press, density, temperature and speed of sound in one pass.
+
+    Args:
+        h (float or ndarray): Altitude (in meters).
+        dT (float or ndarray): Temperature shift from ISA (in K).  Defaults to 0.
+
+    Returns:
+        (float, float, float, float) or (ndarray, ndarray, ndarray, ndarray):
+            Air pressure (Pa), density (kg/m3), temperature (K), and speed
+            of sound (m/s).
+
+    """
+    p, rho, T = atmos(h, dT)
+    a = np.sqrt(gamma * R * T)
+    return p, rho, T, a
+
+
 def temperature(h, dT=0):
     """Compute air temperature at a given altitude.
 
@@ -79,7 +105,10 @@ def temperature(h, dT=0):
         float or ndarray: Air temperature (K).
 
     """
-    p, r, T = atmos(h, dT)
+    # only the temperature, without the density of atmos()
+    dtype = np.result_type(np.asarray(h).dtype, np.float16)
+    dT = np.clip(np.asarray(dT, dtype=dtype), -15, 15)
+    T = np.maximum(T0 + dT + beta * h, T_trop + dT)
     return T
 
 
@@ -360,8 +389,10 @@ def mach2cas(mach, h, dT=0):
         float or ndarray: Calibrated airspeed (m/s).
 
     """
-    v_tas = mach2tas(mach, h, dT)
-    v_cas = tas2cas(v_tas, h, dT)
+    p, rho, _, a = atmos_all(h, dT)
+    v_tas = mach * a
+    qdyn = p * ((1.0 + rho * v_tas * v_tas / (7.0 * p)) ** 3.5 - 1.0)
+    v_cas = np.sqrt(7.0 * p0 / rho0 * ((qdyn / p0 + 1.0) ** (2.0 / 7.0) - 1.0))
     return v_cas
 
 
@@ -377,8 +408,10 @@ def cas2mach(v_cas, h, dT=0):
         float or ndarray: Mach number.
 
     """
-    v_tas = cas2tas(v_cas, h, dT)
-    mach = tas2mach(v_tas, h, dT)
+    p, rho, _, a = atmos_all(h, dT)
+    qdyn = p0 * ((1.0 + rho0 * v_cas * v_cas / (7.0 * p0)) ** 3.5 - 1.0)
+    v_tas = np.sqrt(7.0 * p / rho * ((1.0 + qdyn / p) ** (2.0 / 7.0) - 1.0))
+    mach = v_tas / a
     return mach
 
 
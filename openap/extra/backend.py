@@ -0,0 +1,34 @@
+"""Backends of the models, with other implementations of numpy and aero."""
+
+
+def remove_decorator_meta(sci, aero):
+    """Metaclass of the models of a backend, like openap.casadi.
+
+    The decorated methods of the base classes are replaced by the original
+    functions, without the conversion of the arguments to numpy arrays, and
+    the ``sci`` and ``aero`` modules of the backend are set as class
+    attributes.
+
+    Args:
+        sci (module): Replacement of numpy, for example casadi functions.
+        aero (module): Replacement of openap.extra.aero.
+
+    Returns:
+        type: Metaclass of the models.
+
+    """
+
+    class RemoveDecoratorMeta(type):
+        def __new__(cls, name, base, attr_dict):
+            # for all methods in all base classes
+            # reimplement in attr_dict
+            for b in base:
+                for elt in vars(b):
+                    if hasattr(getattr(b, elt), "orig_func"):
+                        attr_dict[elt] = getattr(b, elt).orig_func
+
+            attr_dict["sci"] = sci
+            attr_dict["aero"] = aero
+            return super().__new__(cls, name, base, attr_dict)
+
+    return RemoveDecoratorMeta
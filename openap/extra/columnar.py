@@ -0,0 +1,224 @@
+"""Adapters for columnar data: pyarrow, polars and pandas.
+
+Model methods can be applied directly on pyarrow arrays, polars and pandas
+series. Numeric columns without missing values are passed to the models as
+numpy views of their buffers, without copies, and the results are returned
+in the same container type as the inputs::
+
+    from openap import FuelFlow
+    from openap.extra import columnar
+
+    fuelflow = FuelFlow("A320")
+    table = pyarrow.parquet.read_table("flights.parquet")
+    ff = columnar.apply(fuelflow.enroute, table["mass"], table["tas"], table["alt"])
+
+For data frames, including polars lazy frames, fuel flow can be added as a
+new column::
+
+    df = columnar.with_openap_fuel(df, "A320")
+
+pyarrow and polars are optional dependencies, only needed for their own
+containers.
+
+"""
+
+import numpy as np
+
+from .. import extra
+from ..fuel import FuelFlow
+
+
+def _container(values):
+    """Name of the library of a container, or None for other types."""
+    module = type(values).__module__.split(".")[0]
+    if module in ("pyarrow", "polars", "pandas"):
+        return module
+    return None
+
+
+def to_numpy(values):
+    """Convert a column to a numpy array, without copy when possible.
+
+    Arrays without missing values are zero-copy views of the buffers of
+    pyarrow (single chunk) and polars columns. Chunked arrays are
+    concatenated, and missing values are converted to NaN, which requires
+    a copy.
+
+    Args:
+        values: pyarrow Array or ChunkedArray, polars or pandas Series,
+            or anything accepted by numpy.asarray.
+
+    Returns:
+        ndarray: The values.
+
+    """
+    container = _container(values)
+
+    if container == "pyarrow":
+        import pyarrow as pa
+
+        if isinstance(values, pa.ChunkedArray):
+            if values.num_chunks == 1:
+                values = values.chunk(0)
+            else:
+                values = pa.concat_arrays(values.chunks)
+        return values.to_numpy(zero_copy_only=False)
+
+    if container == "polars":
+        return values.to_numpy()
+
+    return np.asarray(values)
+
+
+def from_numpy(values, like, name=None):
+    """Wrap a numpy array in the container type of another column.
+
+    Args:
+        values (ndarray): The values.
+        like: Column whose type is used, for example an input of the model.
+        name (str): Name of the series (polars and pandas only). Defaults to
+            the name of ``like``.
+
+    Returns:
+        The values as a column of the same type as ``like``.
+
+    """
+    values = np.atleast_1d(values)
+    container = _container(like)
+
+    if container == "pyarrow":
+        import pyarrow as pa
+
+        return pa.array(values)
+
+    if container == "polars":
+        import polars as pl
+
+        return pl.Series(like.name if name is None else name, values)
+
+    if container == "pandas":
+        import pandas as pd
+
+        index = like.index if len(like) == len(values) else None
+        name = getattr(like, "name", None) if name is None else name
+        return pd.Series(values, index=index, name=name, copy=False)
+
+    return values
+
+
+def apply(func, *args, **kwargs):
+    """Apply a model method on columnar data.
+
+    Args:
+        func (callable): Model method, for example ``FuelFlow("A320").enroute``.
+        *args: Positional arguments, columns or scalars.
+        **kwargs: Keyword arguments, columns or scalars.
+
+    Returns:
+        The result(s) in the container type of the first column argument.
+
+    """
+    columns = [a for a in list(args) + list(kwargs.values()) if _container(a)]
+    new_args = [to_numpy(a) if _container(a) else a for a in args]
+    new_kwargs = {k: to_numpy(a) if _container(a) else a for k, a in kwargs.items()}
+
+    result = func(*new_args, **new_kwargs)
+
+    if not columns:
+        return result
+
+    if isinstance(result, tuple):
+        return tuple(from_numpy(r, columns[0]) for r in result)
+
+    return from_numpy(result, columns[0])
+
+
+def expr(func, *columns, name=None, **kwargs):
+    """Polars expression applying a model method on columns.
+
+    The method is evaluated on batches of the frame, which also works with
+    lazy frames and the streaming engine. The resulting column is Float32
+    when the model is evaluated in float32, see openap.extra.set_dtype().
+
+    Args:
+        func (callable): Model method, for example ``FuelFlow("A320").enroute``.
+        *columns (str): Column names of the positional arguments of func.
+        name (str): Name of the resulting column. Defaults to the name of
+            func.
+        **kwargs: Keyword arguments passed to func.
+
+    Returns:
+        polars.Expr: The expression.
+
+    """
+    import polars as pl
+
+    name = func.__name__ if name is None else name
+
+    # precision of the model, the declared schema must match the results
+    model = getattr(func, "__self__", None)
+    dtype = np.dtype(getattr(model, "dtype", None) or extra._dtype or float)
+    if dtype == np.float32:
+        dtype, return_dtype = np.float32, pl.Float32
+    else:
+        dtype, return_dtype = np.float64, pl.Float64
+
+    def evaluate(batch):
+        frame = batch.struct.unnest()
+        args = [frame[c].to_numpy() for c in columns]
+        result = np.atleast_1d(func(*args, **kwargs)).astype(dtype, copy=False)
+        return pl.Series(name, result)
+
+    return (
+        pl.struct(list(columns))
+        .map_batches(evaluate, return_dtype=return_dtype, is_elementwise=True)
+        .alias(name)
+    )
+
+
+def with_openap_fuel(
+    frame,
+    ac,
+    eng=None,
+    mass="mass",
+    tas="tas",
+    alt="alt",
+    vs="vs",
+    name="fuel_flow",
+    **kwargs,
+):
+    """Add the enroute fuel flow as a new column of a data frame.
+
+    Args:
+        frame: polars DataFrame or LazyFrame, pyarrow Table, or pandas
+            DataFrame.
+        ac (string): ICAO aircraft type (for example: A320).
+        eng (string): Engine type (for example: CFM56-5A3).
+        mass (str): Column of the aircraft mass (unit: kg).
+        tas (str): Column of the true airspeed (unit: kt).
+        alt (str): Column of the altitude (unit: ft).
+        vs (str): Column of the vertical rate (unit: ft/min). Set to None to
+            assume level flight.
+        name (str): Name of the new column. Defaults to "fuel_flow".
+        **kwargs: Passed to FuelFlow, for example ``use_synonym=True``.
+
+    Returns:
+        The frame with fuel flow (unit: kg/s), of the same type as the input.
+
+    """
+    fuelflow = FuelFlow(ac, eng, **kwargs)
+    columns = [mass, tas, alt] + ([vs] if vs is not None else [])
+    container = _container(frame)
+
+    if container == "polars":
+        return frame.with_columns(expr(fuelflow.enroute, *columns, name=name))
+
+    if container == "pyarrow":
+        values = apply(fuelflow.enroute, *[frame[c] for c in columns])
+        return frame.append_column(name, values)
+
+    if container == "pandas":
+        values = fuelflow.enroute(*[frame[c].to_numpy() for c in columns])
+        return frame.assign(**{name: values})
+
+    raise TypeError(f"Unsupported frame type: {type(frame)}")
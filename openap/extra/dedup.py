@@ -0,0 +1,111 @@
+"""Evaluation of the models on the unique rows of their inputs.
+
+Trajectory data often repeats the same inputs: ADS-B altitudes come in steps
+of 25 ft, and speeds and vertical rates are integers. The model can be
+evaluated once per unique combination of the inputs, and the results
+scattered back to all rows::
+
+    from openap import FuelFlow
+    from openap.extra import dedup
+
+    fuelflow = FuelFlow("A320")
+    ff = dedup.apply(fuelflow.enroute, mass, tas, alt, vs, steps=dict(mass=100))
+
+Inputs can also be quantized to a given step before the grouping, which
+increases the number of repeated rows, at the cost of the error of the model
+evaluated at the quantized values.
+
+"""
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+
+def unique_rows(*columns, steps=None):
+    """Group identical rows of columns, with hash-based factorization.
+
+    Args:
+        *columns (ndarray): Columns of the same shape.
+        steps (list): Quantization step of each column, or None for
+            exact values. Defaults to None for all columns.
+
+    Returns:
+        tuple: (unique, inverse), the list of columns of the unique rows,
+        and the index of the unique row of each row.
+
+    """
+    steps = steps or [None] * len(columns)
+    columns = [np.ravel(c) for c in columns]
+
+    key, radix = np.zeros(columns[0].shape, dtype=np.int64), 1
+    values = []
+    for column, step in zip(columns, steps):
+        if step is None:
+            codes, uniques = pd.factorize(column)
+            n = len(uniques) + 1  # codes of NaN are -1
+            codes = codes.astype(np.int64) + 1
+        else:
+            q = np.round(column / step)
+            column = q * step
+            finite = np.isfinite(q)
+            lower = q[finite].min() if finite.any() else 0
+            codes = np.where(finite, q - lower + 1, 0).astype(np.int64)
+            n = int(codes.max()) + 1 if len(codes) else 1
+
+        values.append(column)
+        if radix * n < 2**62:
+            key, radix = key + codes * radix, radix * n
+        else:
+            # too many combinations for an integer key, group what we have
+            key = pd.factorize(key)[0].astype(np.int64)
+            radix = int(key.max()) + 1 if len(key) else 1
+            key, radix = key + codes * radix, radix * n
+
+    inverse, uniques = pd.factorize(key)
+    first = np.empty(len(uniques), dtype=np.intp)
+    first[inverse[::-1]] = np.arange(len(inverse))[::-1]
+
+    return [v[first] for v in values], inverse
+
+
+def apply(func, *args, steps=None, **kwargs):
+    """Evaluate a model method once per unique row of its array inputs.
+
+    Array arguments are broadcast together and grouped, scalar arguments
+    are passed unchanged.
+
+    Args:
+        func (callable): Model method, for example ``FuelFlow("A320").enroute``.
+        *args: Positional arguments of func.
+        steps (dict): Quantization step by argument name, for example
+            ``{"mass": 100, "alt": 25}``. Other arguments are not quantized.
+        **kwargs: Keyword arguments of func.
+
+    Returns:
+        The result(s) of func, in the broadcast shape of the array inputs.
+
+    """
+    steps = steps or {}
+    signature = inspect.signature(func)
+    unknown = set(steps) - set(signature.parameters)
+    if unknown:
+        raise TypeError(f"Unknown arguments in steps: {sorted(unknown)}")
+
+    bound = signature.bind(*args, **kwargs)
+    names = [k for k, v in bound.arguments.items() if np.ndim(v) > 0]
+    if not names:
+        return func(*args, **kwargs)
+
+    arrays = np.broadcast_arrays(*(np.asarray(bound.arguments[k]) for k in names))
+    shape = arrays[0].shape
+
+    unique, inverse = unique_rows(*arrays, steps=[steps.get(k) for k in names])
+    bound.arguments.update(zip(names, unique))
+
+    result = func(*bound.args, **bound.kwargs)
+
+    if isinstance(result, tuple):
+        return tuple(np.asarray(r)[inverse].reshape(shape) for r in result)
+    return np.atleast_1d(result)[inverse].reshape(shape)
@@ -168,3 +168,37 @@ class TWF(BaseFilter):
                 y = (yw + Y[i]) / 2.0
             YF[i] = y
         return X, np.array(YF)
+
+
+class ExponentialSmoothing(BaseFilter):
+    """
+    Time-based exponential smoothing, for irregular time steps
+
+    The filtered value relaxes towards the measurements with the time
+    constant tau (in the unit of X). Measurements can also be added one at
+    a time with update(), for many independent series at once.
+    """
+
+    def __init__(self, tau=10):
+        super(ExponentialSmoothing, self).__init__()
+        self.tau = tau
+
+    def update(self, YF, dX, Y):
+        """Filtered values after new measurements, NaN measurements are skipped
+
+        A NaN filtered value, before the first valid measurement, is set to
+        the measurement.
+        """
+        w = 1 - np.exp(-np.maximum(dX, 0) / self.tau)
+        YF = np.where(np.isnan(YF), Y, YF)
+        return np.where(np.isnan(Y), YF, YF + w * (Y - YF))
+
+    def filter(self, X, Y):
+        X, Y = self.sortxy(X, Y)
+
+        YF = np.zeros(Y.shape)
+        YF[0] = Y[0]
+
+        for i in range(1, len(X)):
+            YF[i] = self.update(YF[i - 1], X[i] - X[i - 1], Y[i])
+        return X, YF
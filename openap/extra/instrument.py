@@ -0,0 +1,154 @@
+"""Opt-in instrumentation of model evaluations and data loading.
+
+When enabled, every method decorated with ``ndarrayconvert`` and the data
+loading functions of ``prop``, ``nav`` and ``kinematic`` record their number
+of calls, cumulative wall time, and input sizes (number of elements of the
+largest input array). Times are inclusive: a model calling another model,
+like ``FuelFlow.enroute`` calling ``Drag.clean``, includes the time of the
+inner call. Cached data loaders only record the actual loads.
+
+Example::
+
+    from openap import FuelFlow, instrument
+
+    with instrument.recording():
+        fuelflow = FuelFlow("A320")
+        fuelflow.enroute(mass=60000, tas=200, alt=20000)
+
+    print(instrument.report())
+
+Callbacks, for example to forward measurements to a metrics system, receive
+the name of the function, the elapsed time (s), and the input size of each
+call::
+
+    instrument.add_callback(lambda name, elapsed, size: print(name, elapsed))
+
+When instrumentation is disabled (default), the overhead is a single flag
+check per call.
+
+"""
+
+import contextlib
+import functools
+import threading
+import time
+
+import pandas as pd
+
+enabled = False
+
+_stats = dict()
+_callbacks = []
+_lock = threading.Lock()
+
+
+def enable():
+    """Start recording the calls."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    """Stop recording the calls. The recorded statistics are kept."""
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Clear the recorded statistics."""
+    with _lock:
+        _stats.clear()
+
+
+@contextlib.contextmanager
+def recording(reset_stats=True):
+    """Context manager to record the calls made within its block.
+
+    Args:
+        reset_stats (bool): Clear the previously recorded statistics.
+            Defaults to True.
+
+    """
+    global enabled
+    previous = enabled
+    if reset_stats:
+        reset()
+    enabled = True
+    try:
+        yield
+    finally:
+        enabled = previous
+
+
+def add_callback(func):
+    """Register a function called after each recorded call.
+
+    Args:
+        func (callable): Function with arguments ``(name, elapsed, size)``.
+
+    """
+    _callbacks.append(func)
+
+
+def remove_callback(func):
+    """Remove a previously registered callback."""
+    _callbacks.remove(func)
+
+
+def record(name, elapsed, size=0):
+    """Record one call.
+
+    Args:
+        name (str): Name of the function.
+        elapsed (float): Wall time of the call (unit: s).
+        size (int): Input size of the call. Defaults to 0.
+
+    """
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = dict(calls=0, time=0.0, size=0, max_size=0)
+        stat["calls"] += 1
+        stat["time"] += elapsed
+        stat["size"] += size
+        stat["max_size"] = max(stat["max_size"], size)
+
+    for callback in _callbacks:
+        callback(name, elapsed, size)
+
+
+def timed(func):
+    """Decorator recording the calls of a (data loading) function."""
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        record(name, time.perf_counter() - t0)
+        return result
+
+    return wrapper
+
+
+def report():
+    """Summary of the recorded calls, sorted by cumulative time.
+
+    Returns:
+        pandas.DataFrame: calls, cumulative time (s), mean time per call (s),
+            mean and maximum input size, indexed by function name.
+
+    """
+    with _lock:
+        stats = {name: dict(stat) for name, stat in _stats.items()}
+
+    df = pd.DataFrame.from_dict(
+        stats, orient="index", columns=["calls", "time", "size", "max_size"]
+    )
+    df["mean_time"] = df["time"] / df["calls"]
+    df["mean_size"] = df["size"] / df["calls"]
+    return df[["calls", "time", "mean_time", "mean_size", "max_size"]].sort_values(
+        "time", ascending=False
+    )
@@ -1,20 +1,24 @@
 """Navigation module helps accessing the navigation databases."""
 
 import os
+import threading
 
 import numpy as np
 import pandas as pd
 
-from openap.extra import aero
+from openap.extra import aero, instrument
 
 fixes = None
 airports = None
 
+_lock = threading.Lock()
+
 curr_path = os.path.dirname(os.path.realpath(__file__))
 db_airport = curr_path + "/../data/nav/airports.csv"
 db_fix = curr_path + "/../data/nav/fix.dat"
 
 
+@instrument.timed
 def _read_fix():
     return pd.read_csv(
         db_fix,
@@ -27,10 +31,34 @@ def _read_fix():
     )
 
 
+@instrument.timed
 def _read_airport():
     return pd.read_csv(db_airport)
 
 
+def _get_fixes():
+    """Load the fix database once, also when called from several threads."""
+    global fixes
+
+    if fixes is None:
+        with _lock:
+            if fixes is None:
+                fixes = _read_fix()
+    return fixes
+
+
+def _get_airports():
+    """Load the airport database once, also when called from several threads."""
+    global airports
+
+    if airports is None:
+        with _lock:
+            if airports is None:
+                airports = _read_airport()
+    return airports
+
+
+@instrument.timed
 def airport(name):
     """Get the airport information.
 
@@ -44,8 +72,7 @@ def airport(name):
     """
     NAME = str(name).upper()
 
-    if not isinstance(airport, pd.DataFrame):
-        airports = _read_airport()
+    airports = _get_airports()
 
     df = airports[airports["icao"] == NAME]
     if df.shape[0] == 0:
@@ -54,6 +81,7 @@ def airport(name):
         return df.iloc[0, :].to_dict()
 
 
+@instrument.timed
 def closest_airport(lat, lon):
     """Get the closest airport of a location.
 
@@ -65,10 +93,7 @@ def closest_airport(lat, lon):
         string or None: ICAO code of the airport
 
     """
-    global airports
-
-    if not isinstance(airport, pd.DataFrame):
-        airports = _read_airport()
+    airports = _get_airports()
 
     df = airports[
         airports["lat"].between(lat - 2, lat + 2)
@@ -87,6 +112,7 @@ def closest_airport(lat, lon):
     return ap.icao
 
 
+@instrument.timed
 def fix(name):
     """Get position of a fix or way point.
 
@@ -97,16 +123,14 @@ def fix(name):
         list: latitude and longitude
 
     """
-    global fixes
-
-    if not isinstance(fixes, pd.DataFrame):
-        fixes = _read_fix()
+    fixes = _get_fixes()
 
     NAME = str(name).upper()
     fix = fixes[fixes["fix"] == NAME].iloc[0].tolist()
     return fix
 
 
+@instrument.timed
 def closest_fix(lat, lon):
     """Get the closest fix of a location.
 
@@ -119,10 +143,7 @@ def closest_fix(lat, lon):
         int: Distance to the fix.
 
     """
-    global fixes
-
-    if not isinstance(fixes, pd.DataFrame):
-        fixes = _read_fix()
+    fixes = _get_fixes()
 
     mask = (fixes["lat"].between(lat - 1, lat + 1)) & (
         fixes["lon"].between(lon - 1, lon + 1)
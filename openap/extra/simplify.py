@@ -0,0 +1,213 @@
+"""Trajectory simplification, and integration of the models on fewer points.
+
+Dense trajectories, for example at 1 Hz, are mostly redundant in cruise. The
+Douglas-Peucker algorithm keeps the points where the trajectory deviates from
+the straight line between the points already kept::
+
+    from openap.extra import simplify
+
+    index = simplify.douglas_peucker(ts, alt, tas, tolerance=[100, 5])
+
+The fuel flow, or any other rate of the models, can be integrated with a
+controlled error, evaluating the model only on the points needed::
+
+    fuelflow = FuelFlow("A320")
+    result = simplify.integrate(
+        fuelflow.enroute, ts, mass, tas, alt, vs, tolerance=1e-3
+    )
+    result["value"]  # kg
+    result["ratio"]  # number of points / number of model evaluations
+
+Segments are split recursively, at the point where the inputs deviate the most
+from the straight line, until both the inputs and the model value at that
+point are close to the linear interpolation between the ends of the segment.
+The deviations of the inputs are weighted with the sensitivity of the model to
+each input, and the accumulated deviations are returned as a (first order)
+estimate of the error of the integral, not as a strict bound. Noisy inputs
+should be smoothed first, since the noise is treated as signal.
+
+"""
+
+import numpy as np
+
+# numpy.trapz is renamed numpy.trapezoid in numpy 2.0, the fallback is only
+# reached with numpy 1.x, which the package still supports
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz  # noqa: NPY201
+
+
+def _candidates(ts, columns, starts, ends):
+    """Interior point of each segment with the largest deviation.
+
+    Args:
+        ts (ndarray): Time of the points.
+        columns (list): Normalized columns, arrays of the same shape as ts.
+        starts, ends (ndarray): Indices of the ends of the segments, with at
+            least one point in between.
+
+    Returns:
+        tuple: (index, deviation), the point of each segment with the largest
+        absolute deviation from the linear interpolation, over all columns.
+
+    """
+    lengths = ends - starts - 1
+    seg = np.repeat(np.arange(len(starts)), lengths)
+    offset = np.cumsum(lengths) - lengths
+    idx = np.arange(lengths.sum()) - np.repeat(offset, lengths) + starts[seg] + 1
+
+    t0, t1 = ts[starts][seg], ts[ends][seg]
+    w = (ts[idx] - t0) / np.where(t1 > t0, t1 - t0, 1)
+
+    dev = np.zeros(len(idx))
+    for c in columns:
+        c0, c1 = c[starts][seg], c[ends][seg]
+        dev = np.maximum(dev, np.abs(c[idx] - (c0 + w * (c1 - c0))))
+
+    # sorted by segment, then deviation: the last point of each segment
+    best = np.lexsort((dev, seg))[offset + lengths - 1]
+    return idx[best], dev[best]
+
+
+def _split(starts, ends, points):
+    """Segments on both sides of the points, with interior points."""
+    starts = np.concatenate([starts, points])
+    ends = np.concatenate([points, ends])
+    inner = ends - starts > 1
+    return starts[inner], ends[inner]
+
+
+def douglas_peucker(ts, *columns, tolerance):
+    """Simplify a trajectory with the Douglas-Peucker algorithm.
+
+    All segments are refined at once, level by level.
+
+    Args:
+        ts (ndarray): Time of the points, increasing (unit: s).
+        *columns (ndarray): Values of the points, for example altitude and
+            speed, interpolated linearly in time.
+        tolerance (float or list): Maximum deviation of each column.
+
+    Returns:
+        ndarray: Sorted indices of the points kept.
+
+    """
+    ts = np.asarray(ts, dtype=float)
+    n = len(ts)
+    if n <= 2:
+        return np.arange(n)
+
+    tolerance = np.broadcast_to(tolerance, (len(columns),))
+    columns = [np.asarray(c, dtype=float) / tol for c, tol in zip(columns, tolerance)]
+
+    kept = [np.array([0, n - 1])]
+    starts, ends = np.array([0]), np.array([n - 1])
+    while len(starts) > 0:
+        points, dev = _candidates(ts, columns, starts, ends)
+        split = dev > 1
+        kept.append(points[split])
+        starts, ends = _split(starts[split], ends[split], points[split])
+
+    return np.unique(np.concatenate(kept))
+
+
+def integrate(func, ts, *args, tolerance=1e-3, min_points=64, **kwargs):
+    """Integrate a model rate in time, evaluated on a simplified trajectory.
+
+    Args:
+        func (callable): Vectorized model method returning a rate, for example
+            ``FuelFlow("A320").enroute``.
+        ts (ndarray): Time of the points, increasing (unit: s).
+        *args: Positional arguments of func, arrays with one value per point
+            or scalars.
+        tolerance (float): Target relative error of the integral, compared
+            to the integration of the model on all points. Defaults to 1e-3.
+        min_points (int): Number of evenly spaced points evaluated first.
+            Defaults to 64.
+        **kwargs: Keyword arguments of func.
+
+    Returns:
+        dict: value, the integral of the rate (trapezoidal rule on the
+        points kept); index, the sorted indices of the points evaluated;
+        ratio, the number of points over the number of evaluations; and
+        error, the estimated absolute error of the integral. The value and
+        the error are NaN when the model returns NaN at an evaluated point;
+        the points with NaN or infinite inputs are always evaluated.
+
+    """
+    ts = np.asarray(ts, dtype=float)
+    n = len(ts)
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args), ts)[:-1]
+
+    def evaluate(idx):
+        result = func(*(a[idx] for a in arrays), **kwargs)
+        return np.broadcast_to(result, idx.shape)
+
+    def integral(index, rate, error):
+        # as the integration on all points, the integral of a NaN rate is NaN
+        if np.isnan(rate).any():
+            value = error = np.nan
+        else:
+            value = _trapezoid(rate, ts[index]) if len(index) > 1 else 0.0
+        ratio = n / len(index) if len(index) else 1.0
+        return dict(value=float(value), index=index, ratio=ratio, error=float(error))
+
+    if n <= 2 or ts[-1] == ts[0]:
+        # nothing to refine, or all points at the same time
+        index = np.unique([0, n - 1]) if n else np.arange(0)
+        return integral(index, evaluate(index), 0.0)
+
+    finite = np.ones(n, dtype=bool)
+    for a in arrays:
+        finite &= np.isfinite(a)
+
+    # inputs in units of the rate, with its sensitivity to each input,
+    # estimated by finite differences on a sample of points, and on the
+    # points with invalid inputs
+    sample = np.linspace(0, n - 1, min_points).astype(int)
+    sample = np.union1d(sample, np.flatnonzero(~finite))
+    base = evaluate(sample)
+    if np.isnan(base).any():
+        return integral(sample, base, 0.0)
+
+    columns = []
+    for k, a in enumerate(arrays):
+        if np.ptp(a) == 0:
+            continue
+        h = 1e-4 * np.ptp(a)
+        shifted = [x[sample] + h if i == k else x[sample] for i, x in enumerate(arrays)]
+        diff = np.broadcast_to(func(*shifted, **kwargs), sample.shape) - base
+        columns.append(a * np.nanmax(np.abs(diff)) / h)
+
+    # the sample points are the first level of the refinement
+    rate = np.zeros(n)
+    rate[sample] = base
+    evaluated = np.zeros(n, dtype=bool)
+    evaluated[sample] = True
+
+    duration = ts[-1] - ts[0]
+    starts, ends = _split(sample[:1], sample[-1:], sample[1:-1])
+    error = 0.0
+    while len(starts) > 0:
+        points, dev = _candidates(ts, columns, starts, ends)
+        points = np.where(dev > 0, points, (starts + ends) // 2)
+        rate[points] = evaluate(points)
+        evaluated[points] = True
+        if np.isnan(rate[points]).any():
+            break
+
+        # allowed error of the rate, from the integral on the points evaluated
+        known = np.flatnonzero(evaluated)
+        allowed = tolerance * abs(_trapezoid(rate[known], ts[known])) / duration
+
+        t0, t1 = ts[starts], ts[ends]
+        w = (ts[points] - t0) / np.where(t1 > t0, t1 - t0, 1)
+        linear = rate[starts] + w * (rate[ends] - rate[starts])
+
+        # segments where the inputs and the rate are close to linear
+        deviation = np.maximum(dev, np.abs(rate[points] - linear))
+        done = deviation <= allowed
+        error += (deviation * (t1 - t0))[done].sum()
+
+        starts, ends = _split(starts[~done], ends[~done], points[~done])
+
+    index = np.flatnonzero(evaluated)
+    return integral(index, rate[index], error)
@@ -2,11 +2,15 @@
 
 import glob
 import importlib
+import math
 import os
 import pathlib
+from collections import namedtuple
 
 import yaml
+from scipy.special import lambertw
 
+import numpy as np
 import pandas as pd
 from openap import prop
 from openap.extra import ndarrayconvert
@@ -14,6 +18,41 @@ from openap.extra.aero import fpm, kts
 
 from .base import FuelFlowBase
 
+# smooth lower limit of the thrust ratio, see FuelFlow.at_thrust()
+RATIO_MIN = 0.03
+RATIO_SHARPNESS = 50
+
+# performance envelope of FuelFlow.enroute(): flight path angle (rad) and
+# acceleration (m/s^2), and margins of the idle and of the maximum thrust
+GAMMA_MAX = 0.175
+ACC_MAX = 5
+IDLE_MARGIN = 0.8
+MAX_MARGIN = 1.2
+
+Coefficients = namedtuple(
+    "Coefficients",
+    [
+        "S",
+        "cd0",
+        "k",
+        "wave_drag",
+        "mach_crit0",
+        "mach_crit_cl",
+        "max_thrust",
+        "cruise_thrust",
+        "cruise_mach",
+        "P10",
+        "Pcr",
+        "vcas_ref",
+        "idle_cz",
+        "idle_cx",
+        "c1",
+        "c2",
+        "c3",
+        "scale",
+    ],
+)
+
 
 class FuelFlow(FuelFlowBase):
     """Fuel flow model based on ICAO emission databank."""
@@ -82,11 +121,61 @@ class FuelFlow(FuelFlowBase):
             ref_engine = prop.engine(params["engine_type"])
             scale = self.engine["ff_to"] / ref_engine["ff_to"]
 
-        return (
-            lambda x: c1
-            - self.sci.exp(-c2 * (x * self.sci.exp(c3 * x) - self.sci.log(c1) / c2))
-            * scale
+        # plain floats, which do not change the precision of the inputs
+        c1, c2, c3, scale = float(c1), float(c2), float(c3), float(scale)
+        self.fuel_coef = (c1, c2, c3, scale)
+
+        return self._fuel_function(c1, c2, c3, scale)
+
+    def _fuel_function(self, c1, c2, c3, scale):
+        """Fuel flow as a function of the thrust ratio, for given coefficients.
+
+        The coefficients can also be arrays, broadcast against the thrust
+        ratio, for example to propagate their uncertainty.
+
+        """
+        log_c1 = math.log(c1) if isinstance(c1, float) else self.sci.log(c1)
+
+        return lambda x: (
+            c1 - self.sci.exp(-c2 * (x * self.sci.exp(c3 * x) - log_c1 / c2)) * scale
+        )
+
+    def _coefficients(self):
+        """Scalar parameters of the drag, thrust and fuel flow models.
+
+        The in-place and the compiled versions of enroute(), in
+        openap.evaluator and openap.kernels, are evaluated with these
+        parameters, taken from the models of this object.
+
+        Returns:
+            Coefficients: Named tuple of floats.
+
+        """
+        drag, thrust = self.drag, self.thrust
+        c_z, c_x = thrust._takeoff_factors()
+        c1, c2, c3, scale = self.fuel_coef
+
+        values = dict(
+            S=self.aircraft["wing"]["area"],
+            cd0=drag.polar["clean"]["cd0"],
+            k=drag.polar["clean"]["k"],
+            wave_drag=drag.wave_drag,
+            mach_crit0=drag._mach_crit0,
+            mach_crit_cl=drag._mach_crit_cl,
+            max_thrust=thrust.eng_max_thrust * thrust.eng_number,
+            cruise_thrust=thrust.eng_cruise_thrust * thrust.eng_number,
+            cruise_mach=thrust.cruise_mach,
+            P10=thrust._P10,
+            Pcr=thrust._Pcr,
+            vcas_ref=thrust._vcas_ref,
+            idle_cz=c_z,
+            idle_cx=c_x,
+            c1=c1,
+            c2=c2,
+            c3=c3,
+            scale=scale,
         )
+        return Coefficients(**{k: float(v) for k, v in values.items()})
 
     @ndarrayconvert
     def at_thrust(self, acthr, alt=0, limit=True):
@@ -107,7 +196,11 @@ class FuelFlow(FuelFlowBase):
         ratio = acthr / (max_eng_thrust * n_eng)
 
         # always limit the lowest ratio to 0.02 without creating a discontinuity
-        ratio = self.sci.log(1 + self.sci.exp(50 * (ratio - 0.03))) / 50 + 0.03
+        ratio = (
+            self.sci.log(1 + self.sci.exp(RATIO_SHARPNESS * (ratio - RATIO_MIN)))
+            / RATIO_SHARPNESS
+            + RATIO_MIN
+        )
 
         # upper limit the ratio to 1
         if limit:
@@ -165,12 +258,12 @@ class FuelFlow(FuelFlowBase):
 
         if limit:
             # limit gamma to -20 to 20 degrees (0.175 radians)
-            gamma = self.sci.where(gamma < -0.175, -0.175, gamma)
-            gamma = self.sci.where(gamma > 0.175, 0.175, gamma)
+            gamma = self.sci.where(gamma < -GAMMA_MAX, -GAMMA_MAX, gamma)
+            gamma = self.sci.where(gamma > GAMMA_MAX, GAMMA_MAX, gamma)
 
             # limit acc to 5 m/s^2
-            acc = self.sci.where(acc < -5, -5, acc)
-            acc = self.sci.where(acc > 5, 5, acc)
+            acc = self.sci.where(acc < -ACC_MAX, -ACC_MAX, acc)
+            acc = self.sci.where(acc > ACC_MAX, ACC_MAX, acc)
 
         T = D + mass * 9.81 * self.sci.sin(gamma) + mass * acc
 
@@ -179,15 +272,158 @@ class FuelFlow(FuelFlowBase):
             T_idle = self.thrust.descent_idle(tas=tas, alt=alt)
 
             # below idle thrust (with margin of 20%)
-            T = self.sci.where(T < T_idle * 0.8, T_idle * 0.8, T)
+            T_low = T_idle * IDLE_MARGIN
+            T = self.sci.where(T < T_low, T_low, T)
 
             # outside performance boundary (with margin of 20%)
-            T = self.sci.where(T > T_max * 1.2, T_max * 1.2, T)
+            T_high = T_max * MAX_MARGIN
+            T = self.sci.where(T > T_high, T_high, T)
 
         fuelflow = self.at_thrust(T, alt, limit=limit)
 
         return fuelflow
 
+    @ndarrayconvert
+    def thrust_from_fuel(self, fuelflow, limit=True):
+        """Compute the total thrust at a given fuel flow, inverse of at_thrust().
+
+        The fuel flow model is inverted analytically, for all points at once.
+
+        Args:
+            fuelflow (float or ndarray): Fuel flow (unit: kg/s).
+            limit (bool): Whether the thrust ratio is limited to 1, as in
+                at_thrust(). Defaults to True.
+
+        Returns:
+            float or ndarray: Total net thrust (unit: N). NaN where the fuel
+            flow is out of the range of the model.
+
+        """
+        c1, c2, c3, scale = self.fuel_coef
+        max_eng_thrust = self.engine["max_thrust"]
+        n_eng = self.aircraft["engine"]["number"]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # fuelflow = c1 - c1 * scale * exp(-c2 * x * exp(c3 * x))
+            xe = (np.log(scale) - np.log1p(-fuelflow / c1)) / c2
+            x = lambertw(c3 * xe).real / c3 if c3 != 0 else xe
+
+            # inverse of the smooth lower limit of the thrust ratio
+            ratio = (
+                np.log(np.expm1(RATIO_SHARPNESS * (x - RATIO_MIN))) / RATIO_SHARPNESS
+                + RATIO_MIN
+            )
+
+        if limit:
+            ratio = np.where(x > 1, np.nan, ratio)
+
+        return ratio * max_eng_thrust * n_eng
+
+    @ndarrayconvert
+    def mass_from_fuel(
+        self,
+        fuelflow,
+        tas,
+        alt,
+        vs=0,
+        acc=0,
+        mass_range=None,
+        tol=1,
+        max_iter=50,
+    ):
+        """Estimate the aircraft mass from the observed fuel flow.
+
+        Solves enroute(mass, tas, alt, vs, acc) = fuelflow for the mass of
+        all points at once, with bracketed iterations (Illinois variant of
+        the regula falsi). Only the points which have not converged are
+        evaluated at each iteration.
+
+        Args:
+            fuelflow (float or ndarray): Observed fuel flow (unit: kg/s).
+            tas (int or ndarray): Aircraft true airspeed (unit: kt).
+            alt (int or ndarray): Aircraft altitude (unit: ft).
+            vs (float or ndarray): Vertical rate (unit: ft/min). Default is 0.
+            acc (float or ndarray): acceleration (unit: m/s^2). Default is 0.
+            mass_range (tuple): Bracket of the mass (unit: kg). Defaults to
+                the OEW and the MTOW of the aircraft.
+            tol (float): Tolerance of the mass (unit: kg). Defaults to 1.
+            max_iter (int): Maximum number of iterations, at least 1.
+                Defaults to 50.
+
+        Returns:
+            float or ndarray: Aircraft mass (unit: kg). NaN where the fuel
+            flow is not reached within the mass range, for example at idle
+            thrust during the descent.
+
+        """
+        if np.ndim(self.fuel_coef[3]) > 0:
+            raise ValueError(
+                "mass_from_fuel() does not support stacked engine parameters, "
+                "use the FuelFlow model of each engine instead."
+            )
+
+        # scalar options, converted to arrays like the other arguments
+        tol = float(np.asarray(tol).item())
+        max_iter = int(np.asarray(max_iter).item())
+        if max_iter < 1:
+            raise ValueError(f"max_iter must be at least 1, got {max_iter}.")
+
+        if mass_range is None:
+            limits = self.aircraft["limits"]
+            mass_range = (limits["OEW"], limits["MTOW"])
+
+        fuelflow, tas, alt, vs, acc = (
+            np.array(x, dtype=float)
+            for x in np.broadcast_arrays(fuelflow, tas, alt, vs, acc)
+        )
+
+        def residual(mass, idx):
+            ff = self.enroute(mass, tas[idx], alt[idx], vs[idx], acc[idx])
+            return ff - fuelflow[idx]
+
+        mass = np.full(fuelflow.shape, np.nan)
+        idx = np.nonzero(np.isfinite(fuelflow))
+
+        a = np.full(idx[0].shape, float(mass_range[0]))
+        b = np.full(idx[0].shape, float(mass_range[1]))
+        fa, fb = residual(a, idx), residual(b, idx)
+
+        # keep the points where the fuel flow is bracketed
+        bracketed = fa * fb < 0
+        idx = tuple(i[bracketed] for i in idx)
+        a, b, fa, fb = a[bracketed], b[bracketed], fa[bracketed], fb[bracketed]
+        side = np.zeros(a.shape, dtype=int)
+
+        for _ in range(max_iter):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                c = b - fb * (b - a) / (fb - fa)
+            c = np.where(np.isfinite(c), c, (a + b) / 2)
+            fc = residual(c, idx)
+
+            left = fc * fa > 0
+            right = ~left
+
+            # Illinois: halve the residual of the end point kept twice
+            fb = np.where(left & (side == -1), fb / 2, fb)
+            fa = np.where(right & (side == 1), fa / 2, fa)
+            a, fa = np.where(left, c, a), np.where(left, fc, fa)
+            b, fb = np.where(right, c, b), np.where(right, fc, fb)
+            side = np.where(left, -1, 1)
+
+            done = (np.abs(b - a) < tol) | (fc == 0)
+            mass[tuple(i[done] for i in idx)] = c[done]
+
+            if done.all():
+                break
+
+            keep = ~done
+            idx = tuple(i[keep] for i in idx)
+            a, b, fa, fb, side = a[keep], b[keep], fa[keep], fb[keep], side[keep]
+        else:
+            mass[idx] = c[keep]
+
+        return mass
+
     def plot_model(self, plot=True):
         """Plot the engine fuel model, or return the pyplot object.
 
@@ -0,0 +1,49 @@
+"""OpenAP models with the JAX backend.
+
+The models are the same as in openap, with ``jax.numpy`` in place of numpy.
+They can be compiled with ``jax.jit``, differentiated with ``jax.grad``, and
+vectorized with ``jax.vmap``::
+
+    import jax
+    from openap.jax import FuelFlow
+
+    fuelflow = FuelFlow("A320")
+    enroute = jax.jit(fuelflow.enroute, static_argnames="limit")
+    ff = enroute(mass, tas, alt, vs)
+
+    # sensitivity of the fuel flow to the mass
+    dff_dmass = jax.vmap(jax.grad(fuelflow.enroute), (0, 0, 0))(mass, tas, alt)
+
+JAX computes in float32 by default. For the same precision as the numpy
+models, enable float64 before creating arrays::
+
+    jax.config.update("jax_enable_x64", True)
+
+"""
+
+from .. import *  # noqa: F403
+from .. import drag, emission, fuel, thrust
+from ..extra.backend import remove_decorator_meta
+from . import aero_override as aero
+from . import numpy_override as sci
+
+RemoveDecoratorMeta = remove_decorator_meta(sci, aero)
+
+
+class Drag(drag.Drag, metaclass=RemoveDecoratorMeta):
+    pass
+
+
+class Thrust(thrust.Thrust, metaclass=RemoveDecoratorMeta):
+    pass
+
+
+class FuelFlow(fuel.FuelFlow, metaclass=RemoveDecoratorMeta):
+    def __init__(self, ac, eng=None, **kwargs):
+        self.Drag = Drag
+        self.Thrust = Thrust
+        super(FuelFlow, self).__init__(ac=ac, eng=eng, **kwargs)
+
+
+class Emission(emission.Emission, metaclass=RemoveDecoratorMeta):
+    pass
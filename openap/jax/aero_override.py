@@ -0,0 +1,23 @@
+"""aero.py adapted for JAX
+
+The functions of :mod:`openap.extra.aero` are reused as they are, with
+``jax.numpy`` in place of numpy. They can be compiled with ``jax.jit``,
+differentiated with ``jax.grad`` and vectorized with ``jax.vmap``.
+
+The branches of the ISA model (troposphere and stratosphere) are kept, the
+derivatives are those of the active branch.
+"""
+
+import types
+
+from ..extra import aero as _aero
+from ..extra.aero import *  # noqa: F403, constants
+from . import numpy_override as np  # noqa: F401, used by the functions
+
+# rebind the functions of openap.extra.aero to the globals of this module
+for _name, _func in vars(_aero).items():
+    if isinstance(_func, types.FunctionType) and _func.__module__ == _aero.__name__:
+        globals()[_name] = types.FunctionType(
+            _func.__code__, globals(), _name, _func.__defaults__, _func.__closure__
+        )
+        globals()[_name].__doc__ = _func.__doc__
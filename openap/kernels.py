@@ -0,0 +1,301 @@
+"""Compiled kernels of the fuel flow and emission models, based on Numba.
+
+The models are evaluated point by point in compiled loops, which release the
+GIL (``nogil``). Contrary to the numpy models, which are made of many small
+array operations, several threads calling these kernels run in parallel,
+for example in a multi-threaded API server::
+
+    from concurrent.futures import ThreadPoolExecutor
+    from openap import kernels
+
+    fuelflow = kernels.FuelFlow("A320")
+
+    with ThreadPoolExecutor(8) as pool:
+        results = pool.map(lambda c: fuelflow.enroute(*c), chunks)
+
+The results are the same as FuelFlow.enroute() and the Emission methods,
+with the same coefficients, see FuelFlow._coefficients(). The functions are
+compiled at their first call.
+
+Numba is an optional dependency, required for this module.
+
+"""
+
+import math
+
+import numba
+
+import numpy as np
+
+from . import emission, fuel
+from .emission import DELTA_EXP, FF_THETA_EXP, NOX_HUMIDITY, NOX_OMEGA, THETA_EXP
+from .extra import aero, ndarrayconvert
+from .fuel import (
+    ACC_MAX,
+    GAMMA_MAX,
+    IDLE_MARGIN,
+    MAX_MARGIN,
+    RATIO_MIN,
+    RATIO_SHARPNESS,
+)
+from .thrust import (
+    A_EXP,
+    A_FIT,
+    B_EXP,
+    D_FIT,
+    IDLE_RATIO,
+    M_FIT,
+    N_FIT,
+    VRATIO_EXP,
+    X_FIT,
+    Z_FIT,
+)
+
+kts, ft, fpm = aero.kts, aero.ft, aero.fpm
+T0, p0, rho0, R, beta = aero.T0, aero.p0, aero.rho0, aero.R, aero.beta
+T_trop, h_trop, H_strat, rho_exp = aero.T_trop, aero.h_trop, aero.H_strat, aero.rho_exp
+a0, g0 = aero.a0, aero.g0
+gamma_R = aero.gamma * aero.R
+
+
+@numba.njit(nogil=True, error_model="numpy")
+def _atmos(h):
+    T = max(T0 + beta * h, T_trop)
+    rho = rho0 * (T / T0) ** rho_exp
+    rho *= math.exp(-max(0.0, h - h_trop) / H_strat)
+    p = rho * R * T
+    return p, rho, T
+
+
+@numba.njit(nogil=True, error_model="numpy")
+def _clean_drag(c, mass, tas, alt, vs):
+    """Drag.clean(), c: parameters of the models, see FuelFlow._coefficients()"""
+    v = tas * kts
+    _, rho, T = _atmos(alt * ft)
+    gamma = math.atan2(vs * fpm, v)
+    qS = max(0.5 * rho * v**2 * c.S, 1e-3)
+    cl = mass * g0 * math.cos(gamma) / qS
+
+    cd0 = c.cd0
+    if c.wave_drag:
+        mach = v / math.sqrt(gamma_R * T)
+        mach_crit = c.mach_crit0 - c.mach_crit_cl * (mass * g0 / qS)
+        cd0 += 20 * max(mach - mach_crit, 0.0) ** 4
+
+    return (cd0 + c.k * cl**2) * qS
+
+
+@numba.njit(nogil=True, error_model="numpy")
+def _climb_thrust(c, tas, alt, roc):
+    """Thrust.climb()"""
+    Pcr, P10 = c.Pcr, c.P10
+
+    roc = abs(roc)
+    v = max(10.0, tas) * kts
+    h = alt * ft
+    P, rho, T = _atmos(h)
+
+    if alt > 30000:
+        mratio = v / math.sqrt(gamma_R * T) / c.cruise_mach
+        d = D_FIT[0] * mratio + D_FIT[1]
+        b = mratio**B_EXP
+        return (d * math.log(P / Pcr) + b) * c.cruise_thrust
+
+    qdyn = P * ((1.0 + rho * v * v / (7.0 * P)) ** 3.5 - 1.0)
+    vcas = math.sqrt(7.0 * p0 / rho0 * ((qdyn / p0 + 1.0) ** (2.0 / 7.0) - 1.0))
+    vratio = vcas / c.vcas_ref
+    a = vratio**A_EXP
+    n = N_FIT[0] * roc + N_FIT[1]
+
+    if alt > 10000:
+        return a * (P / Pcr) ** (VRATIO_EXP * vratio + n) * c.cruise_thrust
+
+    F10_ratio = a * (P10 / Pcr) ** (VRATIO_EXP * vratio + n)
+    m = M_FIT[0] * vratio + M_FIT[1] * roc**2 + M_FIT[2] * roc + M_FIT[3]
+    return (m * (P / Pcr) + (F10_ratio - m * (P10 / Pcr))) * c.cruise_thrust
+
+
+@numba.njit(nogil=True, error_model="numpy")
+def _idle_thrust(c, tas, alt):
+    """Thrust.descent_idle()"""
+    mach = tas * kts / a0
+    dP = _atmos(alt * ft)[0] / p0
+    A = A_FIT[0] * dP**2 + A_FIT[1] * dP + A_FIT[2]
+    Z = Z_FIT[0] * dP**3 + Z_FIT[1] * dP**2 + Z_FIT[2] * dP
+    X = X_FIT[0] * dP**3 + X_FIT[1] * dP**2 + X_FIT[2] * dP
+    ratio = A - c.idle_cz * Z * mach + c.idle_cx * X * mach**2
+    return IDLE_RATIO * ratio * c.max_thrust
+
+
+@numba.njit(nogil=True, error_model="numpy")
+def _enroute(c, mass, tas, alt, vs, acc, limit, out):
+    """FuelFlow.enroute() for each point"""
+    log_c1 = math.log(c.c1)
+
+    for i in range(out.shape[0]):
+        D = _clean_drag(c, mass[i], tas[i], alt[i], vs[i])
+        gamma = math.atan2(vs[i] * fpm, tas[i] * kts)
+
+        a = acc[i]
+        if limit:
+            gamma = min(max(gamma, -GAMMA_MAX), GAMMA_MAX)
+            a = min(max(a, -ACC_MAX), ACC_MAX)
+
+        T = D + mass[i] * 9.81 * math.sin(gamma) + mass[i] * a
+
+        if limit:
+            T_max = _climb_thrust(c, tas[i], alt[i], 0.0)
+            T_idle = _idle_thrust(c, tas[i], alt[i])
+            T = max(T, T_idle * IDLE_MARGIN)
+            T = min(T, T_max * MAX_MARGIN)
+
+        # fuel flow at thrust, see FuelFlow.at_thrust()
+        x = T / c.max_thrust
+        x = math.log(1 + math.exp(RATIO_SHARPNESS * (x - RATIO_MIN)))
+        x = x / RATIO_SHARPNESS + RATIO_MIN
+        if limit:
+            x = min(x, 1.0)
+
+        y = x * math.exp(c.c3 * x) - log_c1 / c.c2
+        out[i] = c.c1 - math.exp(-c.c2 * y) * c.scale
+
+
+@numba.njit(nogil=True, error_model="numpy")
+def _interp(x, xp, fp):
+    """numpy.interp() of a scalar, without allocation"""
+    if x <= xp[0]:
+        return fp[0]
+    for j in range(1, xp.shape[0]):
+        if x <= xp[j]:
+            w = (x - xp[j - 1]) / (xp[j] - xp[j - 1])
+            return fp[j - 1] + (fp[j] - fp[j - 1]) * w
+    return fp[-1]
+
+
+@numba.njit(nogil=True, error_model="numpy")
+def _emission(n_eng, ff_modes, ei_modes, species, ffac, tas, alt, out):
+    """Emission.nox(), co() and hc() for each point, species: 0, 1, 2"""
+    for i in range(out.shape[0]):
+        # sea-level equivalent fuel flow, see Emission._fl2sl()
+        h = alt[i] * ft
+        T = _atmos(h)[2]
+        M = tas[i] * kts / math.sqrt(gamma_R * T)
+        beta = math.exp(0.2 * M**2)
+        theta = (T / 288.15) / beta
+        delta = (1 - 0.0019812 * alt[i] / 288.15) ** 5.255876 / beta**3.5
+        ratio = (theta**THETA_EXP) / (delta**DELTA_EXP)
+        ff_sl = (ffac[i] / n_eng) * theta**FF_THETA_EXP / delta * beta
+
+        ei_sl = _interp(ff_sl, ff_modes, ei_modes)
+
+        if species == 0:
+            omega = NOX_OMEGA[0] * math.exp(NOX_OMEGA[1] * (alt[i] - NOX_OMEGA[2]))
+            humidity = math.exp(NOX_HUMIDITY[0] * (omega - NOX_HUMIDITY[1]))
+            ei = ei_sl * math.sqrt(1 / ratio) * humidity
+        else:
+            ei = ei_sl * ratio
+
+        out[i] = ei * ffac[i]
+
+
+def _flat(*args):
+    """Broadcast the arguments, as contiguous 1D float64 arrays"""
+    shape = np.broadcast_shapes(*(np.shape(a) for a in args))
+    flat = [
+        np.ascontiguousarray(np.broadcast_to(a, shape), dtype=np.float64).ravel()
+        for a in args
+    ]
+    return shape, flat
+
+
+class FuelFlow(fuel.FuelFlow):
+    """Fuel flow model, with a compiled enroute() method."""
+
+    def __init__(self, ac, eng=None, **kwargs):
+        """Initialize FuelFlow object.
+
+        Args:
+            ac (string): ICAO aircraft type (for example: A320).
+            eng (string): Engine type (for example: CFM56-5A3).
+                Leave empty to use the default engine specified
+                by in the aircraft database.
+
+        """
+        super().__init__(ac, eng, **kwargs)
+
+        # parameters of the models, shared with the in-place Evaluator
+        self._params = self._coefficients()
+
+    @ndarrayconvert
+    def enroute(self, mass, tas, alt, vs=0, acc=0, limit=True):
+        """Compute the fuel flow during climb, cruise, or descent.
+
+        See openap.FuelFlow.enroute().
+
+        Args:
+            mass (int or ndarray): Aircraft mass (unit: kg).
+            tas (int or ndarray): Aircraft true airspeed (unit: kt).
+            alt (int or ndarray): Aircraft altitude (unit: ft).
+            vs (float or ndarray): Vertical rate (unit: ft/min). Default is 0.
+            acc (float or ndarray): acceleration (unit: m/s^2). Default is 0.
+
+        Returns:
+            float: Fuel flow (unit: kg/s).
+
+        """
+        shape, (mass, tas, alt, vs, acc) = _flat(mass, tas, alt, vs, acc)
+        out = np.empty(mass.shape[0])
+        _enroute(self._params, mass, tas, alt, vs, acc, bool(limit), out)
+        return out.reshape(shape)
+
+
+class Emission(emission.Emission):
+    """Emission model, with compiled nox(), co() and hc() methods."""
+
+    def __init__(self, ac, eng=None, **kwargs):
+        """Initialize Emission object.
+
+        Args:
+            ac (string): ICAO aircraft type (for example: A320).
+            eng (string): Engine type (for example: CFM56-5A3).
+                Leave empty to use the default engine specified
+                by in the aircraft database.
+
+        """
+        super().__init__(ac, eng, **kwargs)
+
+        self._ff_modes = np.array(self._modes("nox")[0], dtype=float)
+        self._ei_modes = {
+            species: np.array(self._modes(species)[1], dtype=float)
+            for species in ["nox", "co", "hc"]
+        }
+
+    def _evaluate(self, species, ffac, tas, alt):
+        shape, (ffac, tas, alt) = _flat(ffac, tas, alt)
+        out = np.empty(ffac.shape[0])
+        _emission(
+            float(self.n_eng),
+            self._ff_modes,
+            self._ei_modes[species],
+            ["nox", "co", "hc"].index(species),
+            ffac,
+            tas,
+            alt,
+            out,
+        )
+        return out.reshape(shape)
+
+    @ndarrayconvert
+    def nox(self, ffac, tas, alt=0):
+        """Compute NOx emission, see openap.Emission.nox() (unit: g/s)."""
+        return self._evaluate("nox", ffac, tas, alt)
+
+    @ndarrayconvert
+    def co(self, ffac, tas, alt=0):
+        """Compute CO emission, see openap.Emission.co() (unit: g/s)."""
+        return self._evaluate("co", ffac, tas, alt)
+
+    @ndarrayconvert
+    def hc(self, ffac, tas, alt=0):
+        """Compute HC emission, see openap.Emission.hc() (unit: g/s)."""
+        return self._evaluate("hc", ffac, tas, alt)
@@ -19,13 +19,23 @@ Examples:
             'statmodel_params': [17.82, 5.05, 0.62, 0.2]
         }
 
+    Random values can be drawn from the statistical models::
+
+        wrap.sample('cruise_mach', n=1000, rng=42)
+        wrap.sample_all(n=1000)
+
 """
 
 import glob
 import os
 
+import scipy.stats
+
+import numpy as np
 import pandas as pd
 
+from .extra import cache, instrument
+
 curr_path = os.path.dirname(os.path.realpath(__file__))
 dir_wrap = os.path.join(curr_path, "data/wrap/")
 file_synonym = os.path.join(curr_path, "data/wrap/_synonym.csv")
@@ -33,6 +43,47 @@ file_synonym = os.path.join(curr_path, "data/wrap/_synonym.csv")
 wrap_synonym = pd.read_csv(file_synonym)
 
 
+@cache
+@instrument.timed
+def available_aircraft():
+    """Get aircraft types with a kinematic model.
+
+    Returns:
+        list of string: aircraft types.
+
+    """
+    wrap_files = glob.glob(dir_wrap + "*.txt")
+    return [s[-8:-4].lower() for s in wrap_files]
+
+
+@cache
+@instrument.timed
+def load(ac):
+    """Load and parse the kinematic model of an aircraft.
+
+    Args:
+        ac (string): ICAO aircraft type with a WRAP model file.
+
+    Returns:
+        (pandas.DataFrame, dict): The model table, and the parsed parameters
+            of each variable.
+
+    """
+    df = pd.read_fwf(os.path.join(dir_wrap, ac + ".txt"))
+
+    params = dict()
+    for v in df.values:
+        params[v[0]] = {
+            "default": v[3],
+            "minimum": v[4],
+            "maximum": v[5],
+            "statmodel": v[6],
+            "statmodel_params": [float(i) for i in v[7].split("|")],
+        }
+
+    return df, params
+
+
 class WRAP(object):
     """Construct the kinematic model of the aicraft."""
 
@@ -49,8 +100,7 @@ class WRAP(object):
 
         self.use_synonym = kwargs.get("use_synonym", True)
 
-        wrap_files = glob.glob(dir_wrap + "*.txt")
-        ac_wrap_available = [s[-8:-4].lower() for s in wrap_files]
+        ac_wrap_available = available_aircraft()
 
         if self.ac not in ac_wrap_available and not self.use_synonym:
             raise ValueError((f"Kinematic model for {self.ac} not available."))
@@ -62,25 +112,67 @@ class WRAP(object):
             else:
                 raise ValueError(f"Kinematic model for {self.ac} not available.")
 
-        self.df = pd.read_fwf(os.path.join(dir_wrap, self.ac + ".txt"))
+        self.df, self.params = load(self.ac)
 
     def _get_var(self, var):
-        r = self.df[self.df["variable"] == var]
-
-        if r.shape[0] == 0:
+        if var not in self.params:
             raise ValueError(f"Variable {var} not found")
 
-        v = r.values[0]
-
-        res = {
-            "default": v[3],
-            "minimum": v[4],
-            "maximum": v[5],
-            "statmodel": v[6],
-            "statmodel_params": [float(i) for i in v[7].split("|")],
-        }
+        res = dict(self.params[var])
+        res["statmodel_params"] = list(res["statmodel_params"])
         return res
 
+    def distribution(self, var):
+        """Get the fitted statistical model of a variable.
+
+        Args:
+            var (string): Name of the accessor (for example: cruise_mach),
+                or of the variable (for example: cr_v_mach_mean).
+
+        Returns:
+            scipy.stats.rv_continuous: Frozen beta, gamma, or normal
+                distribution.
+
+        """
+        if var in self.params:
+            res = self.params[var]
+        else:
+            res = getattr(self, var)()
+
+        dist = getattr(scipy.stats, res["statmodel"])
+        return dist(*res["statmodel_params"])
+
+    def sample(self, var, n=1, rng=None):
+        """Draw random values of a variable from its statistical model.
+
+        Args:
+            var (string): Name of the accessor (for example: cruise_mach),
+                or of the variable (for example: cr_v_mach_mean).
+            n (int): Number of samples. Defaults to 1.
+            rng (numpy.random.Generator or int): Random generator or seed.
+
+        Returns:
+            ndarray: Samples with shape (n,).
+
+        """
+        return self.distribution(var).rvs(size=n, random_state=rng)
+
+    def sample_all(self, n=1, rng=None):
+        """Draw random values of all variables from their statistical models.
+
+        The variables are sampled independently.
+
+        Args:
+            n (int): Number of samples. Defaults to 1.
+            rng (numpy.random.Generator or int): Random generator or seed.
+
+        Returns:
+            pandas.DataFrame: One column per variable, and n rows.
+
+        """
+        rng = np.random.default_rng(rng)
+        return pd.DataFrame({var: self.sample(var, n, rng) for var in self.params})
+
     def takeoff_speed(self):
         """Get takeoff speed."""
         return self._get_var("to_v_lof")
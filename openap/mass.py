@@ -1,6 +1,14 @@
 import numpy as np
 
 from . import prop
+from .extra import cache
+
+
+@cache
+def _mass_params(typecode, use_synonym=False):
+    """Get MTOW, OEW, MFC and range of an aircraft type, parsed only once."""
+    ac = prop.aircraft(typecode, use_synonym=use_synonym)
+    return ac["mtow"], ac["oew"], ac["mfc"], ac["cruise"]["range"]
 
 
 def from_range(typecode, distance, load_factor=0.8, fraction=False, **kwargs):
@@ -9,29 +17,42 @@ def from_range(typecode, distance, load_factor=0.8, fraction=False, **kwargs):
     This function calculates the aircraft mass considering fuel and payload weights
     based on the given flight distance and load factor.
 
+    The typecode can also be an array of type codes (for example, one per
+    flight), in which case distance and load_factor are broadcast against it.
+    The parameters of each unique type code are loaded only once.
+
     Args:
-        typecode (str): ICAO aircraft type code (e.g. A320, B738)
-        distance (float): Flight distance in nautical miles
-        load_factor (float): Load factor between 0 and 1, default 0.8
+        typecode (str or array of str): ICAO aircraft type code (e.g. A320, B738)
+        distance (float or ndarray): Flight distance in nautical miles
+        load_factor (float or ndarray): Load factor between 0 and 1, default 0.8
         fraction (bool): If True, return mass fraction of MTOW, default False
 
     Returns:
-        float: Aircraft mass in kg, or mass fraction if fraction=True
+        float or ndarray: Aircraft mass in kg, or mass fraction if fraction=True
 
     """
-    ac = prop.aircraft(typecode, **kwargs)
+    use_synonym = kwargs.get("use_synonym", False)
+
+    if isinstance(typecode, str):
+        mtow, oew, mfc, ac_range = _mass_params(typecode.lower(), use_synonym)
+    else:
+        typecodes = np.char.lower(np.asarray(typecode, dtype=str))
+        unique, inverse = np.unique(typecodes, return_inverse=True)
+        table = np.array([_mass_params(t, use_synonym) for t in unique], dtype=float)
+        params = table[inverse.reshape(typecodes.shape)]
+        mtow, oew, mfc, ac_range = np.moveaxis(params, -1, 0)
 
-    range_fraction = distance / ac["cruise"]["range"]
+    range_fraction = np.asarray(distance) / ac_range
     range_fraction = np.clip(range_fraction, 0.2, 1)
 
-    max_fuel_weight = ac["mfc"] * 0.8025  # L->kg
+    max_fuel_weight = mfc * 0.8025  # L->kg
     fuel_weight = range_fraction * max_fuel_weight
 
-    payload_weight = (ac["mtow"] - max_fuel_weight - ac["oew"]) * load_factor
+    payload_weight = (mtow - max_fuel_weight - oew) * load_factor
 
-    mass = ac["oew"] + fuel_weight + payload_weight
+    mass = oew + fuel_weight + payload_weight
 
     if fraction:
-        return mass / ac["mtow"]
+        return mass / mtow
     else:
         return mass
@@ -1,8 +1,10 @@
 """Using fuzzy logic to indentify flight phase in trajectory data."""
 
-import numpy as np
+from collections import deque
+
 from matplotlib import pyplot as plt
 
+import numpy as np
 from openap.extra import fuzzy
 
 
@@ -82,91 +84,90 @@ class FlightPhase(object):
                 "Trajectory data not set, run set_trajectory(ts, alt, spd, roc) first"
             )
 
-        idxs = np.arange(0, self.ndata)
-
-        labels = ["NA"] * self.ndata
-
-        twindows = self.ts // twindow
-
-        for tw in range(0, int(max(twindows))):
-            if tw not in twindows:
-                continue
-
-            mask = twindows == tw
-
-            idxchk = idxs[mask]
-            altchk = self.alt[mask]
-            spdchk = self.spd[mask]
-            rocchk = self.roc[mask]
-
-            # mean value or extream value as range
-            alt = max(min(np.mean(altchk), self.alt_range[-1]), self.alt_range[0])
-            spd = max(min(np.mean(spdchk), self.spd_range[-1]), self.spd_range[0])
-            roc = max(min(np.mean(rocchk), self.roc_range[-1]), self.roc_range[0])
-
-            # make sure values are within the boundaries
-            alt = max(min(alt, self.alt_range[-1]), self.alt_range[0])
-            spd = max(min(spd, self.spd_range[-1]), self.spd_range[0])
-            roc = max(min(roc, self.roc_range[-1]), self.roc_range[0])
-
-            alt_level_gnd = fuzzy.interp_membership(self.alt_range, self.alt_gnd, alt)
-            alt_level_lo = fuzzy.interp_membership(self.alt_range, self.alt_lo, alt)
-            alt_level_hi = fuzzy.interp_membership(self.alt_range, self.alt_hi, alt)
-
-            spd_level_hi = fuzzy.interp_membership(self.spd_range, self.spd_hi, spd)
-            spd_level_md = fuzzy.interp_membership(self.spd_range, self.spd_md, spd)
-            spd_level_lo = fuzzy.interp_membership(self.spd_range, self.spd_lo, spd)
-
-            roc_level_zero = fuzzy.interp_membership(self.roc_range, self.roc_zero, roc)
-            roc_level_plus = fuzzy.interp_membership(self.roc_range, self.roc_plus, roc)
-            roc_level_minus = fuzzy.interp_membership(
-                self.roc_range, self.roc_minus, roc
-            )
-
-            # print alt_level_gnd, alt_level_lo, alt_level_hi
-            # print roc_level_zero, roc_level_plus, roc_level_minus
-            # print spd_level_hi, spd_level_md, spd_level_lo
+        labels = np.full(self.ndata, "NA", dtype=object)
 
-            rule_ground = min(alt_level_gnd, roc_level_zero, spd_level_lo)
-            state_activate_ground = np.fmin(rule_ground, self.state_ground)
+        twindows = np.asarray(self.ts // twindow, dtype=int)
 
-            rule_climb = min(alt_level_lo, roc_level_plus, spd_level_md)
-            state_activate_climb = np.fmin(rule_climb, self.state_climb)
+        # all windows but the last one are labelled, from their mean values
+        mask = twindows < twindows.max()
+        _, inverse = np.unique(twindows[mask], return_inverse=True)
+        counts = np.bincount(inverse)
 
-            rule_descent = min(alt_level_lo, roc_level_minus, spd_level_md)
-            state_activate_descent = np.fmin(rule_descent, self.state_descent)
+        alt, spd, roc = (
+            np.bincount(inverse, weights=np.asarray(x)[mask]) / counts
+            for x in (self.alt, self.spd, self.roc)
+        )
 
-            rule_cruise = min(alt_level_hi, roc_level_zero, spd_level_hi)
-            state_activate_cruise = np.fmin(rule_cruise, self.state_cruise)
+        states = self.states_from_means(alt, spd, roc)
+        names = np.array([self.state_lable_map.get(s, "NA") for s in range(7)])
+        labels[mask] = names[states][inverse]
 
-            rule_level = min(alt_level_lo, roc_level_zero, spd_level_md)
-            state_activate_level = np.fmin(rule_level, self.state_level)
+        return labels.tolist()
 
-            aggregated = np.max(
-                np.vstack(
-                    [
-                        state_activate_ground,
-                        state_activate_climb,
-                        state_activate_descent,
-                        state_activate_cruise,
-                        state_activate_level,
-                    ]
-                ),
-                axis=0,
-            )
+    def states_from_means(self, alt, spd, roc, chunk=1000):
+        """Fuzzy logic states of time windows, vectorized over the windows.
 
-            state_raw = fuzzy.defuzz(self.states, aggregated, "lom")
-            state = int(round(state_raw))
-            if state > 6:
-                state = 6
-            if state < 1:
-                state = 1
+        Args:
+            alt (ndarray): Mean altitude of each window (unit: ft).
+            spd (ndarray): Mean speed of each window (unit: kt).
+            roc (ndarray): Mean rate of climb of each window (unit: ft/min).
+            chunk (int): Number of windows defuzzified at once. Default to 1000.
 
-            if len(idxchk) > 0:
-                label = self.state_lable_map[state]
-                labels[idxchk[0] : (idxchk[-1] + 1)] = [label] * len(idxchk)
+        Returns:
+            ndarray: States of the windows, keys of state_lable_map.
 
-        return labels
+        """
+        # make sure values are within the boundaries
+        alt = np.clip(alt, self.alt_range[0], self.alt_range[-1])
+        spd = np.clip(spd, self.spd_range[0], self.spd_range[-1])
+        roc = np.clip(roc, self.roc_range[0], self.roc_range[-1])
+
+        alt_level_gnd = fuzzy.interp_membership(self.alt_range, self.alt_gnd, alt)
+        alt_level_lo = fuzzy.interp_membership(self.alt_range, self.alt_lo, alt)
+        alt_level_hi = fuzzy.interp_membership(self.alt_range, self.alt_hi, alt)
+
+        spd_level_hi = fuzzy.interp_membership(self.spd_range, self.spd_hi, spd)
+        spd_level_md = fuzzy.interp_membership(self.spd_range, self.spd_md, spd)
+        spd_level_lo = fuzzy.interp_membership(self.spd_range, self.spd_lo, spd)
+
+        roc_level_zero = fuzzy.interp_membership(self.roc_range, self.roc_zero, roc)
+        roc_level_plus = fuzzy.interp_membership(self.roc_range, self.roc_plus, roc)
+        roc_level_minus = fuzzy.interp_membership(self.roc_range, self.roc_minus, roc)
+
+        # rules of the ground, climb, descent, cruise, and level states
+        rules = np.stack(
+            [
+                np.minimum.reduce([alt_level_gnd, roc_level_zero, spd_level_lo]),
+                np.minimum.reduce([alt_level_lo, roc_level_plus, spd_level_md]),
+                np.minimum.reduce([alt_level_lo, roc_level_minus, spd_level_md]),
+                np.minimum.reduce([alt_level_hi, roc_level_zero, spd_level_hi]),
+                np.minimum.reduce([alt_level_lo, roc_level_zero, spd_level_md]),
+            ],
+            axis=-1,
+        ).reshape(-1, 5)
+
+        state_mfs = np.vstack(
+            [
+                self.state_ground,
+                self.state_climb,
+                self.state_descent,
+                self.state_cruise,
+                self.state_level,
+            ]
+        )
+
+        state_raw = np.empty(len(rules))
+        for i in range(0, len(rules), chunk):
+            activate = np.fmin(rules[i : i + chunk, :, None], state_mfs)
+            aggregated = activate.max(axis=1)
+
+            # defuzzification with the largest of maximum, as fuzzy.defuzz()
+            is_max = aggregated == aggregated.max(axis=1, keepdims=True)
+            last = is_max.shape[1] - 1 - np.argmax(is_max[:, ::-1], axis=1)
+            state_raw[i : i + chunk] = self.states[last]
+
+        states = np.clip(np.round(state_raw).astype(int), 1, 6)
+        return states.reshape(np.shape(alt))
 
     def plot_logics(self):
         """Visualize fuzzy logic membership functions."""
@@ -415,3 +416,211 @@ class FlightPhase(object):
         }
 
         return idx
+
+
+class OnlineFlightPhase(object):
+    """Incremental flight phase identification, for streaming data.
+
+    Points are given one at a time, as they arrive. The label of a time
+    window is emitted when the window closes, from the running means of the
+    window, as in FlightPhase.phaselabel(). In both, the windows are counted
+    from the time of the first point, not from the multiples of twindow. The
+    takeoff (TO), initial climb (IC), final approach (FA), and landing (LD) are
+    detected with the rules of FlightPhase.flight_phase_indices(), on the
+    recent points only.
+
+    The fuzzy membership functions are shared by all instances, so that only
+    the running sums and the recent points are kept for each stream.
+
+    """
+
+    # FlightPhase shared by the instances, created at the first use
+    _flight_phase = None
+
+    def __init__(self, twindow=60, lookbehind=600, maxlen=6000, flight_phase=None):
+        """Initialize the OnlineFlightPhase object.
+
+        Args:
+            twindow (int): Time window in number of seconds. Default to 60.
+            lookbehind (int): Duration of the recent points kept for the
+                detection of the takeoff and landing (unit: s). Default to 600.
+            maxlen (int): Maximum number of recent points kept. Default to 6000.
+            flight_phase (FlightPhase): Fuzzy logic of the window labels.
+                Default to a FlightPhase shared by all instances.
+
+        """
+        if flight_phase is None:
+            if OnlineFlightPhase._flight_phase is None:
+                OnlineFlightPhase._flight_phase = FlightPhase()
+            flight_phase = OnlineFlightPhase._flight_phase
+        self.flight_phase = flight_phase
+
+        self.twindow = twindow
+        self.lookbehind = lookbehind
+
+        # recent points: (index, ts, alt, spd)
+        self.buffer = deque(maxlen=maxlen)
+
+        self.ts0 = None
+        self.npoints = 0
+        self.label = "NA"
+
+        # running sums of the current window
+        self.window = None
+        self.window_start = None
+        self.sums = np.zeros(4)
+
+        # final approach and landing roll in progress
+        self.approach = None
+
+    def update(self, ts, alt, spd, roc):
+        """Add a new point.
+
+        Args:
+            ts (float): Time (unit: second).
+            alt (float): Altitude (unit: ft).
+            spd (float): True airspeed (unit: kt).
+            roc (float): Rate of climb (unit: ft/min). Negative for descent.
+
+        Returns:
+            list: Events, as (label, ts). Labels of closed windows, with the
+                time of their first point, could be GND, CL, DE, CR, or LVL.
+                Detected transitions could be TO, IC, FA, or LD.
+
+        """
+        events = []
+
+        if self.ts0 is None:
+            self.ts0 = ts
+
+        # windows start at the first point, see FlightPhase.set_trajectory()
+        window = (ts - self.ts0) // self.twindow
+        if window != self.window:
+            events.extend(self._close_window())
+            self.window, self.window_start = window, ts
+
+        self.sums += (alt, spd, roc, 1)
+
+        prev = self.buffer[-1] if self.buffer else None
+        if prev is not None and prev[2] < 1500 <= alt:
+            events.extend(self._takeoff())
+            self.approach = None
+
+        if prev is not None and alt < 1500 <= prev[2]:
+            # start of the final approach chunk
+            self.approach = dict(istart=self.npoints, ts=ts, alt=alt, spdtmp=spd)
+
+        index = self.npoints
+        self.buffer.append((index, ts, alt, spd))
+        self.npoints += 1
+        while self.buffer[0][1] < ts - self.lookbehind:
+            self.buffer.popleft()
+
+        if self.approach is not None and "iend" not in self.approach:
+            approach = self.approach
+            if (spd <= 50 and spd >= approach["spdtmp"]) or spd < 30:
+                # end of the landing roll, at the previous point
+                approach["iend"] = approach.get("last", approach["istart"] - 1)
+                events.extend(self._landing())
+            else:
+                approach["last"] = index
+                approach["spdtmp"] = spd
+
+        return events
+
+    def flush(self):
+        """Close the current window and the landing in progress.
+
+        Returns:
+            list: Events, as (label, ts), see update().
+
+        """
+        events = self._close_window()
+        self.window = None
+
+        if self.approach is not None and "iend" not in self.approach:
+            self.approach["iend"] = self.approach.get("last", self.npoints - 1)
+            events.extend(self._landing())
+
+        return events
+
+    def _close_window(self):
+        if self.window is None or self.sums[3] == 0:
+            return []
+
+        alt, spd, roc = self.sums[:3] / self.sums[3]
+        state = int(self.flight_phase.states_from_means(alt, spd, roc))
+        self.label = self.flight_phase.state_lable_map.get(state, "NA")
+        self.sums[:] = 0
+
+        return [(self.label, self.window_start)]
+
+    def _recent(self, istart=None, iend=None):
+        """Arrays of the recent points between two indices"""
+        index, ts, alt, spd = map(np.array, zip(*self.buffer))
+        mask = np.ones(len(index), dtype=bool)
+        if istart is not None:
+            mask &= index >= istart
+        if iend is not None:
+            mask &= index <= iend
+        return index[mask], ts[mask], alt[mask], spd[mask]
+
+    def _takeoff(self):
+        """Takeoff and initial climb, when climbing through 1500 ft."""
+        index, ts, alt, spd = self._recent()
+
+        # keep only the chunk in taking-off states, break at starting point
+        iend = len(index) - 1
+        istart = 0
+        spdtmp = spd[iend]
+        for i in reversed(range(0, iend)):
+            if spd[i] < 30 and spd[i] > spdtmp:
+                break
+            elif spd[i] < 5:
+                break
+            else:
+                istart = i
+                spdtmp = spd[i]
+
+        # ignore too long take-off, insufficient chunk size, no in air data
+        if ts[iend] - ts[istart] > 300 or iend - istart < 10 or alt[iend] < 200:
+            return []
+
+        # find the liftoff moment
+        ilof = istart
+        for i in range(istart + 1, iend):
+            if abs(alt[i] - alt[i - 1]) > 10:
+                ilof = i
+                break
+
+        # not sufficient data
+        if ilof - istart < 5:
+            return []
+
+        return [("TO", float(ts[istart])), ("IC", float(ts[ilof]))]
+
+    def _landing(self):
+        """Final approach and landing, at the end of the landing roll."""
+        approach = self.approach
+        istart, iend = approach["istart"], approach["iend"]
+
+        # ignore QNH altitude, or no in-air data
+        if approach["alt"] < 100:
+            return []
+
+        index, ts, alt, _ = self._recent(istart, iend)
+        if len(index) == 0:
+            return []
+
+        # find the landing moment
+        ild = len(index) - 1
+        for i in reversed(range(0, len(index) - 2)):
+            if abs(alt[i] - alt[i + 1]) > 10:
+                ild = i
+                break
+
+        # ignore ground or air data sample less than 4
+        if index[ild] - istart < 5 or iend - index[ild] < 5:
+            return []
+
+        return [("FA", approach["ts"]), ("LD", float(ts[ild]))]
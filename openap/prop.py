@@ -3,14 +3,13 @@
 import glob
 import os
 import warnings
-from functools import lru_cache
 
 import yaml
 
 import numpy as np
 import pandas as pd
 
-warnings.simplefilter("once", UserWarning)
+from .extra import cache, instrument
 
 curr_path = os.path.dirname(os.path.realpath(__file__))
 dir_aircraft = os.path.join(curr_path, "data/aircraft/")
@@ -20,7 +19,8 @@ file_synonym = os.path.join(curr_path, "data/aircraft/_synonym.csv")
 aircraft_synonym = pd.read_csv(file_synonym)
 
 
-@lru_cache()
+@cache
+@instrument.timed
 def available_aircraft(use_synonym=False):
     """Get available aircraft types in OpenAP model.
 
@@ -38,6 +38,7 @@ def available_aircraft(use_synonym=False):
     return acs
 
 
+@instrument.timed
 def aircraft(ac, use_synonym=False, **kwargs):
     """Get details of an aircraft type.
 
@@ -88,7 +89,8 @@ def aircraft(ac, use_synonym=False, **kwargs):
     return acdict
 
 
-@lru_cache()
+@cache
+@instrument.timed
 def aircraft_engine_options(ac):
     """Get engine options of an aircraft type.
 
@@ -109,7 +111,8 @@ def aircraft_engine_options(ac):
     return eng_options
 
 
-@lru_cache()
+@cache
+@instrument.timed
 def search_engine(eng):
     """Search engine by the starting characters.
 
@@ -136,7 +139,8 @@ def search_engine(eng):
     return result
 
 
-@lru_cache()
+@cache
+@instrument.timed
 def engine(eng):
     """Get engine parameters.
 
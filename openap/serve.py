@@ -0,0 +1,352 @@
+"""Local HTTP/JSON service for the fuel flow, drag, thrust and emission models.
+
+Concurrent requests for the same model, aircraft, engine and method are
+collected during a short time window, and evaluated together in one
+vectorized call. Model instances are kept warm in a cache. Start the service
+with::
+
+    python -m openap.serve --port 8080 --window 2
+
+or on a Unix socket with ``--unix /tmp/openap.sock``. Models are called with
+a POST request at ``/<model>/<method>``, where model is one of ``fuelflow``,
+``drag``, ``thrust`` and ``emission``. The JSON body contains the aircraft
+type, the optional engine type and the arguments of the method, as numbers
+or lists::
+
+    curl -d '{"ac": "A320", "mass": 60000, "tas": 400, "alt": 35000}' \\
+        http://localhost:8080/fuelflow/enroute
+
+    {"result": 0.8796}
+
+The service can also be embedded in an existing asyncio application::
+
+    service = Service(window=0.002)
+    ff = await service.evaluate("fuelflow", "enroute", "A320", mass=60000, ...)
+
+"""
+
+import argparse
+import asyncio
+import json
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from . import drag, emission, fuel, thrust
+
+MODELS = {
+    "fuelflow": (fuel.FuelFlow, ["at_thrust", "takeoff", "enroute"]),
+    "drag": (drag.Drag, ["clean", "nonclean", "evaluate"]),
+    "thrust": (thrust.Thrust, ["takeoff", "cruise", "climb", "descent_idle"]),
+    "emission": (
+        emission.Emission,
+        ["co2", "h2o", "soot", "sox", "nox", "co", "hc"],
+    ),
+}
+
+# models which do not depend on the engine, the engine type is ignored
+ENGINE_FREE = {"drag"}
+
+# arguments used as scalars by the models, requests are grouped by their values
+STATIC = {"limit"}
+
+STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class RequestError(Exception):
+    """Invalid request, returned to the client with its HTTP status code."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Service:
+    """Micro-batching evaluation of the models.
+
+    Args:
+        window (float): Time window to collect requests (unit: s).
+            Defaults to 0.002.
+        max_batch (int): Maximum number of points of a batch, evaluated
+            without waiting for the end of the window. Defaults to 100000.
+        **kwargs: Passed to the models, for example ``use_synonym=True``.
+
+    """
+
+    def __init__(self, window=0.002, max_batch=100_000, **kwargs):
+        self.window = window
+        self.max_batch = max_batch
+        self.model_kwargs = kwargs
+
+        self.models = {}
+        self.pending = defaultdict(list)
+        self.sizes = defaultdict(int)
+        self.timers = {}
+        self.batches = 0
+        self.points = 0
+
+    def model(self, name, ac, eng=None):
+        """Get a model instance, created at its first use."""
+        if name not in MODELS:
+            raise RequestError(f"Unknown model: {name}", 404)
+        if name in ENGINE_FREE:
+            eng = None
+
+        key = (name, ac, eng)
+        if key not in self.models:
+            cls = MODELS[name][0]
+            kwargs = dict(self.model_kwargs)
+            if name not in ENGINE_FREE:
+                kwargs["eng"] = eng
+            try:
+                self.models[key] = cls(ac, **kwargs)
+            except Exception as e:
+                raise RequestError(f"{type(e).__name__}: {e}") from e
+        return self.models[key]
+
+    async def evaluate(self, model, method, ac, eng=None, **kwargs):
+        """Evaluate a model method, batched with the concurrent calls.
+
+        Args:
+            model (str): Model name: fuelflow, drag, thrust or emission.
+            method (str): Method of the model, for example enroute.
+            ac (string): ICAO aircraft type (for example: A320).
+            eng (string): Engine type (for example: CFM56-5A3).
+            **kwargs: Arguments of the method, scalars or arrays.
+
+        Returns:
+            float or ndarray: Result of the method.
+
+        """
+        if model not in MODELS or method not in MODELS[model][1]:
+            raise RequestError(f"Unknown method: {model}.{method}", 404)
+
+        self.model(model, ac, eng)
+        if model in ENGINE_FREE:
+            eng = None
+
+        names = tuple(sorted(k for k in kwargs if k not in STATIC))
+        static = tuple(sorted((k, v) for k, v in kwargs.items() if k in STATIC))
+        key = (model, method, ac, eng, names, static)
+        try:
+            hash(key)
+        except TypeError as e:
+            raise RequestError(f"Invalid arguments: {e}") from e
+
+        values = tuple(kwargs[k] for k in names)
+        if all(isinstance(v, (int, float)) for v in values):
+            shape = ()
+        else:
+            try:
+                values = np.broadcast_arrays(*(np.asarray(v, float) for v in values))
+            except (TypeError, ValueError) as e:
+                raise RequestError(f"Invalid arguments: {e}") from e
+            shape = values[0].shape if values else ()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending[key].append((values, shape, future))
+        self.sizes[key] += math.prod(shape)
+
+        if self.sizes[key] >= self.max_batch:
+            self._flush(key)
+        elif key not in self.timers:
+            self.timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key):
+        """Evaluate the pending requests of a group in one call."""
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        requests = self.pending.pop(key, [])
+        self.sizes.pop(key, None)
+        if not requests:
+            return
+
+        model, method, ac, eng, names, static = key
+        func = getattr(self.model(model, ac, eng), method)
+
+        sizes = [math.prod(shape) for _, shape, _ in requests]
+
+        try:
+            if all(shape == () for _, shape, _ in requests):
+                columns = np.array([values for values, _, _ in requests], float).T
+            else:
+                columns = [
+                    np.concatenate([np.ravel(values[i]) for values, _, _ in requests])
+                    for i in range(len(names))
+                ]
+
+            result = func(**dict(zip(names, columns)), **dict(static))
+            result = np.broadcast_to(result, (sum(sizes),))
+        except Exception as e:
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(RequestError(f"{type(e).__name__}: {e}"))
+            return
+
+        self.batches += 1
+        self.points += len(result)
+
+        start = 0
+        for (_, shape, future), size in zip(requests, sizes):
+            if not future.done():
+                value = result[start : start + size].reshape(shape)
+                future.set_result(value if shape else float(value))
+            start += size
+
+    async def handle(self, reader, writer):
+        """Handle an HTTP connection, with keep-alive."""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except RequestError as e:
+                    # the rest of the stream can not be parsed, reply and close
+                    await _respond(writer, e.status, {"error": str(e)})
+                    break
+
+                if request is None:
+                    break
+
+                http_method, path, body, close = request
+                try:
+                    if http_method != "POST":
+                        raise RequestError("Only POST is supported", 405)
+                    status, content = 200, await self._call(path, body)
+                except RequestError as e:
+                    status, content = e.status, {"error": str(e)}
+                except Exception as e:
+                    # invalid arguments, or errors raised by the models
+                    status, content = 400, {"error": f"{type(e).__name__}: {e}"}
+
+                await _respond(writer, status, content)
+
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _call(self, path, body):
+        parts = path.strip("/").split("/")
+        if len(parts) != 2:
+            raise RequestError(f"Not found: {path}", 404)
+
+        try:
+            params = json.loads(body or b"{}")
+        except ValueError as e:
+            raise RequestError(f"Invalid JSON: {e}") from e
+        if not isinstance(params, dict) or "ac" not in params:
+            raise RequestError("Missing aircraft type: ac")
+
+        ac, eng = params.pop("ac"), params.pop("eng", None)
+        if not isinstance(ac, str) or not isinstance(eng, (str, type(None))):
+            raise RequestError("Invalid aircraft or engine type")
+
+        reserved = {"model", "method"} & set(params)
+        if reserved:
+            raise RequestError(f"Invalid arguments: {sorted(reserved)}")
+
+        result = await self.evaluate(*parts, ac, eng, **params)
+        return {"result": _to_json(result)}
+
+    async def start(self, host="127.0.0.1", port=8080, unix=None):
+        """Start the server, on a TCP port or a Unix socket.
+
+        Args:
+            host (str): Host address. Defaults to 127.0.0.1.
+            port (int): TCP port. Defaults to 8080.
+            unix (str): Path of the Unix socket, used instead of host/port.
+
+        Returns:
+            asyncio.Server: The server.
+
+        """
+        if unix is not None:
+            return await asyncio.start_unix_server(self.handle, path=unix)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def _read_request(reader):
+    """Read an HTTP request: (method, path, body, close), or None at the end."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError("Malformed request line") from None
+
+    length, close = 0, False
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            try:
+                length = int(value)
+            except ValueError:
+                raise RequestError("Invalid Content-Length") from None
+            if length < 0:
+                raise RequestError("Invalid Content-Length")
+        if name.strip().lower() == "connection":
+            close = value.strip().lower() == "close"
+
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body, close
+
+
+async def _respond(writer, status, content):
+    """Write an HTTP response with a JSON body."""
+    payload = json.dumps(content).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode()
+        + payload
+    )
+    await writer.drain()
+
+
+def _to_json(result):
+    """Convert a result to JSON values, NaN as null."""
+    if np.ndim(result) == 0:
+        value = float(result)
+        return None if math.isnan(value) else value
+    return [_to_json(r) for r in result]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAP model service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="path of a Unix socket")
+    parser.add_argument("--window", type=float, default=2, help="unit: ms")
+    parser.add_argument("--max-batch", type=int, default=100_000)
+    parser.add_argument("--use-synonym", action="store_true")
+    args = parser.parse_args()
+
+    service = Service(
+        window=args.window / 1000,
+        max_batch=args.max_batch,
+        use_synonym=args.use_synonym,
+    )
+
+    async def run():
+        server = await service.start(args.host, args.port, args.unix)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Response surfaces of the thrust and fuel flow models.
+
+The models are tabulated once per aircraft and engine on a regular grid, and
+evaluated by interpolation in the table. The tables can be persisted to npz
+files in a cache directory, and are then loaded instead of tabulated again::
+
+    from openap import surrogate
+
+    fuelflow = surrogate.FuelFlow("A320", cache_dir="~/.cache/openap")
+    ff = fuelflow.enroute(mass, tas, alt, vs)
+    fuelflow.max_error["enroute"]  # kg/s
+
+Inputs outside of the grid are clipped to its bounds. The maximum error of
+each table is estimated against the analytic model at the centres of the
+grid cells, where the linear interpolation error is the largest, and
+max_error holds the largest one over the tables of each method.
+
+Vectorized numpy models are already fast for large arrays, where table lookup
+is about as fast. The surrogates are faster for small batches and scalar
+calls, where the fixed cost of the many array operations of the models
+dominates, as in Monte Carlo and optimization loops.
+
+"""
+
+import hashlib
+import itertools
+import os
+from types import MappingProxyType
+
+from scipy import ndimage
+
+import numpy as np
+
+from . import extra, fuel, thrust
+from .extra import ndarrayconvert
+
+# version of the cached tables, to increase when the models or the format change
+TABLE_VERSION = 1
+
+
+class Surrogate:
+    """Model function tabulated on a regular grid."""
+
+    def __init__(self, func, grid, method="linear", cache_file=None, **kwargs):
+        """Initialize the response surface.
+
+        Args:
+            func (callable): Vectorized function, called with the grid
+                coordinates as keyword arguments.
+            grid (dict): Axes of the grid, as {argument: (start, stop, num)},
+                in the order of the arguments of the surrogate.
+            method (str): Interpolation method, "linear" or "cubic".
+                Defaults to "linear".
+            cache_file (str): Path to a npz file to persist the table.
+                Optional.
+            **kwargs: Constant keyword arguments passed to func.
+
+        """
+        if method not in ("linear", "cubic"):
+            raise ValueError(f"Unknown interpolation method: {method}")
+
+        self.names = list(grid)
+        self.axes = [np.linspace(*grid[name]) for name in self.names]
+        self.method = method
+
+        self.lower = np.array([a[0] for a in self.axes])
+        self.upper = np.array([a[-1] for a in self.axes])
+        self.step = np.array([a[1] - a[0] for a in self.axes])
+
+        if cache_file is not None and os.path.exists(cache_file):
+            with np.load(cache_file) as data:
+                self._set_table(data["table"])
+                self.max_error = float(data["max_error"])
+        else:
+            self._set_table(self._tabulate(func, self.axes, kwargs))
+            self.max_error = self._validate(func, kwargs)
+            if cache_file is not None:
+                np.savez(cache_file, table=self.table, max_error=self.max_error)
+
+    def _set_table(self, table):
+        self.table = table
+        self.strides = np.cumprod((*table.shape, 1)[:0:-1])[::-1]
+        self._corners = [
+            (int(np.dot(corner, self.strides)), corner)
+            for corner in itertools.product((0, 1), repeat=table.ndim)
+        ]
+        if self.method == "cubic":
+            self._coefs = ndimage.spline_filter(table, order=3, mode="nearest")
+
+    def _tabulate(self, func, axes, kwargs):
+        mesh = np.meshgrid(*axes, indexing="ij")
+        values = func(**dict(zip(self.names, mesh)), **kwargs)
+        return np.broadcast_to(values, mesh[0].shape).astype(float)
+
+    def _validate(self, func, kwargs):
+        """Maximum absolute error at the centres of the grid cells."""
+        centres = [(a[1:] + a[:-1]) / 2 for a in self.axes]
+        expected = self._tabulate(func, centres, kwargs)
+        mesh = np.meshgrid(*centres, indexing="ij")
+        error = np.abs(self(*(m.ravel() for m in mesh)) - expected.ravel())
+        return float(np.nanmax(error))
+
+    def __call__(self, *args):
+        """Evaluate the response surface.
+
+        Args:
+            *args (float or ndarray): Coordinates, in the order of the grid.
+
+        Returns:
+            ndarray: Interpolated values, NaN where an input is not finite.
+
+        """
+        args = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args))
+        shape = args[0].shape
+
+        # non-finite inputs are moved into the grid, and their result masked
+        finite = np.logical_and.reduce([np.isfinite(x) for x in args])
+        if not finite.all():
+            args = [np.where(finite, x, lo) for x, lo in zip(args, self.lower)]
+            return np.where(finite, self(*args), np.nan)
+
+        if self.method == "cubic":
+            # cubic spline, with the coefficients computed once
+            coords = [
+                (np.clip(x, lo, up) - lo) / step
+                for x, lo, up, step in zip(args, self.lower, self.upper, self.step)
+            ]
+            coords = np.array([c.ravel() for c in coords])
+            result = ndimage.map_coordinates(
+                self._coefs, coords, order=3, mode="nearest", prefilter=False
+            )
+            return result.reshape(shape)
+
+        # multilinear interpolation, with the indices of the uniform grid
+        table = self.table.ravel()
+
+        base = 0
+        weights = []
+        for k, x in enumerate(args):
+            u = (x - self.lower[k]) * (1 / self.step[k])
+            u = np.minimum(np.maximum(u, 0), self.table.shape[k] - 1)
+            i = np.minimum(u.astype(np.intp), self.table.shape[k] - 2)
+            base = base + i * self.strides[k]
+            weights.append(u - i)
+
+        result = 0
+        for offset, corner in self._corners:
+            w = 1
+            for c, wk in zip(corner, weights):
+                w = w * (wk if c else 1 - wk)
+            result = result + w * table[base + offset]
+
+        return np.broadcast_to(result, shape)
+
+
+class _Model:
+    """Surrogates of the methods of a model, tabulated at their first use."""
+
+    # default axes of each method, read-only, copied to self.grids
+    GRIDS = MappingProxyType({})
+
+    def __init__(
+        self, ac, eng=None, grid=None, method="linear", cache_dir=None, **kwargs
+    ):
+        self.ac = ac.lower()
+        self.eng = eng
+        self.method = method
+        self.cache_dir = cache_dir
+        self.model_kwargs = kwargs
+        self.grids = {k: dict(v) for k, v in self.GRIDS.items()}
+        for name, axes in (grid or {}).items():
+            self.grids[name].update(axes)
+
+        self.surrogates = {}
+        self.max_error = {}
+
+    def _surrogate(self, name, func, **kwargs):
+        key = (name, *sorted(kwargs.items()))
+        if key not in self.surrogates:
+            cache_file = None
+            if self.cache_dir is not None:
+                cache_dir = os.path.expanduser(self.cache_dir)
+                os.makedirs(cache_dir, exist_ok=True)
+                # tables depend on the options and precision of the model
+                options = dict(self.model_kwargs)
+                options["dtype"] = np.dtype(self.model.dtype or extra._dtype or float)
+                options = sorted(options.items())
+                spec = repr(
+                    (
+                        TABLE_VERSION,
+                        self.grids[name],
+                        self.method,
+                        key,
+                        self.eng,
+                        options,
+                    )
+                )
+                digest = hashlib.sha1(spec.encode()).hexdigest()[:12]
+                cache_file = os.path.join(cache_dir, f"{self.ac}_{name}_{digest}.npz")
+
+            surrogate = Surrogate(
+                func, self.grids[name], self.method, cache_file, **kwargs
+            )
+            self.surrogates[key] = surrogate
+            # largest error over the variants of the method, e.g. limit
+            self.max_error[name] = max(
+                self.max_error.get(name, 0.0), surrogate.max_error
+            )
+        return self.surrogates[key]
+
+
+class Thrust(_Model):
+    """Surrogate of the thrust model."""
+
+    GRIDS = MappingProxyType(
+        {
+            "takeoff": dict(tas=(0, 300, 61), alt=(0, 15_000, 31)),
+            "climb": dict(tas=(0, 600, 121), alt=(0, 45_000, 181), roc=(0, 5000, 21)),
+        }
+    )
+
+    def __init__(
+        self, ac, eng=None, grid=None, method="linear", cache_dir=None, **kwargs
+    ):
+        """Initialize the thrust surrogate.
+
+        Args:
+            ac (string): ICAO aircraft type (for example: A320).
+            eng (string): Engine type (for example: CFM56-5A3).
+                Leave empty to use the default engine specified
+                by in the aircraft database.
+            grid (dict): Axes replacing the default ones, for example
+                ``{"climb": {"alt": (0, 41000, 411)}}``.
+            method (str): Interpolation method, "linear" or "cubic".
+            cache_dir (str): Directory of the cached tables. Optional.
+            **kwargs: Passed to openap.Thrust.
+
+        """
+        super().__init__(ac, eng, grid, method, cache_dir, **kwargs)
+        self.model = thrust.Thrust(ac, eng, **kwargs)
+
+    @ndarrayconvert
+    def takeoff(self, tas, alt=0):
+        """Thrust at take-off condition, see openap.Thrust.takeoff() (unit: N)."""
+        return self._surrogate("takeoff", self.model.takeoff)(tas, alt)
+
+    @ndarrayconvert
+    def climb(self, tas, alt, roc):
+        """Thrust during the climb, see openap.Thrust.climb() (unit: N)."""
+        return self._surrogate("climb", self.model.climb)(tas, alt, np.abs(roc))
+
+    @ndarrayconvert
+    def cruise(self, tas, alt):
+        """Thrust at the cruise, see openap.Thrust.cruise() (unit: N)."""
+        return self.climb(tas, alt, 0)
+
+
+class FuelFlow(_Model):
+    """Surrogate of the fuel flow model."""
+
+    GRIDS = MappingProxyType(
+        {
+            "enroute": dict(
+                mass=(None, None, 11),
+                tas=(100, 550, 46),
+                alt=(0, 45_000, 91),
+                vs=(-4000, 4000, 41),
+            ),
+        }
+    )
+
+    def __init__(
+        self, ac, eng=None, grid=None, method="linear", cache_dir=None, **kwargs
+    ):
+        """Initialize the fuel flow surrogate.
+
+        Args:
+            ac (string): ICAO aircraft type (for example: A320).
+            eng (string): Engine type (for example: CFM56-5A3).
+                Leave empty to use the default engine specified
+                by in the aircraft database.
+            grid (dict): Axes replacing the default ones, for example
+                ``{"enroute": {"tas": (100, 500, 81)}}``. The default mass
+                axis spans from the OEW to the MTOW of the aircraft.
+            method (str): Interpolation method, "linear" or "cubic".
+            cache_dir (str): Directory of the cached tables. Optional.
+            **kwargs: Passed to openap.FuelFlow, for example wave_drag.
+
+        """
+        super().__init__(ac, eng, grid, method, cache_dir, **kwargs)
+        self.model = fuel.FuelFlow(ac, eng, **kwargs)
+
+        mass = self.grids["enroute"]["mass"]
+        if mass[0] is None:
+            limits = self.model.aircraft["limits"]
+            self.grids["enroute"]["mass"] = (limits["OEW"], limits["MTOW"], mass[2])
+
+    @ndarrayconvert
+    def enroute(self, mass, tas, alt, vs=0, limit=True):
+        """Fuel flow without acceleration, see openap.FuelFlow.enroute().
+
+        Args:
+            mass (int or ndarray): Aircraft mass (unit: kg).
+            tas (int or ndarray): Aircraft true airspeed (unit: kt).
+            alt (int or ndarray): Aircraft altitude (unit: ft).
+            vs (float or ndarray): Vertical rate (unit: ft/min). Default is 0.
+            limit (bool): Limit the flight path angle and thrust to the
+                performance envelope. Default is True.
+
+        Returns:
+            float: Fuel flow (unit: kg/s).
+
+        """
+        # the option is part of the cache key, and must be hashable
+        limit = bool(np.asarray(limit).item())
+        surrogate = self._surrogate("enroute", self.model.enroute, limit=limit)
+        return surrogate(mass, tas, alt, vs)
@@ -8,11 +8,26 @@ Models for Modern Two-Shaft Turbofan Engines
 - C. Svoboda, Turbofan engine database as a preliminary design (cruise thrust)
 """
 
+import numpy as np
 from openap import prop
-from openap.extra import ndarrayconvert
+from openap.extra import aero, ndarrayconvert
 
 from .base import ThrustBase
 
+# Coefficients of Bartel and Young (2008), also used by the in-place and the
+# compiled versions of the models, in openap.evaluator and openap.kernels
+D_FIT = (-0.4204, 1.0824)  # Table 2, d(mach ratio) in Equation 15
+B_EXP = -0.11  # Equation 16
+N_FIT = (2.667e-05, 0.8633)  # Table 3, n(roc) in Equation 17
+VRATIO_EXP = -0.355  # Equation 17
+A_EXP = -0.1  # Equation 18
+M_FIT = (-1.2043e-1, -8.8889e-9, 2.4444e-5, 4.7379e-1)  # Table 4, m(vratio, roc)
+A_FIT = (-0.4327, 1.3855, 0.0472)  # Equation 12, A(dP)
+Z_FIT = (0.9106, -1.7736, 1.8697)  # Equation 13, Z(dP) / dP
+X_FIT = (0.1377, -0.4374, 1.3003)  # Equation 14, X(dP) / dP
+
+IDLE_RATIO = 0.07  # idle thrust, as a fraction of the takeoff thrust
+
 
 class Thrust(ThrustBase):
     """Simplified two-shaft turbofan model."""
@@ -62,6 +77,14 @@ class Thrust(ThrustBase):
             self.cruise_mach = aircraft["cruise"]["mach"]
             self.eng_cruise_thrust = 0.2 * self.eng_max_thrust + 890
 
+        # reference conditions of the climb thrust model, as plain floats so
+        # that they do not change the precision of the inputs
+        self._P10 = float(aero.pressure(10000 * aero.ft))
+        self._Pcr = float(aero.pressure(self.cruise_alt * aero.ft))
+        self._vcas_ref = float(
+            aero.mach2cas(self.cruise_mach, self.cruise_alt * aero.ft)
+        )
+
     def _dfunc(self, mratio):
         """
         Linear fit to the data from Table 2 in Bartel and Young (2008).
@@ -74,7 +97,7 @@ class Thrust(ThrustBase):
             float or ndarray: parameter 'd' in Equation 15 from Bartel
                 and Young (2008)
         """
-        d = -0.4204 * mratio + 1.0824
+        d = D_FIT[0] * mratio + D_FIT[1]
         return d
 
     def _nfunc(self, roc):
@@ -86,16 +109,34 @@ class Thrust(ThrustBase):
         Moderate climb : 2500 ft / min
         Slow climb : 1000 ft / min
         """
-        n = 2.667e-05 * roc + 0.8633
+        n = N_FIT[0] * roc + N_FIT[1]
         return n
 
     def _mfunc(self, vratio, roc):
         """
         Based on data from Table 4 in Bartel and Young (2008).
         """
-        m = -1.2043e-1 * vratio - 8.8889e-9 * roc**2 + 2.4444e-5 * roc + 4.7379e-1
+        m = M_FIT[0] * vratio + M_FIT[1] * roc**2 + M_FIT[2] * roc + M_FIT[3]
         return m
 
+    def _takeoff_factors(self):
+        """Factors of the mach terms of Equation 11 in Bartel and Young (2008).
+
+        Returns:
+            tuple: Factors of the Z * mach and X * mach**2 terms.
+
+        """
+        eng_bpr = self.eng_bpr
+
+        # G0 is the "Gas generator function", defined as the ratio of
+        # the kinetic energy to the flow of enthalpy into the jet core
+        # This is a fit to Fig. 5 in Bartel and Young (2008)
+        G0 = 0.0606 * eng_bpr + 0.6337
+
+        c_z = 0.377 * (1 + eng_bpr) / ((1 + 0.82 * eng_bpr) * G0) ** 0.5
+        c_x = 0.23 + 0.19 * eng_bpr**0.5
+        return c_z, c_x
+
     @ndarrayconvert
     def takeoff(self, tas, alt=0):
         """Calculate thrust at take-off condition.
@@ -109,35 +150,20 @@ class Thrust(ThrustBase):
 
         """
         # Flight mach number
-        mach = self.aero.tas2mach(tas * self.aero.kts, 0)
-
-        # Engine bypass ratio
-        eng_bpr = self.eng_bpr
-
-        # G0 is the "Gas generator function", defined as the ratio of
-        # the kinetic energy to the flow of enthalpy into the jet core
-        # This is a fit to Fig. 5 in Bartel and Young (2008)
-        G0 = 0.0606 * self.eng_bpr + 0.6337
+        mach = tas * self.aero.kts / self.aero.a0
 
         P = self.aero.pressure(alt * self.aero.ft)
         dP = P / self.aero.p0
 
         # Equations 12, 13 and 14 in Bartel and Young (2008)
         # Evaluate to 1 if dP = 1, which is the case for alt = 0 ft
-        A = -0.4327 * dP**2 + 1.3855 * dP + 0.0472
-        Z = 0.9106 * dP**3 - 1.7736 * dP**2 + 1.8697 * dP
-        X = 0.1377 * dP**3 - 0.4374 * dP**2 + 1.3003 * dP
+        A = A_FIT[0] * dP**2 + A_FIT[1] * dP + A_FIT[2]
+        Z = Z_FIT[0] * dP**3 + Z_FIT[1] * dP**2 + Z_FIT[2] * dP
+        X = X_FIT[0] * dP**3 + X_FIT[1] * dP**2 + X_FIT[2] * dP
 
         # Equation 11 in Bartel and Young (2008)
-        ratio = (
-            A
-            - 0.377
-            * (1 + eng_bpr)
-            / self.sci.sqrt((1 + 0.82 * eng_bpr) * G0)
-            * Z
-            * mach
-            + (0.23 + 0.19 * self.sci.sqrt(eng_bpr)) * X * mach**2
-        )
+        c_z, c_x = self._takeoff_factors()
+        ratio = A - c_z * Z * mach + c_x * X * mach**2
 
         F = ratio * self.eng_max_thrust * self.eng_number
         return F
@@ -172,51 +198,87 @@ class Thrust(ThrustBase):
         roc = self.sci.abs(roc)
 
         h = alt * self.aero.ft
-        tas = self.sci.maximum(10, tas)
+        v = self.sci.maximum(10, tas) * self.aero.kts
+
+        if self.sci is not np or np.ndim(self._vcas_ref) > 0:
+            # symbolic backend, or parameters of several engines broadcast
+            # against the inputs: evaluate all segments, and select
+            ratio = self.sci.where(
+                alt > 30000,
+                self._climb_ratio(v, h, roc, segment=3),
+                self.sci.where(
+                    alt > 10000,
+                    self._climb_ratio(v, h, roc, segment=2),
+                    self._climb_ratio(v, h, roc, segment=1),
+                ),
+            )
+        else:
+            # evaluate each segment only on the points in its altitude range
+            alt, v, h, roc = np.broadcast_arrays(alt, v, h, roc)
+            ratio = np.empty(v.shape, dtype=np.result_type(v, h))
+
+            above_10k = alt > 10000
+            above_30k = alt > 30000
+            segments = {1: ~above_10k, 2: above_10k & ~above_30k, 3: above_30k}
+
+            for segment, mask in segments.items():
+                # integer indices are much faster to gather and scatter
+                idx = np.nonzero(mask)
+                if idx[0].size > 0:
+                    ratio[idx] = self._climb_ratio(v[idx], h[idx], roc[idx], segment)
+
+        F = ratio * self.eng_cruise_thrust * self.eng_number
+        return F
 
-        mach = self.aero.tas2mach(tas * self.aero.kts, h)
-        vcas = self.aero.tas2cas(tas * self.aero.kts, h)
+    def _climb_ratio(self, v, h, roc, segment):
+        """Ratio of the climb thrust to the thrust at top of climb.
 
-        P = self.aero.pressure(h)
+        Args:
+            v (float or ndarray): True airspeed (m/s), at least 10 kt.
+            h (float or ndarray): Altitude (m).
+            roc (float or ndarray): Absolute vertical rate (ft/min).
+            segment (int): Altitude segment, 1: alt <= 10000 ft,
+                2: 10000 < alt <= 30000 ft, 3: alt > 30000 ft.
+
+        Returns:
+            float or ndarray: Thrust ratio.
+
+        """
+        P, rho, T = self.aero.atmos(h)
+        Pcr = self._Pcr
 
-        P10 = self.aero.pressure(10000 * self.aero.ft)
-        Pcr = self.aero.pressure(self.cruise_alt * self.aero.ft)
+        if segment == 3:
+            mach = v / self.sci.sqrt(self.aero.gamma * self.aero.R * T)
 
-        # approximate thrust at top of climb
-        Fcr = self.eng_cruise_thrust * self.eng_number
-        vcas_ref = self.aero.mach2cas(self.cruise_mach, self.cruise_alt * self.aero.ft)
+            d = self._dfunc(mach / self.cruise_mach)
 
-        # segment 3: alt > 30000:
-        d = self._dfunc(mach / self.cruise_mach)
+            # Equation 16 in Bartel and Young (2008)
+            b = (mach / self.cruise_mach) ** B_EXP
 
-        # Equation 16 in Bartel and Young (2008)
-        b = (mach / self.cruise_mach) ** (-0.11)
+            # Equation 15 in Bartel and Young (2008)
+            return d * self.sci.log(P / Pcr) + b
 
-        # Equation 15 in Bartel and Young (2008)
-        ratio_seg3 = d * self.sci.log(P / Pcr) + b
+        # calibrated airspeed from the same atmosphere, see aero.tas2cas()
+        qdyn = P * ((1.0 + rho * v * v / (7.0 * P)) ** 3.5 - 1.0)
+        p0, rho0 = self.aero.p0, self.aero.rho0
+        vcas = self.sci.sqrt(7.0 * p0 / rho0 * ((qdyn / p0 + 1.0) ** (2.0 / 7.0) - 1.0))
+        vratio = vcas / self._vcas_ref
 
-        # segment 2: 10000 < alt <= 30000:
         # Equation 18 in Bartel and Young (2008)
-        a = (vcas / vcas_ref) ** (-0.1)
+        a = vratio**A_EXP
         n = self._nfunc(roc)
 
-        # Equation 17 in Bartel and Young (2008)
-        ratio_seg2 = a * (P / Pcr) ** (-0.355 * (vcas / vcas_ref) + n)
+        if segment == 2:
+            # Equation 17 in Bartel and Young (2008)
+            return a * (P / Pcr) ** (VRATIO_EXP * vratio + n)
 
-        # segment 1: alt <= 10000:
-        # Equation 17 in Bartel and Young (2008)
-        F10 = Fcr * a * (P10 / Pcr) ** (-0.355 * (vcas / vcas_ref) + n)
-        m = self._mfunc(vcas / vcas_ref, roc)
+        # segment 1, Equation 17 in Bartel and Young (2008) for F10 / Fcr
+        P10 = self._P10
+        F10_ratio = a * (P10 / Pcr) ** (VRATIO_EXP * vratio + n)
+        m = self._mfunc(vratio, roc)
 
         # Equation 19 in Bartel and Young (2008)
-        ratio_seg1 = m * (P / Pcr) + (F10 / Fcr - m * (P10 / Pcr))
-
-        ratio = self.sci.where(
-            alt > 30000, ratio_seg3, self.sci.where(alt > 10000, ratio_seg2, ratio_seg1)
-        )
-
-        F = ratio * Fcr
-        return F
+        return m * (P / Pcr) + (F10_ratio - m * (P10 / Pcr))
 
     def descent_idle(self, tas, alt):
         """Idle thrust during the descent.
@@ -233,5 +295,5 @@ class Thrust(ThrustBase):
             float or ndarray: Total thrust (unit: N).
 
         """
-        F = 0.07 * self.takeoff(tas, alt)
+        F = IDLE_RATIO * self.takeoff(tas, alt)
         return F
@@ -0,0 +1,383 @@
+"""Incremental tracking of many aircraft from a live ADS-B feed.
+
+The state of each aircraft, keyed by its icao24 address, is updated with each
+new batch of position updates, instead of processing the whole trajectories
+again::
+
+    from openap.tracker import Tracker
+
+    tracker = Tracker(ttl=300)
+
+    for batch in feed:  # small batches of position updates
+        finished = tracker.update(
+            batch.icao24, batch.ts, batch.alt, batch.spd, batch.roc,
+            typecode=batch.typecode,
+        )
+
+    tracker.state()  # pandas.DataFrame of the active aircraft
+
+The states of all aircraft are stored in arrays, and updated together with
+vectorized operations, with one model evaluation per aircraft type and batch.
+For each aircraft:
+
+- altitude, speed and rate of climb are smoothed with an exponential filter,
+  and stay NaN until their first valid measurement, without fuel flow and
+  emissions in the meantime,
+- the flight phase is labelled when each time window closes, with the fuzzy
+  logic of FlightPhase applied to the mean values of the window,
+- the fuel flow and the emissions are integrated over time, holding the values
+  of the previous update, and the mass is reduced by the burnt fuel.
+
+Points are sorted by time within a batch. Points older than the last update of
+their aircraft arrive too late and are ignored. Aircraft without updates for
+more than ``ttl`` seconds (in the time of the feed) are evicted, and their
+final states are returned by update().
+
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from . import mass, prop
+from .emission import Emission
+from .extra.filters import ExponentialSmoothing
+from .fuel import FuelFlow
+from .phase import FlightPhase
+
+# cumulative quantities, in kg
+TOTALS = ("fuel", "co2", "h2o", "sox", "soot", "nox", "co", "hc")
+
+# emission rates, proportional to the fuel flow or depending on the state
+RATES = ("fuelflow", "nox_rate", "co_rate", "hc_rate")
+
+# sums of the measurements in the current phase window
+WINDOW = ("win_alt", "win_spd", "win_roc", "win_n", "win")
+
+FIELDS = (
+    "ts", "first_ts", "alt", "spd", "roc", "mass", "phase", "type", "substituted"
+)
+
+
+class Tracker:
+    """Incremental state of aircraft, updated with batches of positions."""
+
+    def __init__(
+        self,
+        typecode="A320",
+        ttl=300,
+        twindow=60,
+        tau=10,
+        load_factor=0.8,
+        capacity=1024,
+        **kwargs,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            typecode (string): Aircraft type of the aircraft with an unknown
+                or unsupported type. Defaults to A320.
+            ttl (float): Time without updates after which an aircraft is
+                evicted (unit: s). Defaults to 300.
+            twindow (int): Time window of the flight phase (unit: s).
+                Defaults to 60.
+            tau (float): Time constant of the smoothing filter (unit: s).
+                Defaults to 10.
+            load_factor (float): Load factor of the initial mass, estimated
+                with mass.from_range() at half of the aircraft range.
+                Defaults to 0.8.
+            capacity (int): Initial number of aircraft slots, grown when
+                needed. Defaults to 1024.
+            **kwargs: Passed to FuelFlow and Emission, for example
+                ``use_synonym=True``.
+
+        """
+        self.typecode = typecode
+        self.ttl = ttl
+        self.twindow = twindow
+        self.load_factor = load_factor
+        self.model_kwargs = kwargs
+
+        self.filter = ExponentialSmoothing(tau)
+        self.flight_phase = FlightPhase()
+        self.phase_labels = np.array(
+            [self.flight_phase.state_lable_map.get(s, "NA") for s in range(7)]
+        )
+
+        # models and initial mass of each aircraft type, by index
+        self.types = []
+        self.type_index = {}
+        self.models = []
+
+        # aircraft types which are not available, replaced by the default type
+        self.substituted = set()
+
+        self.slots = {}
+        self.free = []
+        self.icao24 = np.empty(0, dtype=object)
+        self.active = np.zeros(0, dtype=bool)
+        self.data = {}
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        size = len(self.active)
+        self.free.extend(range(capacity - 1, size - 1, -1))
+
+        def extend(array, value):
+            new = np.full(capacity, value, dtype=array.dtype)
+            new[:size] = array
+            return new
+
+        self.icao24 = extend(self.icao24, None)
+        self.active = extend(self.active, False)
+        for name in FIELDS + TOTALS + RATES + WINDOW:
+            if name == "substituted":
+                dtype = bool
+            elif name in ("phase", "type", "win"):
+                dtype = int
+            else:
+                dtype = float
+            array = self.data.get(name, np.empty(0, dtype=dtype))
+            self.data[name] = extend(array, 0)
+
+    def _type(self, typecode):
+        """Index of an aircraft type, with its models loaded at the first use.
+
+        Returns:
+            tuple: Index of the models of the type, and whether the type is
+            not available and replaced by the default type.
+
+        """
+        typecode = self.typecode if typecode is None else str(typecode).upper()
+        if typecode not in self.type_index:
+            try:
+                fuelflow = FuelFlow(typecode, **self.model_kwargs)
+                emission = Emission(typecode, **self.model_kwargs)
+                aircraft = prop.aircraft(typecode, **self.model_kwargs)
+                distance = 0.5 * aircraft["cruise"]["range"]
+                mass0 = mass.from_range(
+                    typecode, distance, self.load_factor, **self.model_kwargs
+                )
+            except (ValueError, KeyError, RuntimeError) as error:
+                if typecode == self.typecode:
+                    raise
+                warnings.warn(
+                    f"Aircraft type {typecode} not available ({error}), "
+                    f"using {self.typecode} instead.",
+                    UserWarning,
+                    stacklevel=4,
+                )
+                self.type_index[typecode] = self._type(None)[0]
+                self.substituted.add(typecode)
+                return self._type(typecode)
+
+            self.type_index[typecode] = len(self.types)
+            self.types.append(typecode)
+            self.models.append((fuelflow, emission, float(mass0)))
+        return self.type_index[typecode], typecode in self.substituted
+
+    def _allocate(self, icao24, typecodes, ts, alt, spd, roc):
+        """Slots of new aircraft, initialized with their first point."""
+        n_free = len(self.free)
+        if n_free < len(icao24):
+            self._grow(2 * (len(self.active) + len(icao24) - n_free))
+
+        slots = np.array([self.free.pop() for _ in icao24], dtype=int)
+        self.slots.update(zip(icao24, slots.tolist()))
+        self.icao24[slots] = icao24
+        self.active[slots] = True
+
+        d = self.data
+        types, substituted = np.array([self._type(t) for t in typecodes], dtype=int).T
+        d["type"][slots] = types
+        d["substituted"][slots] = substituted
+        d["mass"][slots] = [self.models[t][2] for t in types]
+        d["ts"][slots] = ts
+        d["first_ts"][slots] = ts
+        # missing values stay NaN until the first valid measurement
+        d["alt"][slots] = alt
+        d["spd"][slots] = spd
+        d["roc"][slots] = roc
+        d["phase"][slots] = 0
+        for name in TOTALS + RATES + WINDOW:
+            d[name][slots] = 0
+        return slots
+
+    def update(self, icao24, ts, alt, spd, roc, typecode=None):
+        """Update the aircraft states with a batch of position updates.
+
+        Args:
+            icao24 (ndarray): ICAO 24-bit address of each point.
+            ts (ndarray): Time of each point (unit: s).
+            alt (ndarray): Altitude (unit: ft).
+            spd (ndarray): True airspeed (unit: kt).
+            roc (ndarray): Rate of climb (unit: ft/min).
+            typecode (string or ndarray): Aircraft type of each point, used
+                when the aircraft is seen for the first time. Defaults to
+                the type of the tracker.
+
+        Returns:
+            pandas.DataFrame: Final states of the evicted aircraft.
+
+        """
+        icao24 = np.atleast_1d(np.asarray(icao24, dtype=object))
+        ts, alt, spd, roc, typecode = (
+            np.broadcast_to(np.asarray(x, dtype=dtype), icao24.shape)
+            for x, dtype in zip(
+                (ts, alt, spd, roc, typecode), (float, float, float, float, object)
+            )
+        )
+
+        now = ts.max() if len(ts) else -np.inf
+
+        if len(icao24) > 0:
+            order = np.argsort(ts, kind="stable")
+            icao24, ts, alt, spd, roc, typecode = (
+                x[order] for x in (icao24, ts, alt, spd, roc, typecode)
+            )
+
+            slots = np.array([self.slots.get(i, -1) for i in icao24], dtype=int)
+
+            # first point of the new aircraft
+            new = slots < 0
+            if new.any():
+                codes, uniques = pd.factorize(icao24[new])
+                first = np.zeros(len(uniques), dtype=int)
+                first[codes[::-1]] = np.arange(len(codes))[::-1]
+                idx = np.flatnonzero(new)[first]
+                created = self._allocate(
+                    list(uniques), typecode[idx], ts[idx], alt[idx], spd[idx], roc[idx]
+                )
+                slots[new] = created[codes]
+
+            # points older than the last update are too late
+            keep = ts >= self.data["ts"][slots]
+            slots, ts, alt, spd, roc = (x[keep] for x in (slots, ts, alt, spd, roc))
+
+            # points of each aircraft are processed in rounds, in time order
+            rank = pd.Series(slots).groupby(slots).cumcount().to_numpy()
+            for r in range(rank.max() + 1 if len(rank) else 0):
+                sel = rank == r
+                self._step(slots[sel], ts[sel], alt[sel], spd[sel], roc[sel])
+
+        return self.evict(now - self.ttl)
+
+    def _step(self, slots, ts, alt, spd, roc):
+        """Update the states of aircraft with one new point each."""
+        d = self.data
+        dt = ts - d["ts"][slots]
+
+        # integrate the fuel flow and emissions of the previous state
+        fuel = d["fuelflow"][slots] * dt
+        d["fuel"][slots] += fuel
+        d["mass"][slots] -= fuel
+        for name in ("nox", "co", "hc"):
+            d[name][slots] += d[f"{name}_rate"][slots] * dt / 1000
+
+        # smoothed state, the first point of an aircraft is unchanged (dt = 0)
+        for name, value in (("alt", alt), ("spd", spd), ("roc", roc)):
+            d[name][slots] = self.filter.update(d[name][slots], dt, value)
+        d["ts"][slots] = ts
+
+        self._phase(slots, ts, alt, spd, roc)
+
+        # no fuel flow and emissions while the state is incomplete
+        complete = ~np.isnan([d[name][slots] for name in ("alt", "spd", "roc")]).any(0)
+        for name in RATES:
+            d[name][slots[~complete]] = 0
+
+        # fuel flow and emission rates of the new state, for each type
+        types = d["type"][slots]
+        for t in np.unique(types[complete]):
+            s = slots[(types == t) & complete]
+            fuelflow, emission, _ = self.models[t]
+            alt_t, spd_t = d["alt"][s], d["spd"][s]
+
+            ff = fuelflow.enroute(d["mass"][s], spd_t, alt_t, d["roc"][s])
+            ff = np.nan_to_num(np.broadcast_to(ff, s.shape))
+            d["fuelflow"][s] = ff
+            d["nox_rate"][s] = emission.nox(ff, spd_t, alt_t)
+            d["co_rate"][s] = emission.co(ff, spd_t, alt_t)
+            d["hc_rate"][s] = emission.hc(ff, spd_t, alt_t)
+
+            f = fuel[(types == t) & complete]
+            for name in ("co2", "h2o", "sox", "soot"):
+                d[name][s] += getattr(emission, name)(f) / 1000
+
+    def _phase(self, slots, ts, alt, spd, roc):
+        """Accumulate the phase windows, and label the closed ones."""
+        d = self.data
+        win = ((ts - d["first_ts"][slots]) // self.twindow).astype(int)
+
+        closed = (win != d["win"][slots]) & (d["win_n"][slots] > 0)
+        if closed.any():
+            s = slots[closed]
+            n = d["win_n"][s]
+            states = self.flight_phase.states_from_means(
+                d["win_alt"][s] / n, d["win_spd"][s] / n, d["win_roc"][s] / n
+            )
+            d["phase"][s] = states
+            for name in WINDOW[:-1]:
+                d[name][s] = 0
+
+        d["win"][slots] = win
+        valid = ~(np.isnan(alt) | np.isnan(spd) | np.isnan(roc))
+        for name, value in (("win_alt", alt), ("win_spd", spd), ("win_roc", roc)):
+            d[name][slots] += np.where(valid, value, 0)
+        d["win_n"][slots] += valid
+
+    def evict(self, before):
+        """Evict the aircraft without updates since a given time.
+
+        Args:
+            before (float): Time of the feed (unit: s).
+
+        Returns:
+            pandas.DataFrame: Final states of the evicted aircraft.
+
+        """
+        slots = np.flatnonzero(self.active & (self.data["ts"] < before))
+        result = self._frame(slots)
+
+        for slot, icao24 in zip(slots.tolist(), self.icao24[slots]):
+            del self.slots[icao24]
+            self.free.append(slot)
+        self.active[slots] = False
+        self.icao24[slots] = None
+
+        return result
+
+    def state(self):
+        """States of the active aircraft.
+
+        Returns:
+            pandas.DataFrame: One row per aircraft, with its aircraft type
+            (``substituted`` when its type is not available and replaced by
+            the default type), last time, smoothed altitude, speed and rate
+            of climb, flight phase, mass, and cumulative fuel and emissions
+            (unit: kg).
+
+        """
+        return self._frame(np.flatnonzero(self.active))
+
+    def _frame(self, slots):
+        d = self.data
+        types = np.array([*self.types, None], dtype=object)
+        columns = dict(
+            icao24=self.icao24[slots],
+            typecode=types[d["type"][slots]],
+            substituted=d["substituted"][slots],
+            ts=d["ts"][slots],
+            alt=d["alt"][slots],
+            spd=d["spd"][slots],
+            roc=d["roc"][slots],
+            phase=self.phase_labels[d["phase"][slots]],
+            mass=d["mass"][slots],
+            fuelflow=d["fuelflow"][slots],
+            **{name: d[name][slots] for name in TOTALS},
+        )
+        return pd.DataFrame(columns)
+
+    def __len__(self):
+        return len(self.slots)
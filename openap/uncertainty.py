@@ -0,0 +1,222 @@
+"""Monte Carlo propagation of the uncertainty of the model parameters.
+
+The drag polar (cd0, k), the fuel flow coefficients (c1, c2, c3), the engine
+thrust and the aircraft mass are perturbed with relative factors, sampled
+once. The factors of a chunk of samples have the shape (n_chunk, 1), and are
+broadcast against the trajectory of shape (1, n_points) through the formulas
+of the models, so that all samples are evaluated at once::
+
+    from openap.uncertainty import MonteCarlo
+
+    mc = MonteCarlo("A320", n_samples=1000, std=dict(cd0=0.05, k=0.05, mass=0.03))
+    fuel = mc.fuel(mass, tas, alt, vs, dt=1)  # kg, one value per sample
+    lower, median, upper = mc.interval(fuel, level=0.95)
+
+The samples are processed in chunks, so that the intermediate arrays are
+bounded to about ``chunk_points`` elements.
+
+"""
+
+import numpy as np
+
+from .emission import Emission
+from .fuel import FuelFlow
+
+PARAMETERS = ("cd0", "k", "c1", "c2", "c3", "max_thrust", "mass")
+
+
+class MonteCarlo:
+    """Monte Carlo evaluation of the fuel flow with perturbed parameters."""
+
+    def __init__(
+        self,
+        ac,
+        eng=None,
+        n_samples=None,
+        std=None,
+        factors=None,
+        seed=None,
+        chunk_points=1_000_000,
+        **kwargs,
+    ):
+        """Initialize the samples of the parameters.
+
+        Args:
+            ac (string): ICAO aircraft type (for example: A320).
+            eng (string): Engine type (for example: CFM56-5A3).
+                Leave empty to use the default engine specified
+                by in the aircraft database.
+            n_samples (int): Number of samples. Defaults to the length of
+                the factors when they are given, 1000 otherwise.
+            std (dict): Relative standard deviation of the parameters, with
+                keys in cd0, k, c1, c2, c3, max_thrust and mass. The factors
+                are sampled from normal distributions with a mean of 1.
+                Parameters which are not given are not perturbed.
+            factors (dict): Relative factors of the parameters, arrays of
+                shape (n_samples,), used instead of the sampled ones.
+            seed (int): Seed of the random generator. Optional.
+            chunk_points (int): Maximum number of samples times points
+                evaluated at once. Defaults to 1e6.
+            **kwargs: Passed to FuelFlow, for example ``wave_drag=True``.
+
+        """
+        std = std or {}
+        factors = factors or {}
+
+        unknown = (set(std) | set(factors)) - set(PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+
+        factors = {k: np.asarray(v, dtype=float) for k, v in factors.items()}
+        for name, values in factors.items():
+            if n_samples is None:
+                n_samples = values.size
+            if values.shape != (n_samples,):
+                raise ValueError(
+                    f"Factors of {name} must have the shape ({n_samples},), "
+                    f"got {values.shape}."
+                )
+        if n_samples is None:
+            n_samples = 1000
+
+        rng = np.random.default_rng(seed)
+        self.n_samples = n_samples
+        self.chunk_points = chunk_points
+        self.factors = {}
+        for name in PARAMETERS:
+            if name in factors:
+                self.factors[name] = factors[name]
+            elif name in std:
+                self.factors[name] = 1 + std[name] * rng.standard_normal(n_samples)
+            else:
+                self.factors[name] = np.ones(n_samples)
+
+        self.fuelflow = FuelFlow(ac, eng, **kwargs)
+        self.emission = Emission(ac, eng, **kwargs)
+
+        fuelflow = self.fuelflow
+        self._nominal = dict(
+            polar=fuelflow.drag.polar,
+            engine=fuelflow.engine,
+            func_fuel=fuelflow.func_fuel,
+            eng_max_thrust=fuelflow.thrust.eng_max_thrust,
+            eng_cruise_thrust=fuelflow.thrust.eng_cruise_thrust,
+        )
+
+    def _perturb(self, samples):
+        """Set the parameters of a chunk of samples, returns the mass factors."""
+        f = {name: values[samples, None] for name, values in self.factors.items()}
+        nominal = self._nominal
+        fuelflow, drag, thrust = self.fuelflow, self.fuelflow.drag, self.fuelflow.thrust
+
+        clean = nominal["polar"]["clean"]
+        drag.polar = dict(
+            nominal["polar"],
+            clean=dict(clean, cd0=clean["cd0"] * f["cd0"], k=clean["k"] * f["k"]),
+        )
+
+        thrust.eng_max_thrust = nominal["eng_max_thrust"] * f["max_thrust"]
+        thrust.eng_cruise_thrust = nominal["eng_cruise_thrust"] * f["max_thrust"]
+        fuelflow.engine = dict(
+            nominal["engine"],
+            max_thrust=nominal["engine"]["max_thrust"] * f["max_thrust"],
+        )
+
+        c1, c2, c3, scale = fuelflow.fuel_coef
+        fuelflow.func_fuel = fuelflow._fuel_function(
+            c1 * f["c1"], c2 * f["c2"], c3 * f["c3"], scale
+        )
+
+        return f["mass"]
+
+    def _restore(self):
+        nominal = self._nominal
+        self.fuelflow.drag.polar = nominal["polar"]
+        self.fuelflow.engine = nominal["engine"]
+        self.fuelflow.func_fuel = nominal["func_fuel"]
+        self.fuelflow.thrust.eng_max_thrust = nominal["eng_max_thrust"]
+        self.fuelflow.thrust.eng_cruise_thrust = nominal["eng_cruise_thrust"]
+
+    def enroute(self, mass, tas, alt, vs=0, acc=0, reduce=None):
+        """Compute the fuel flow of all samples, see FuelFlow.enroute().
+
+        Args:
+            mass (float or ndarray): Aircraft mass (unit: kg).
+            tas (float or ndarray): Aircraft true airspeed (unit: kt).
+            alt (float or ndarray): Aircraft altitude (unit: ft).
+            vs (float or ndarray): Vertical rate (unit: ft/min). Default is 0.
+            acc (float or ndarray): acceleration (unit: m/s^2). Default is 0.
+            reduce (callable): Function applied to the fuel flow of each chunk
+                of samples, an array of shape (n_chunk, n_points), for
+                example to integrate it without keeping all samples.
+
+        Returns:
+            ndarray: Fuel flow (unit: kg/s) of shape (n_samples, n_points),
+            or the concatenated results of reduce.
+
+        """
+        args = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (mass, tas, alt, vs, acc))
+        )
+        mass, tas, alt, vs, acc = (np.reshape(a, (1, -1)) for a in args)
+        n_points = mass.shape[1]
+        chunk = max(1, self.chunk_points // max(n_points, 1))
+
+        results = []
+        try:
+            for start in range(0, self.n_samples, chunk):
+                samples = slice(start, start + chunk)
+                f_mass = self._perturb(samples)
+                ff = self.fuelflow.enroute(mass * f_mass, tas, alt, vs, acc)
+                ff = np.broadcast_to(ff, (f_mass.shape[0], n_points))
+                results.append(ff if reduce is None else reduce(ff))
+        finally:
+            self._restore()
+
+        return np.concatenate(results)
+
+    def fuel(self, mass, tas, alt, vs=0, acc=0, dt=1):
+        """Compute the total fuel of the trajectory for all samples.
+
+        Args:
+            mass, tas, alt, vs, acc: See enroute().
+            dt (float or ndarray): Duration of each point (unit: s).
+                Defaults to 1.
+
+        Returns:
+            ndarray: Fuel (unit: kg) of shape (n_samples,).
+
+        """
+        dt = np.reshape(np.asarray(dt, dtype=float), (1, -1))
+        return self.enroute(
+            mass, tas, alt, vs, acc, reduce=lambda ff: (ff * dt).sum(axis=1)
+        )
+
+    def co2(self, mass, tas, alt, vs=0, acc=0, dt=1):
+        """Compute the total CO2 of the trajectory for all samples.
+
+        Args:
+            mass, tas, alt, vs, acc, dt: See fuel().
+
+        Returns:
+            ndarray: CO2 (unit: kg) of shape (n_samples,).
+
+        """
+        fuel = self.fuel(mass, tas, alt, vs, acc, dt)
+        return self.emission.co2(fuel) / 1000
+
+    @staticmethod
+    def interval(values, level=0.95):
+        """Confidence interval and median of the samples.
+
+        Args:
+            values (ndarray): Results of the samples, along the first axis.
+            level (float): Confidence level. Defaults to 0.95.
+
+        Returns:
+            tuple: Lower bound, median and upper bound.
+
+        """
+        q = [(1 - level) / 2, 0.5, (1 + level) / 2]
+        lower, median, upper = np.quantile(values, q, axis=0)
+        return lower, median, upper
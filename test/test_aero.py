@@ -0,0 +1,36 @@
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import aero
+
+h = np.linspace(0, 15000, 301)
+dT = np.linspace(-10, 10, 301)
+
+
+def test_atmos_all():
+    p, rho, T, a = aero.atmos_all(h, dT)
+    assert_allclose((p, rho, T), aero.atmos(h, dT))
+    assert_allclose(a, aero.vsound(h, dT))
+    assert_allclose(T, aero.temperature(h, dT))
+    assert_allclose(aero.temperature(h, 20), aero.atmos(h, 15)[2])
+
+
+def test_conversions():
+    v = np.linspace(50, 300, 301)
+    mach = aero.tas2mach(v, h)
+
+    tas = aero.mach2tas(mach, h, dT)
+    assert_allclose(aero.mach2cas(mach, h, dT), aero.tas2cas(tas, h, dT))
+    tas = aero.cas2tas(v, h, dT)
+    assert_allclose(aero.cas2mach(v, h, dT), aero.tas2mach(tas, h, dT))
+
+
+def test_casadi():
+    pytest.importorskip("casadi")
+    from openap.casadi import aero as caero
+
+    # away from the smooth transition at the tropopause
+    h_ = h[np.abs(h - 11000) > 1000]
+    for expected, result in zip(aero.atmos_all(h_, 5), caero.atmos_all(h_, 5)):
+        assert_allclose(np.array(result, dtype=float).ravel(), expected, rtol=1e-3)
@@ -0,0 +1,102 @@
+import pytest
+
+import numpy as np
+from openap.addon import bada4
+
+rng = np.random.default_rng(0)
+
+XML = """<BADA4>
+<AFCM><S>122.6</S>
+<Configuration><LGUP><DPM_clean>
+<scalar>1.0</scalar><M_max>0.82</M_max>
+<CD_clean>{d}</CD_clean>
+</DPM_clean></LGUP></Configuration></AFCM>
+<PFM><MREF>70000</MREF><LHV>43000000</LHV>
+<TFM>
+<CT>{a}</CT><CF>{f}</CF>
+<LIDL><CT>{ti}</CT><CF>{fi}</CF></LIDL>
+<MCMB><kink>10</kink><flat_rating>{b}</flat_rating><temp_rating>{c}</temp_rating></MCMB>
+<MCRZ><kink>10</kink><flat_rating>{b}</flat_rating><temp_rating>{c}</temp_rating></MCRZ>
+</TFM></PFM>
+</BADA4>"""
+
+
+def tags(tag, n):
+    return "".join(f"<{tag}>{v}</{tag}>" for v in rng.uniform(0.01, 0.1, n))
+
+
+@pytest.fixture()
+def bada_path(tmp_path):
+    model = tmp_path / "A320-231"
+    model.mkdir()
+    (model / "A320-231.xml").write_text(
+        XML.format(
+            d=tags("d", 15),
+            a=tags("a", 36),
+            f=tags("f", 25),
+            ti=tags("ti", 12),
+            fi=tags("fi", 9),
+            b=tags("b", 36),
+            c=tags("c", 45),
+        )
+    )
+    bada4._cache.clear()
+    return str(tmp_path)
+
+
+def test_cache(bada_path, tmp_path):
+    fuel = bada4.FuelFlow("A320", bada_path)
+    assert len(bada4._cache) == 1
+    assert fuel.f_ is bada4.load_params("A320", bada_path)["fuel_f"]
+
+    cache_file = str(tmp_path / "bada4.npz")
+    bada4.save_cache(cache_file)
+    params = bada4._cache.copy()
+    bada4._cache.clear()
+    bada4.load_cache(cache_file)
+
+    for key, value in params.items():
+        for name in value:
+            assert np.array_equal(bada4._cache[key][name], value[name])
+
+
+def test_polynomials(bada_path):
+    drag = bada4.Drag("A320", bada_path)
+    thrust = bada4.Thrust("A320", bada_path)
+    fuel = bada4.FuelFlow("A320", bada_path)
+
+    mach = np.linspace(0.3, 0.8, 20)
+    delta = np.linspace(0.2, 0.9, 20)
+    cl = np.linspace(0.3, 0.6, 20)
+
+    # reference: evaluation with explicit powers, as in the BADA4 manual
+    mm = (1 - mach**2) ** (-0.5)
+    d = drag.d_
+    C0 = sum(d[i] * mm**i for i in range(5))
+    C2 = sum(d[5 + i] * mm ** (3 * i) for i in range(5))
+    C6 = d[10] + sum(d[11 + i] * mm ** (14 + i) for i in range(4))
+    cd = drag.scalar * (C0 + C2 * cl**2 + C6 * cl**6)
+    assert np.allclose(drag._cd_base(cl, mach).ravel(), cd)
+
+    h = np.linspace(1000, 10000, 20)
+    delta = thrust.aero.pressure(h) / thrust.aero.p0
+    b, a = thrust.b_["MCMB"], thrust.a_
+    delta_T = np.einsum(
+        "ij,jk,ik->k", b, [mach**i for i in range(6)], [delta**i for i in range(6)]
+    )
+    cT = np.einsum(
+        "ij,jk,ik->k", a, [mach**i for i in range(6)], [delta_T**i for i in range(6)]
+    )
+    assert np.allclose(thrust.cT(mach, h, "MCMB").ravel(), cT)
+
+    cT_idle = np.einsum(
+        "ij,jk,ik->k",
+        thrust.ti,
+        [delta**i for i in range(-1, 3)],
+        [mach**i for i in range(3)],
+    )
+    assert np.allclose(thrust.cT(mach, h, "LIDL").ravel(), cT_idle)
+
+    # array inputs give one value per point
+    assert thrust.climb(np.full(20, 250), h / 0.3048).size == 20
+    assert fuel.enroute(np.full(20, 60000), np.full(20, 250), h / 0.3048).size == 20
@@ -0,0 +1,43 @@
+import pytest
+
+import numpy as np
+
+casadi = pytest.importorskip("casadi")
+
+from openap import aero  # noqa: E402
+from openap.casadi import aero as ca_aero  # noqa: E402
+
+h = np.linspace(0, 15000, 151)
+v = np.linspace(50, 250, 151)
+
+
+def test_atmos():
+    p, rho, T = [np.array(x).ravel() for x in ca_aero.atmos(casadi.DM(h))]
+    p_, rho_, T_ = aero.atmos(h)
+
+    assert np.abs(T - T_).max() < 0.5
+    assert np.abs(rho - rho_).max() / rho_.min() < 0.01
+    assert np.allclose(p, p_, rtol=0.005)
+
+    # sharp transitions stay finite, and close to the piecewise model
+    p, rho, T = [np.array(x).ravel() for x in ca_aero.atmos(casadi.DM(h), 0, 100)]
+    assert np.isfinite(T).all() and np.isfinite(rho).all()
+    assert np.abs(T - T_).max() < 0.05
+
+
+def test_conversions():
+    for name in ["tas2cas", "cas2tas", "tas2mach", "cas2mach", "tas2eas"]:
+        result = getattr(ca_aero, name)(casadi.DM(v), casadi.DM(h))
+        assert np.allclose(np.array(result).ravel(), getattr(aero, name)(v, h), 2e-3)
+
+
+def test_function():
+    n = len(h)
+    tas2cas = ca_aero.function("tas2cas", n)
+    v_cas = tas2cas(v, h, 0)
+    assert np.allclose(np.array(v_cas).ravel(), aero.tas2cas(v, h), rtol=2e-3)
+
+    vs = casadi.MX.sym("v", n)
+    hs = casadi.MX.sym("h", n)
+    graph = casadi.Function("graph", [vs, hs], [tas2cas(vs, hs, 0)])
+    assert graph.n_nodes() < 10
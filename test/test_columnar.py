@@ -0,0 +1,70 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+from openap import FuelFlow
+from openap.extra import columnar
+
+fuelflow = FuelFlow("A320")
+
+n = 100
+rng = np.random.default_rng(42)
+data = dict(
+    mass=rng.uniform(50000, 75000, n),
+    tas=rng.uniform(150, 480, n),
+    alt=rng.uniform(0, 40000, n),
+    vs=rng.uniform(-2500, 2500, n),
+)
+expected = fuelflow.enroute(data["mass"], data["tas"], data["alt"], data["vs"])
+
+
+def test_pyarrow():
+    pa = pytest.importorskip("pyarrow")
+
+    table = pa.table(data)
+    mass = table["mass"]
+    assert np.shares_memory(columnar.to_numpy(mass), columnar.to_numpy(mass))
+
+    ff = columnar.apply(fuelflow.enroute, mass, table["tas"], table["alt"], vs=0)
+    assert isinstance(ff, pa.Array)
+
+    table = columnar.with_openap_fuel(table, "A320")
+    np.testing.assert_allclose(table["fuel_flow"].to_numpy(), expected)
+
+
+def test_polars():
+    pl = pytest.importorskip("polars")
+
+    df = pl.DataFrame(data)
+    assert np.shares_memory(columnar.to_numpy(df["tas"]), df["tas"].to_numpy())
+
+    ff = columnar.apply(fuelflow.enroute, df["mass"], df["tas"], df["alt"])
+    assert isinstance(ff, pl.Series)
+
+    res = columnar.with_openap_fuel(df, "A320")
+    np.testing.assert_allclose(res["fuel_flow"].to_numpy(), expected)
+
+    res = columnar.with_openap_fuel(df.lazy(), "A320").collect()
+    np.testing.assert_allclose(res["fuel_flow"].to_numpy(), expected)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_polars_dtype(dtype):
+    pl = pytest.importorskip("polars")
+
+    lf = columnar.with_openap_fuel(pl.LazyFrame(data), "A320", dtype=dtype)
+    res = lf.collect()
+    assert lf.collect_schema()["fuel_flow"] == res.schema["fuel_flow"]
+    assert res["fuel_flow"].to_numpy().dtype == dtype
+    np.testing.assert_allclose(res["fuel_flow"].to_numpy(), expected, rtol=1e-3)
+
+
+def test_pandas():
+    df = pd.DataFrame(data)
+
+    ff = columnar.apply(fuelflow.enroute, df["mass"], df["tas"], df["alt"], df["vs"])
+    assert isinstance(ff, pd.Series)
+    assert (ff.index == df.index).all()
+
+    res = columnar.with_openap_fuel(df, "A320")
+    np.testing.assert_allclose(res["fuel_flow"], expected)
@@ -0,0 +1,50 @@
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import Drag, Emission, FuelFlow, Thrust
+from openap.extra import dedup
+
+rng = np.random.default_rng(0)
+n = 10000
+mass = np.repeat([60000.0, 65000.0], n // 2) + rng.uniform(0, 500, n)
+tas = np.round(rng.normal(450, 3, n))
+alt = 35000 + np.round(rng.normal(0, 50, n) / 25) * 25
+vs = np.round(rng.normal(0, 50, n) / 64) * 64
+
+
+def test_unique_rows():
+    (t, a), inverse = dedup.unique_rows(tas, alt)
+    assert len(t) == len({*zip(tas, alt)})
+    assert_allclose(t[inverse], tas)
+    assert_allclose(a[inverse], alt)
+
+    (m,), inverse = dedup.unique_rows(mass, steps=[100])
+    assert len(m) <= 12
+    assert np.abs(m[inverse] - mass).max() <= 50
+
+
+@pytest.mark.parametrize(
+    "func, args",
+    [
+        (FuelFlow("A320").enroute, (60000, tas, alt, vs)),
+        (Thrust("A320").climb, (tas, alt, vs)),
+        (Drag("A320").clean, (60000, tas, alt)),
+        (Emission("A320").nox, (1.2, tas, alt)),
+    ],
+)
+def test_apply(func, args):
+    assert_allclose(dedup.apply(func, *args), func(*args))
+
+
+def test_apply_steps():
+    fuelflow = FuelFlow("A320")
+    expected = fuelflow.enroute(mass, tas, alt, vs)
+    result = dedup.apply(fuelflow.enroute, mass, tas, alt, vs, steps=dict(mass=100))
+    assert result.shape == expected.shape
+    assert_allclose(result, expected, rtol=1e-3)
+
+    assert np.isscalar(dedup.apply(fuelflow.enroute, 60000, 400, 35000))
+
+    with pytest.raises(TypeError):
+        dedup.apply(fuelflow.enroute, mass, tas, alt, steps=dict(weight=100))
@@ -0,0 +1,58 @@
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import Drag
+
+drag = Drag("A320", wave_drag=True)
+
+mass = np.full(6, 60000.0)
+tas = np.array([450, 450, 150, 150, 150, 150.0])
+alt = np.array([37000, 37000, 1000, 1000, 1000, 1000.0])
+flap_angle = np.array([0, 0, 10, 20, 35, 0.0])
+landing_gear = np.array([False, False, False, True, True, True])
+
+
+def test_nonclean_arrays():
+    D = drag.nonclean(mass, tas, alt, flap_angle, landing_gear=landing_gear)
+    expected = [
+        drag.nonclean(m, v, h, f, landing_gear=bool(g))
+        for m, v, h, f, g in zip(mass, tas, alt, flap_angle, landing_gear)
+    ]
+    assert_allclose(D, expected)
+
+
+def test_evaluate():
+    D = drag.evaluate(mass, tas, alt, flap_angle=flap_angle, landing_gear=landing_gear)
+    nonclean = flap_angle + landing_gear > 0
+
+    assert_allclose(D[~nonclean], drag.clean(mass, tas, alt)[~nonclean])
+    assert_allclose(
+        D[nonclean],
+        drag.nonclean(mass, tas, alt, flap_angle, landing_gear=landing_gear)[nonclean],
+    )
+
+    # forced clean configuration
+    D = drag.evaluate(mass, tas, alt, flap_angle=flap_angle, config=False)
+    assert_allclose(D, drag.clean(mass, tas, alt))
+
+
+def test_wave_drag():
+    from openap import aero
+
+    mass, tas, alt, vs = 60000, np.array([300, 450, 480]), 37000, 500
+    wing = drag.aircraft["wing"]
+
+    # Gur et al. (2010), with the lift coefficient in level flight
+    mach = aero.tas2mach(tas * aero.kts, alt * aero.ft)
+    qS = 0.5 * aero.density(alt * aero.ft) * (tas * aero.kts) ** 2 * wing["area"]
+    cl = mass * aero.g0 / qS
+    cos_sweep = np.cos(np.radians(wing["sweep"]))
+    tc = wing["t/c"] or 0.12
+    mach_crit = 0.95 / cos_sweep - tc / cos_sweep**2 - 0.1 * cl / cos_sweep**3 - 0.108
+    dCdw = 20 * np.maximum(mach - mach_crit, 0) ** 4
+    assert dCdw[-1] > 0
+
+    polar = drag.polar["clean"]
+    clean = Drag("A320").clean(mass, tas, alt, vs)
+    cl_vs = cl * np.cos(np.arctan2(vs * aero.fpm, tas * aero.kts))
+    expected = clean + dCdw * clean / (polar["cd0"] + polar["k"] * cl_vs**2)
+    assert_allclose(drag.clean(mass, tas, alt, vs), expected)
@@ -0,0 +1,54 @@
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import Emission, FuelFlow, Thrust
+from openap.engines import EngineOptions
+
+n = 500
+mass = np.linspace(60000, 70000, n)
+tas = np.linspace(150, 460, n)
+alt = np.linspace(0, 39000, n)
+vs = np.where(alt < 30000, 1500.0, 0.0)
+
+
+def test_all_engines():
+    options = EngineOptions("A320")
+    assert options.n_engines == len(set(options.engines)) > 1
+
+    ff = options.fuelflow.enroute(mass, tas, alt, vs)
+    climb = options.thrust.climb(tas, alt, vs)
+    nox = options.emission.nox(ff, tas, alt)
+    co = options.emission.co(ff, tas, alt)
+    assert ff.shape == climb.shape == nox.shape == (options.n_engines, n)
+
+    for i, eng in enumerate(options.engines):
+        fuelflow, emission = FuelFlow("A320", eng), Emission("A320", eng)
+        expected = fuelflow.enroute(mass, tas, alt, vs)
+        assert_allclose(ff[i], expected)
+        assert_allclose(climb[i], Thrust("A320", eng).climb(tas, alt, vs))
+        assert_allclose(nox[i], emission.nox(expected, tas, alt))
+        assert_allclose(co[i], emission.co(expected, tas, alt))
+
+
+def test_engines():
+    options = EngineOptions("A320", engines=["CFM56-5B4", "V2527-A5"])
+    thrust = np.linspace(10_000, 200_000, n)
+    ff = options.fuelflow.at_thrust(thrust)
+    assert ff.shape == (2, n)
+    assert_allclose(ff[1], FuelFlow("A320", "V2527-A5").at_thrust(thrust))
+
+    with pytest.raises(ValueError):
+        EngineOptions("A320", engines=["GE90-115B"])
+
+
+def test_mass_from_fuel():
+    options = EngineOptions("A320")
+    ff = options.fuelflow.enroute(mass, tas, alt, vs)
+
+    with pytest.raises(ValueError, match="stacked engine parameters"):
+        options.fuelflow.mass_from_fuel(ff, tas, alt, vs)
+
+    thrust = options.fuelflow.thrust_from_fuel(ff[:, :10])
+    fuelflow = FuelFlow("A320", options.engines[1])
+    assert_allclose(thrust[1], fuelflow.thrust_from_fuel(ff[1, :10]))
@@ -0,0 +1,71 @@
+import tracemalloc
+
+import pytest
+
+import numpy as np
+from openap import Evaluator, FuelFlow
+
+n = 10000
+rng = np.random.default_rng(42)
+mass = rng.uniform(50000, 75000, n)
+tas = rng.uniform(150, 480, n)
+alt = rng.uniform(0, 40000, n)
+vs = rng.uniform(-2500, 2500, n)
+acc = rng.uniform(-1, 1, n)
+
+
+@pytest.mark.parametrize("ac", ["A320", "B738", "B789", "A388", "E190"])
+@pytest.mark.parametrize("wave_drag", [False, True])
+def test_evaluator(ac, wave_drag):
+    evaluator = Evaluator(ac, n, wave_drag=wave_drag)
+    fuelflow = FuelFlow(ac, wave_drag=wave_drag)
+    drag, thrust = fuelflow.drag, fuelflow.thrust
+
+    np.testing.assert_allclose(
+        evaluator.drag(mass, tas, alt, vs), drag.clean(mass, tas, alt, vs)
+    )
+    np.testing.assert_allclose(
+        evaluator.climb_thrust(tas, alt, vs), thrust.climb(tas, alt, vs)
+    )
+    np.testing.assert_allclose(
+        evaluator.idle_thrust(tas, alt), thrust.descent_idle(tas, alt)
+    )
+
+    np.testing.assert_allclose(
+        evaluator.fuelflow(mass, tas, alt, vs, acc),
+        fuelflow.enroute(mass, tas, alt, vs, acc),
+    )
+    np.testing.assert_allclose(
+        evaluator.fuelflow(mass, tas, alt, vs, acc, limit=False),
+        fuelflow.enroute(mass, tas, alt, vs, acc, limit=False),
+    )
+
+
+def test_no_allocation():
+    evaluator = Evaluator("A320", n)
+    out = np.empty(n)
+
+    evaluator.fuelflow(mass, tas, alt, vs, out=out)
+
+    tracemalloc.start()
+    result = evaluator.fuelflow(mass, tas, alt, vs, out=out)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert result is out
+    assert peak < out.nbytes
+
+
+def test_result_buffers():
+    evaluator = Evaluator("A320", n)
+
+    d = evaluator.drag(mass, tas, alt, vs)
+    t1 = evaluator.climb_thrust(tas, alt, vs)
+    expected = d.copy(), t1.copy()
+
+    t2 = evaluator.idle_thrust(tas, alt)
+    ff = evaluator.fuelflow(mass, tas, alt, vs, acc)
+
+    assert len({id(d), id(t1), id(t2), id(ff)}) == 4
+    np.testing.assert_array_equal(d, expected[0])
+    np.testing.assert_array_equal(t1, expected[1])
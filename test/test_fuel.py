@@ -33,3 +33,49 @@ FF = fuel.enroute(mass=[60000], tas=[230], alt=[32000], vs=[0])
 print("fuel.enroute(mass=[60000], tas=[230], alt=[32000], vr=[0])")
 print(FF)
 print("-" * 70)
+
+
+def test_inverse():
+    import pytest
+
+    import numpy as np
+    from numpy.testing import assert_allclose
+
+    thrust = np.linspace(10000, 200000, 100)
+    assert_allclose(fuel.thrust_from_fuel(fuel.at_thrust(thrust)), thrust)
+    assert np.isnan(fuel.thrust_from_fuel(10))
+
+    rng = np.random.default_rng(0)
+    mass = rng.uniform(50000, 70000, 1000)
+    tas = rng.uniform(400, 460, 1000)
+    alt = rng.uniform(30000, 38000, 1000)
+
+    ff = fuel.enroute(mass, tas, alt)
+    assert_allclose(fuel.mass_from_fuel(ff, tas, alt), mass, atol=1)
+    assert_allclose(fuel.mass_from_fuel(ff[0], tas[0], alt[0]), mass[0], atol=1)
+    assert np.isnan(fuel.mass_from_fuel(10, 450, 35000))
+
+    result = fuel.mass_from_fuel(ff, tas, alt, tol=0.1, max_iter=100)
+    assert_allclose(result, mass, atol=0.1)
+    result = fuel.mass_from_fuel(ff, tas, alt, mass_range=(40000, 80000), max_iter=1)
+    assert result.shape == mass.shape
+
+    with pytest.raises(ValueError):
+        fuel.mass_from_fuel(ff, tas, alt, max_iter=0)
+
+
+def test_fuel_curve():
+    import numpy as np
+    from numpy.testing import assert_allclose
+
+    # published fuel curve, with the engine scale applied to the exponential term
+    c1, c2, c3, scale = fuel.fuel_coef
+    x = np.linspace(0, 1, 11)
+    expected = c1 - np.exp(-c2 * (x * np.exp(c3 * x) - np.log(c1) / c2)) * scale
+    assert_allclose(fuel.func_fuel(x), expected)
+
+    assert_allclose(fuel.at_thrust(50000), 1.0015, rtol=1e-4)
+    assert_allclose(fuel.enroute(60000, 230, 32000), 0.8568, rtol=1e-4)
+
+    thrust = np.array([20000.0, 50000.0])
+    assert_allclose(fuel.thrust_from_fuel(fuel.at_thrust(thrust)), thrust)
@@ -0,0 +1,29 @@
+from openap import FuelFlow, instrument, prop
+
+
+def test_recording():
+    calls = []
+    instrument.add_callback(lambda name, elapsed, size: calls.append((name, size)))
+
+    with instrument.recording():
+        fuelflow = FuelFlow("A320")
+        fuelflow.enroute(mass=[60000] * 10, tas=200, alt=20000)
+        prop.aircraft("A320")
+
+    instrument.remove_callback(instrument._callbacks[-1])
+    assert not instrument.enabled
+
+    report = instrument.report()
+    assert report.loc["openap.fuel.FuelFlow.enroute", "calls"] == 1
+    assert report.loc["openap.fuel.FuelFlow.enroute", "max_size"] == 10
+    assert report.loc["openap.drag.Drag.clean", "calls"] == 1
+    assert report.loc["openap.prop.aircraft", "calls"] >= 2
+    assert (report["time"] > 0).all()
+    assert ("openap.fuel.FuelFlow.enroute", 10) in calls
+
+    # nothing is recorded when disabled
+    fuelflow.enroute(mass=60000, tas=200, alt=20000)
+    assert instrument.report().loc["openap.fuel.FuelFlow.enroute", "calls"] == 1
+
+    instrument.reset()
+    assert instrument.report().empty
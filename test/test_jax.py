@@ -0,0 +1,64 @@
+import pytest
+
+import numpy as np
+import openap
+from numpy.testing import assert_allclose
+
+jax = pytest.importorskip("jax")
+
+from openap import jax as oj  # noqa: E402
+
+rng = np.random.default_rng(0)
+mass = rng.uniform(50000, 75000, 100)
+tas = rng.uniform(150, 480, 100)
+alt = rng.uniform(0, 40000, 100)
+vs = rng.uniform(-2000, 2000, 100)
+
+
+@pytest.fixture(autouse=True)
+def x64():
+    """Compute in float64 as the numpy models, for the tests of this module."""
+    enabled = jax.config.jax_enable_x64
+    jax.config.update("jax_enable_x64", True)
+    yield
+    jax.config.update("jax_enable_x64", enabled)
+
+
+def test_fuelflow():
+    fuelflow = oj.FuelFlow("A320")
+    expected = openap.FuelFlow("A320").enroute(mass, tas, alt, vs)
+
+    enroute = jax.jit(fuelflow.enroute, static_argnames="limit")
+    assert_allclose(enroute(mass, tas, alt, vs), expected)
+
+    # sensitivity to the mass, against central differences
+    grad = jax.vmap(jax.grad(fuelflow.enroute))(mass, tas, alt, vs)
+    model = openap.FuelFlow("A320")
+    upper = model.enroute(mass + 1, tas, alt, vs)
+    lower = model.enroute(mass - 1, tas, alt, vs)
+    diff = (upper - lower) / 2
+    assert_allclose(grad, diff, rtol=1e-4, atol=1e-9)
+
+
+def test_models():
+    assert_allclose(
+        jax.jit(oj.Thrust("A320").climb)(tas, alt, vs),
+        openap.Thrust("A320").climb(tas, alt, vs),
+    )
+    assert_allclose(
+        oj.Drag("A320", wave_drag=True).clean(mass, tas, alt),
+        openap.Drag("A320", wave_drag=True).clean(mass, tas, alt),
+    )
+    assert_allclose(
+        jax.jit(oj.Emission("A320").nox)(1.5, tas, alt),
+        openap.Emission("A320").nox(1.5, tas, alt),
+    )
+
+
+def test_aero():
+    h = alt * 0.3048
+    assert_allclose(oj.aero.atmos_all(h), openap.aero.atmos_all(h))
+    assert_allclose(
+        jax.jit(oj.aero.tas2cas)(tas * 0.514444, h),
+        openap.aero.tas2cas(tas * 0.514444, h),
+    )
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import Emission, FuelFlow, prop
+
+kernels = pytest.importorskip("openap.kernels")
+
+rng = np.random.default_rng(0)
+n = 10_000
+mass = rng.uniform(50_000, 75_000, n)
+tas = rng.uniform(150, 480, n)
+alt = rng.uniform(0, 40_000, n)
+vs = rng.uniform(-3000, 3000, n)
+ffac = rng.uniform(0.2, 2.5, n)
+
+
+types = ["A320", "B738", "B789", "A388", "E190"]
+
+
+@pytest.mark.parametrize("ac", types)
+@pytest.mark.parametrize("wave_drag", [False, True])
+def test_fuelflow(ac, wave_drag):
+    model = FuelFlow(ac, wave_drag=wave_drag)
+    fuelflow = kernels.FuelFlow(ac, wave_drag=wave_drag)
+
+    for limit in [True, False]:
+        expected = model.enroute(mass, tas, alt, vs, limit=limit)
+        result = fuelflow.enroute(mass, tas, alt, vs, limit=limit)
+        assert_allclose(result, expected, rtol=1e-10)
+
+    expected = model.enroute(60000, 400, 35000, limit=False)
+    result = fuelflow.enroute(60000, 400, 35000, limit=False)
+    assert np.isscalar(result)
+    assert_allclose(result, expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize("ac", types)
+@pytest.mark.parametrize("wave_drag", [False, True])
+def test_drag_thrust(ac, wave_drag):
+    model = FuelFlow(ac, wave_drag=wave_drag)
+    c = kernels.FuelFlow(ac, wave_drag=wave_drag)._params
+
+    def kernel(func, *args):
+        return np.array([func(c, *x) for x in zip(*args)])
+
+    assert_allclose(
+        kernel(kernels._clean_drag, mass, tas, alt, vs),
+        model.drag.clean(mass, tas, alt, vs),
+        rtol=1e-10,
+    )
+    assert_allclose(
+        kernel(kernels._climb_thrust, tas, alt, vs),
+        model.thrust.climb(tas, alt, vs),
+        rtol=1e-10,
+    )
+    assert_allclose(
+        kernel(kernels._idle_thrust, tas, alt),
+        model.thrust.descent_idle(tas, alt),
+        rtol=1e-10,
+    )
+
+
+@pytest.mark.parametrize("ac", types)
+@pytest.mark.parametrize("species", ["nox", "co", "hc"])
+def test_emission(ac, species):
+    expected = getattr(Emission(ac), species)(ffac, tas, alt)
+    result = getattr(kernels.Emission(ac), species)(ffac, tas, alt)
+    assert_allclose(result, expected, rtol=1e-10)
+
+
+def test_threads():
+    fuelflow = kernels.FuelFlow("A320")
+    chunks = zip(*(np.split(x, 10) for x in (mass, tas, alt, vs)))
+
+    with ThreadPoolExecutor(4) as pool:
+        result = np.concatenate(list(pool.map(lambda c: fuelflow.enroute(*c), chunks)))
+
+    assert_allclose(result, fuelflow.enroute(mass, tas, alt, vs))
+
+
+def test_cache_threads():
+    prop.engine.cache_clear()
+
+    with ThreadPoolExecutor(8) as pool:
+        engines = list(pool.map(prop.engine, ["CFM56-5B4"] * 16))
+
+    assert all(e is engines[0] for e in engines)
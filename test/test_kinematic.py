@@ -4,5 +4,17 @@ wrap = WRAP('A320')
 
 for func in dir(wrap):
     if callable(getattr(wrap, func)):
-        if not func.startswith('_'):
+        sampling = ('distribution', 'sample', 'sample_all')
+        if not func.startswith('_') and func not in sampling:
             print(getattr(wrap, func)())
+
+
+def test_sample():
+    mach = wrap.sample("cruise_mach", n=10000, rng=42)
+    assert mach.shape == (10000,)
+    assert abs(mach.mean() - wrap.cruise_mach()["default"]) < 0.01
+    expected = wrap.sample("cruise_mach", n=5, rng=1)
+    assert (wrap.sample("cr_v_mach_mean", n=5, rng=1) == expected).all()
+
+    df = wrap.sample_all(n=100, rng=42)
+    assert df.shape == (100, len(wrap.params))
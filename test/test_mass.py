@@ -0,0 +1,18 @@
+import numpy as np
+from openap import mass
+
+
+def test_from_range():
+    typecodes = ["A320", "b738", "A320", "A388"]
+    distances = [1000, 2000, 3000, 1500]
+    load_factors = [0.8, 0.9, 0.7, 0.8]
+
+    masses = mass.from_range(typecodes, distances, load_factors)
+    expected = [
+        mass.from_range(t, d, lf)
+        for t, d, lf in zip(typecodes, distances, load_factors)
+    ]
+    assert np.allclose(masses, expected)
+
+    fractions = mass.from_range(typecodes, distances, fraction=True)
+    assert ((fractions > 0.5) & (fractions <= 1)).all()
@@ -0,0 +1,27 @@
+import pytest
+
+casadi = pytest.importorskip("casadi")
+
+from openap import aero  # noqa: E402
+from openap.casadi import optimize  # noqa: E402
+
+
+def test_cruise():
+    optimizer = optimize.Cruise("A320", n_nodes=20)
+    df = optimizer.trajectory(m0=0.8, range_m=1000_000)
+
+    assert optimizer.solver_stats["success"]
+    assert df.s.iloc[-1] == pytest.approx(1000_000, rel=1e-3)
+    assert df.mach.max() <= optimizer.mmo + 1e-6
+    assert 2000 < df.mass.iloc[0] - df.mass.iloc[-1] < 4000
+
+
+def test_complete_cost_index():
+    optimizer = optimize.CompleteFlight("A320", n_nodes=30)
+    df_fuel = optimizer.trajectory(range_m=1000_000)
+    df_ci = optimizer.trajectory(range_m=1000_000, objective="ci", ci=50)
+
+    assert df_fuel.h.iloc[0] == pytest.approx(1500 * aero.ft)
+    assert df_fuel.h.max() <= optimizer.ceiling + 1e-6
+    assert df_fuel.cas.max() <= optimizer.vmo + 1e-3
+    assert df_ci.t.iloc[-1] < df_fuel.t.iloc[-1]
@@ -1,9 +1,11 @@
 import os
 
 import matplotlib.pyplot as plt
+
 import numpy as np
 import pandas as pd
 from openap import FlightPhase
+from openap.phase import OnlineFlightPhase
 
 root = os.path.dirname(os.path.realpath(__file__))
 
@@ -74,6 +76,49 @@ def test_phase():
     plt.show()
 
 
+def test_online():
+    online = OnlineFlightPhase(twindow=60)
+
+    events = []
+    for point in zip(ts_, alt_, spd_, roc_):
+        events.extend(online.update(*point))
+    events.extend(online.flush())
+
+    # same labels as the batch algorithm, which does not label the last window
+    windows = [e for e in events if e[0] not in ("TO", "IC", "FA", "LD")]
+    starts = np.flatnonzero(np.diff(ts_ // 60, prepend=-1) > 0)
+    assert windows[:-1] == [(labels[i], ts_[i]) for i in starts][:-1]
+
+    idx = fp.flight_phase_indices()
+    transitions = dict(e for e in events if e[0] in ("TO", "IC", "FA", "LD"))
+    assert transitions == {k: ts_[idx[k]] for k in ("TO", "IC", "FA", "LD")}
+
+    # bounded memory
+    assert len(online.buffer) <= 601
+
+    # the fuzzy logic is shared by all instances
+    assert OnlineFlightPhase().flight_phase is online.flight_phase
+    assert not hasattr(online, "alt_range")
+
+
+def test_online_offset():
+    # a stream which does not start on a window boundary
+    ts_offset = ts_ + 1_700_000_030
+    batch = FlightPhase()
+    batch.set_trajectory(ts_offset, alt_, spd_, roc_)
+    labels_offset = batch.phaselabel()
+
+    online = OnlineFlightPhase(twindow=60)
+    events = []
+    for point in zip(ts_offset, alt_, spd_, roc_):
+        events.extend(online.update(*point))
+
+    windows = [e for e in events if e[0] not in ("TO", "IC", "FA", "LD")]
+    # windows are counted from the first point, in the batch and online labels
+    starts = np.flatnonzero(np.diff(ts_ // 60, prepend=-1) > 0)
+    assert windows == [(labels_offset[i], ts_offset[i]) for i in starts][:-1]
+
+
 if __name__ == "__main__":
     test_segment()
     test_phase()
@@ -0,0 +1,72 @@
+import pytest
+
+import numpy as np
+from openap import Drag, Emission, FuelFlow, Thrust, aero
+from openap.extra import set_dtype
+
+rng = np.random.default_rng(42)
+n = 1000
+mass = rng.uniform(50000, 75000, n)
+tas = rng.uniform(150, 480, n)
+alt = rng.uniform(0, 40000, n)
+vs = rng.uniform(-2500, 2500, n)
+ffac = rng.uniform(0.2, 2.5, n)
+flap = rng.uniform(0, 30, n)
+
+
+def evaluate(**kwargs):
+    drag = Drag("A320", **kwargs)
+    thrust = Thrust("A320", **kwargs)
+    fuelflow = FuelFlow("A320", **kwargs)
+    emission = Emission("A320", **kwargs)
+
+    return {
+        "clean": drag.clean(mass, tas, alt, vs),
+        "nonclean": drag.nonclean(mass, tas, alt, flap, vs, landing_gear=True),
+        "climb": thrust.climb(tas, alt, vs),
+        "takeoff": thrust.takeoff(tas, alt),
+        "enroute": fuelflow.enroute(mass, tas, alt, vs),
+        "nox": emission.nox(ffac, tas, alt),
+        "co": emission.co(ffac, tas, alt),
+        "hc": emission.hc(ffac, tas, alt),
+    }
+
+
+@pytest.mark.parametrize("dtype", ["float32", np.float32])
+def test_instance_dtype(dtype):
+    ref = evaluate()
+    res = evaluate(dtype=dtype)
+
+    for name, value in res.items():
+        assert value.dtype == np.float32, name
+        assert ref[name].dtype == np.float64, name
+        np.testing.assert_allclose(value, ref[name], rtol=1e-3, err_msg=name)
+
+
+def test_global_dtype():
+    try:
+        set_dtype("float32")
+        fuelflow = FuelFlow("A320")
+        assert fuelflow.enroute(mass, tas, alt, vs).dtype == np.float32
+
+        # an instance setting overrides the global one
+        fuelflow = FuelFlow("A320", dtype="float64")
+        assert fuelflow.enroute(mass, tas, alt, vs).dtype == np.float64
+    finally:
+        set_dtype(None)
+
+    assert FuelFlow("A320").enroute(mass, tas, alt, vs).dtype == np.float64
+
+
+def test_aero():
+    h = alt.astype(np.float32) * aero.ft
+    v = tas.astype(np.float32) * aero.kts
+
+    for x, ref in zip(aero.atmos(h), aero.atmos(alt * aero.ft)):
+        assert x.dtype == np.float32
+        np.testing.assert_allclose(x, ref, rtol=1e-6)
+
+    cas = aero.tas2cas(v, h)
+    assert cas.dtype == np.float32
+    ref = aero.tas2cas(tas * aero.kts, alt * aero.ft)
+    np.testing.assert_allclose(cas, ref, rtol=1e-4)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import Drag, Emission, FuelFlow, Thrust
+from openap.serve import RequestError, Service
+
+mass = np.linspace(50000, 70000, 100)
+
+
+def test_batching():
+    service = Service(window=0.01)
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                service.evaluate(
+                    "fuelflow", "enroute", "A320", mass=m, tas=400, alt=35000
+                )
+                for m in mass
+            ),
+            service.evaluate("emission", "nox", "A320", ffac=[0.5, 1.0], tas=400),
+            service.evaluate(
+                "drag", "nonclean", "A320", mass=60000, tas=150, alt=1000, flap_angle=20
+            ),
+        )
+
+    *ff, nox, d = asyncio.run(run())
+
+    assert service.batches == 3
+    assert len(service.models) == 3
+    assert_allclose(ff, FuelFlow("A320").enroute(mass, 400, 35000))
+    assert_allclose(nox, Emission("A320").nox([0.5, 1.0], 400))
+    assert_allclose(d, Drag("A320").nonclean(60000, 150, 1000, flap_angle=20))
+
+
+def test_drag_engine():
+    service = Service()
+
+    async def run():
+        return await asyncio.gather(
+            service.evaluate(
+                "drag", "clean", "A320", "CFM56-5B4", mass=60000, tas=480, alt=38000
+            ),
+            service.evaluate("drag", "clean", "A320", mass=60000, tas=480, alt=38000),
+        )
+
+    with_eng, without_eng = asyncio.run(run())
+
+    # drag does not depend on the engine, which must not enable the wave drag
+    expected = Drag("A320").clean(60000, 480, 38000)
+    assert_allclose(with_eng, expected)
+    assert_allclose(without_eng, expected)
+    assert len(service.models) == 1
+
+    thrust = service.model("thrust", "A320", "V2527-A5")
+    assert thrust.eng_max_thrust == Thrust("A320", "V2527-A5").eng_max_thrust
+
+
+def test_errors():
+    service = Service()
+
+    async def run(*args, **kwargs):
+        return await service.evaluate(*args, **kwargs)
+
+    with pytest.raises(RequestError) as e:
+        asyncio.run(run("fuelflow", "plot_model", "A320"))
+    assert e.value.status == 404
+
+    with pytest.raises(RequestError):
+        asyncio.run(run("fuelflow", "enroute", "A320", mass=60000, speed=400))
+
+
+def test_http():
+    service = Service()
+
+    async def post(port, path, params):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(params).encode()
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        status = (await reader.readline()).split()[1]
+        headers = {}
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            headers[name.lower()] = value.strip()
+        content = json.loads(await reader.readexactly(int(headers["content-length"])))
+        writer.close()
+        return int(status), content
+
+    async def run():
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(
+                post(
+                    port,
+                    "/fuelflow/enroute",
+                    dict(ac="A320", mass=60000, tas=400, alt=35000),
+                ),
+                post(
+                    port,
+                    "/thrust/climb",
+                    dict(ac="A320", tas=[200, 250], alt=10000, roc=1500),
+                ),
+                post(port, "/fuelflow/enroute", dict(mass=60000)),
+                post(port, "/unknown", dict(ac="A320")),
+            )
+
+    ff, thr, missing, unknown = asyncio.run(run())
+
+    assert ff[0] == 200
+    assert_allclose(ff[1]["result"], FuelFlow("A320").enroute(60000, 400, 35000))
+    assert len(thr[1]["result"]) == 2
+    assert missing[0] == 400 and "error" in missing[1]
+    assert unknown[0] == 404
+
+
+def test_http_errors():
+    service = Service()
+
+    async def send(port, raw):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        status = (await reader.readline()).split()[1]
+        length = 0
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        content = json.loads(await reader.readexactly(length))
+        writer.close()
+        return int(status), content
+
+    def post(path, body):
+        body = body if isinstance(body, bytes) else json.dumps(body).encode()
+        header = f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n"
+        return header.encode() + body
+
+    requests = [
+        post("/fuelflow/enroute", b"{not json"),
+        post("/fuelflow/enroute", dict(ac="A320", mass=60000, speed=400)),
+        post("/fuelflow/enroute", dict(ac="A320", model="drag", mass=60000)),
+        post("/fuelflow/enroute", dict(ac=320, mass=60000, tas=400, alt=35000)),
+        post("/drag/clean", dict(ac="A320", mass="heavy", tas=400, alt=35000)),
+        b"POST /fuelflow/enroute HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+        b"GARBAGE\r\n\r\n",
+    ]
+
+    async def run():
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(*(send(port, r) for r in requests))
+
+    for status, content in asyncio.run(run()):
+        assert status == 400
+        assert content["error"]
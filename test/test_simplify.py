@@ -0,0 +1,83 @@
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import FuelFlow
+from openap.extra import simplify
+
+
+def ramp(t, t0, t1, y0, y1):
+    return y0 + (y1 - y0) * np.clip((t - t0) / (t1 - t0), 0, 1)
+
+
+# long-haul flight at 1 Hz, with two step climbs
+ts = np.arange(0, 36000.0)
+alt = np.maximum(
+    ramp(ts, 0, 1500, 0, 35000)
+    + ramp(ts, 12000, 12060, 0, 2000)
+    + ramp(ts, 24000, 24060, 0, 2000)
+    - ramp(ts, 34000, 36000, 0, 39000),
+    0,
+)
+vs = np.gradient(alt, ts) * 60
+tas = ramp(ts, 0, 1500, 160, 480) - ramp(ts, 34000, 36000, 0, 320)
+mass = ramp(ts, 0, 36000, 330000, 250000)
+
+
+def test_douglas_peucker():
+    index = simplify.douglas_peucker(ts, alt, tas, tolerance=[10, 1])
+    assert index[0] == 0 and index[-1] == len(ts) - 1
+    assert len(index) < 20
+
+    for column, tol in [(alt, 10), (tas, 1)]:
+        error = np.interp(ts, ts[index], column[index]) - column
+        assert np.abs(error).max() <= tol
+
+    assert list(simplify.douglas_peucker(ts[:2], alt[:2], tolerance=1)) == [0, 1]
+
+
+def test_integrate():
+    fuelflow = FuelFlow("A333")
+    dense = simplify._trapezoid(fuelflow.enroute(mass, tas, alt, vs), ts)
+
+    for tolerance in [1e-3, 1e-4]:
+        result = simplify.integrate(
+            fuelflow.enroute, ts, mass, tas, alt, vs, tolerance=tolerance
+        )
+        assert abs(result["value"] - dense) <= tolerance * dense
+        assert result["ratio"] > 50
+        assert_allclose(result["ratio"], len(ts) / len(result["index"]))
+
+    # scalar arguments, and keyword arguments of the model
+    result = simplify.integrate(fuelflow.enroute, ts, 200000, 480, 35000, limit=False)
+    assert_allclose(result["value"], fuelflow.enroute(200000, 480, 35000) * 35999)
+
+
+def test_integrate_duplicates():
+    fuelflow = FuelFlow("A320")
+
+    # duplicate timestamps, as in ADS-B data, with different altitudes
+    rng = np.random.default_rng(0)
+    ts_ = np.repeat(np.arange(0, 3600.0, 10), 10)
+    alt_ = np.interp(ts_, [0, 1800, 3600], [10000, 35000, 35000])
+    alt_ += rng.normal(0, 50, len(ts_))
+    dense = simplify._trapezoid(fuelflow.enroute(65000, 450, alt_), ts_)
+    with np.errstate(divide="raise", invalid="raise"):
+        result = simplify.integrate(fuelflow.enroute, ts_, 65000, 450, alt_)
+    assert abs(result["value"] - dense) <= 1e-3 * dense
+
+    # all points at the same time
+    result = simplify.integrate(fuelflow.enroute, np.zeros(100), 65000, 450, alt_[:100])
+    assert result["value"] == 0 and result["error"] == 0
+    assert list(result["index"]) == [0, 99]
+
+
+@pytest.mark.parametrize("i", [0, 1000, 20000])
+def test_integrate_nan(i):
+    fuelflow = FuelFlow("A333")
+    alt_ = alt.copy()
+    alt_[i] = np.nan
+
+    result = simplify.integrate(fuelflow.enroute, ts, mass, tas, alt_, vs)
+    assert np.isnan(result["value"]) and np.isnan(result["error"])
+    assert i in result["index"]
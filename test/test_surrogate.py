@@ -0,0 +1,100 @@
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import FuelFlow, Thrust, surrogate
+
+fuel_grid = {
+    "enroute": dict(mass=(50000, 70000, 5), tas=(200, 500, 31), alt=(20000, 40000, 41)),
+}
+thrust_grid = {
+    "climb": dict(tas=(100, 400, 31), alt=(0, 20000, 41), roc=(0, 3000, 7)),
+    "takeoff": dict(tas=(0, 200, 21), alt=(0, 10000, 11)),
+}
+
+rng = np.random.default_rng(0)
+mass = rng.uniform(50000, 70000, 1000)
+tas = rng.uniform(200, 400, 1000)
+alt = rng.uniform(20000, 40000, 1000)
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_fuelflow(method):
+    fuelflow = surrogate.FuelFlow("A320", grid=fuel_grid, method=method)
+    expected = FuelFlow("A320").enroute(mass, tas, alt)
+    result = fuelflow.enroute(mass, tas, alt)
+
+    assert 0 < fuelflow.max_error["enroute"] < 0.1
+    assert np.abs(result - expected).max() <= fuelflow.max_error["enroute"]
+    assert np.isscalar(fuelflow.enroute(60000, 400, 35000))
+
+
+def test_fuelflow_no_limit():
+    fuelflow = surrogate.FuelFlow("A320", grid=fuel_grid)
+    expected = FuelFlow("A320").enroute(mass, tas, alt, limit=False)
+    result = fuelflow.enroute(mass, tas, alt, limit=False)
+
+    assert np.abs(result - expected).max() <= fuelflow.max_error["enroute"]
+    positional = fuelflow.enroute(60000, 400, 35000, 0, False)
+    assert_allclose(positional, fuelflow.enroute(60000, 400, 35000, limit=False))
+    assert len(fuelflow.surrogates) == 1
+
+    # the error bound holds for the tables with and without limit
+    expected = FuelFlow("A320").enroute(mass, tas, alt)
+    result = fuelflow.enroute(mass, tas, alt)
+    assert np.abs(result - expected).max() <= fuelflow.max_error["enroute"]
+    errors = [s.max_error for s in fuelflow.surrogates.values()]
+    assert fuelflow.max_error["enroute"] == max(errors)
+
+
+def test_thrust():
+    thrust = surrogate.Thrust("A320", grid=thrust_grid)
+    model = Thrust("A320")
+
+    tas, alt, roc = 250, np.linspace(0, 20000, 100), 1500
+    error = np.abs(thrust.climb(tas, alt, -roc) - model.climb(tas, alt, roc)).max()
+    assert error <= thrust.max_error["climb"]
+
+    assert_allclose(thrust.takeoff(100, 0), model.takeoff(100, 0), rtol=1e-3)
+
+
+def test_cache(tmp_path):
+    fuelflow = surrogate.FuelFlow("A320", grid=fuel_grid, cache_dir=tmp_path)
+    expected = fuelflow.enroute(mass, tas, alt)
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    cached = surrogate.FuelFlow("A320", grid=fuel_grid, cache_dir=tmp_path)
+    assert_allclose(cached.enroute(mass, tas, alt), expected)
+    assert cached.max_error == fuelflow.max_error
+
+
+def test_cache_options(tmp_path):
+    plain = surrogate.FuelFlow("A320", grid=fuel_grid, cache_dir=tmp_path)
+    plain.enroute(60000, 450, 39000)
+
+    wave = surrogate.FuelFlow(
+        "A320", grid=fuel_grid, cache_dir=tmp_path, wave_drag=True
+    )
+    expected = FuelFlow("A320", wave_drag=True).enroute(60000, 450, 39000)
+    assert_allclose(wave.enroute(60000, 450, 39000), expected, rtol=1e-3)
+    assert len(list(tmp_path.glob("*.npz"))) == 2
+
+
+def test_cache_version(tmp_path, monkeypatch):
+    surrogate.FuelFlow("A320", grid=fuel_grid, cache_dir=tmp_path).enroute(
+        60000, 450, 39000
+    )
+    monkeypatch.setattr(surrogate, "TABLE_VERSION", surrogate.TABLE_VERSION + 1)
+    surrogate.FuelFlow("A320", grid=fuel_grid, cache_dir=tmp_path).enroute(
+        60000, 450, 39000
+    )
+    assert len(list(tmp_path.glob("*.npz"))) == 2
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_nan(method):
+    fuelflow = surrogate.FuelFlow("A320", grid=fuel_grid, method=method)
+    result = fuelflow.enroute(mass[:3], tas[:3], [np.nan, alt[1], np.inf])
+
+    assert np.isnan(result[[0, 2]]).all()
+    assert_allclose(result[1], fuelflow.enroute(mass[1], tas[1], alt[1]))
@@ -59,3 +59,34 @@ def plot():
     ax.legend()
     plt.tight_layout()
     plt.show()
+
+
+def test_climb_segments():
+    tas = np.array([0, 150, 250, 250, 250, 300, 300, 450])
+    alt = np.array([-1000, 5000, 10000, 10001, 20000, 30000, 30001, 38000])
+    roc = np.array([2500, -1500, 1000, 1000, 2000, 500, 500, 0])
+
+    # reference values of Thrust.climb before the segments were selected first,
+    # the segment changes at 10000 and 30000 ft, which belong to the lower one
+    expected = [
+        205807.68,
+        118504.40,
+        89229.03,
+        89227.52,
+        74783.32,
+        55030.16,
+        57073.84,
+        41839.93,
+    ]
+    T = thrust.climb(tas, alt, roc)
+    assert np.allclose(T, expected, rtol=1e-7)
+    for i in range(len(alt)):
+        assert np.allclose(thrust.climb(tas[i], alt[i], roc[i]), expected[i])
+
+    tas = np.linspace(0, 480, 1000)
+    alt = np.linspace(-1000, 45000, 1000)[::-1]
+
+    # broadcasting inputs of different shapes
+    T2 = thrust.climb(tas[:, None], alt[None, :], 1000)
+    assert T2.shape == (1000, 1000)
+    assert np.allclose(T2[:, 0], thrust.climb(tas, alt[0], 1000))
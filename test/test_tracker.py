@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_allclose
+from openap import Emission, FlightPhase, FuelFlow
+from openap.tracker import Tracker
+
+root = os.path.dirname(os.path.realpath(__file__))
+
+df = pd.read_csv(root + "/data/flight_phase_test.csv")
+ts = np.arange(0, df.ts.iloc[-1] - df.ts.iloc[0], 10.0)
+alt = np.interp(ts, df.ts - df.ts.iloc[0], df.alt)
+spd = np.interp(ts, df.ts - df.ts.iloc[0], df.spd)
+roc = np.interp(ts, df.ts - df.ts.iloc[0], df.roc)
+
+
+def test_flight():
+    # without smoothing, the states are the measurements
+    tracker = Tracker(tau=1e-9, twindow=60)
+
+    fp = FlightPhase()
+    fp.set_trajectory(ts, alt, spd, roc)
+    labels = fp.phaselabel(twindow=60)
+
+    phases = []
+    for i in range(len(ts)):
+        tracker.update(["abc123"], ts[i], alt[i], spd[i], roc[i], typecode="A320")
+        phases.append(tracker.state().phase.iloc[0])
+
+    # the label of a window is known at the first point of the next window
+    window = ts // 60
+    start = np.flatnonzero(np.diff(window) > 0) + 1
+    assert [phases[i] for i in start] == [labels[i - 1] for i in start]
+
+    # fuel and mass, integrated with the fuel flow of the previous point
+    fuelflow, emission = FuelFlow("A320"), Emission("A320")
+    state = tracker.state().iloc[0]
+    mass0, fuel, nox = state.mass + state.fuel, 0, 0
+    for i in range(1, len(ts)):
+        ff = fuelflow.enroute(mass0 - fuel, spd[i - 1], alt[i - 1], roc[i - 1])
+        nox += emission.nox(ff, spd[i - 1], alt[i - 1]) * 10 / 1000
+        fuel += ff * 10
+
+    assert_allclose(state.fuel, fuel)
+    assert_allclose(state.nox, nox)
+    assert_allclose(state.co2, emission.co2(fuel) / 1000)
+
+
+def test_batches():
+    tracker = Tracker(ttl=60)
+
+    # points of two aircraft, out of order
+    tracker.update(["a", "b", "a", "b"], [2, 0, 0, 1], 30000, 400, 0)
+    state = tracker.state().set_index("icao24").sort_index()
+    assert list(state.index) == ["a", "b"]
+    assert_allclose(state.ts, [2, 1])
+    assert (state.fuel > 0).all()
+
+    # late point, ignored
+    fuel = state.fuel["a"]
+    tracker.update(["a"], [1], 10000, 250, 0)
+    assert_allclose(tracker.state().set_index("icao24").fuel["a"], fuel)
+
+    # b is evicted when the feed reaches its last update plus the ttl
+    evicted = tracker.update(["a", "c"], [60, 61.5], 30000, 400, 0)
+    assert list(evicted.icao24) == ["b"]
+    assert sorted(tracker.state().icao24) == ["a", "c"]
+    assert len(tracker) == 2
+
+
+def test_capacity():
+    tracker = Tracker(capacity=4)
+    icao24 = [f"{i:06x}" for i in range(100)]
+    typecode = ["UNKNOWN"] * 50 + [None] * 50
+    with pytest.warns(UserWarning, match="UNKNOWN not available"):
+        tracker.update(icao24, np.zeros(100), 35000, 450, 0, typecode=typecode)
+    tracker.update(icao24, np.ones(100), 35000, 450, 0)
+
+    state = tracker.state()
+    assert len(state) == 100
+    assert (state.typecode == "A320").all()
+    assert state.substituted.tolist() == [True] * 50 + [False] * 50
+    assert_allclose(state.fuel, state.fuel.iloc[0])
+
+
+def test_missing_first():
+    # the first position often arrives before the velocity
+    tracker = Tracker()
+    tracker.update(["a"], 0, 35000, np.nan, 0)
+    state = tracker.state().iloc[0]
+    assert np.isnan(state.spd)
+    assert state.fuel == 0
+
+    reference = Tracker()
+    for t in range(1, 31):
+        tracker.update(["a"], t, 35000, 450, 0)
+        reference.update(["a"], t, 35000, 450, 0)
+
+    # the state starts at the first valid speed, not at zero
+    state, expected = tracker.state().iloc[0], reference.state().iloc[0]
+    assert_allclose(state.spd, 450)
+    columns = ["fuel", "mass", "nox", "co2"]
+    assert_allclose(state[columns].astype(float), expected[columns].astype(float))
@@ -0,0 +1,67 @@
+import pytest
+
+import numpy as np
+from numpy.testing import assert_allclose
+from openap import FuelFlow
+from openap.uncertainty import MonteCarlo
+
+n = 500
+mass = np.linspace(70000, 66000, n)
+tas = np.full(n, 440.0)
+alt = np.linspace(30000, 37000, n)
+vs = np.where(np.arange(n) < n // 2, 500.0, 0.0)
+
+std = dict(cd0=0.05, k=0.05, c1=0.02, c2=0.02, c3=0.02, max_thrust=0.05, mass=0.03)
+
+
+def test_nominal():
+    mc = MonteCarlo("A320", n_samples=3)
+    expected = FuelFlow("A320").enroute(mass, tas, alt, vs)
+    assert_allclose(mc.enroute(mass, tas, alt, vs), np.tile(expected, (3, 1)))
+
+
+def test_samples():
+    mc = MonteCarlo("A320", n_samples=50, std=std, seed=0, chunk_points=2000)
+    ff = mc.enroute(mass, tas, alt, vs)
+    assert ff.shape == (50, n)
+
+    # same results with one sample at a time, and without chunks
+    f = mc.factors
+    for i in [0, 17]:
+        single = MonteCarlo(
+            "A320", n_samples=1, factors={k: v[i : i + 1] for k, v in f.items()}
+        )
+        assert_allclose(single.enroute(mass, tas, alt, vs)[0], ff[i])
+
+    mc.chunk_points = 10**8
+    assert_allclose(mc.enroute(mass, tas, alt, vs), ff)
+
+    # the nominal parameters are restored
+    expected = FuelFlow("A320").enroute(mass, tas, alt, vs)
+    assert_allclose(mc.fuelflow.enroute(mass, tas, alt, vs), expected)
+
+
+def test_fuel():
+    mc = MonteCarlo("A320", n_samples=200, std=std, seed=0)
+    fuel = mc.fuel(mass, tas, alt, vs, dt=2)
+    lower, median, upper = mc.interval(fuel)
+
+    nominal = FuelFlow("A320").enroute(mass, tas, alt, vs).sum() * 2
+    assert lower < nominal < upper
+    assert lower < median < upper
+    assert_allclose(mc.co2(mass, tas, alt, vs, dt=2), fuel * 3.16)
+
+    with pytest.raises(ValueError):
+        MonteCarlo("A320", std=dict(cd1=0.1))
+
+
+def test_factors():
+    mc = MonteCarlo("A320", factors=dict(cd0=np.full(50, 1.1)))
+    assert mc.n_samples == 50
+    assert mc.enroute(mass, tas, alt, vs).shape == (50, n)
+
+    with pytest.raises(ValueError, match="Factors of k"):
+        MonteCarlo("A320", factors=dict(cd0=np.ones(50), k=np.ones(40)))
+
+    with pytest.raises(ValueError, match="Factors of cd0"):
+        MonteCarlo("A320", n_samples=100, factors=dict(cd0=np.ones(50)))